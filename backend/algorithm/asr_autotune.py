@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+ASR 推理参数自动调优
+
+记录各 (torch 线程数, batch_size_s) 组合在参考视频上的实时率（RTF）和峰值内存，
+从中选出最优组合并保存为按主机区分的调优配置：
+
+cache/asr_profiles/<主机名>.json
+
+Paraformer V2 引擎初始化时自动读取本机配置，未校准的主机沿用默认参数。
+"""
+
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+PROFILE_VERSION = 1
+
+
+def default_profile_dir() -> Path:
+    """调优配置默认目录：<项目根目录>/cache/asr_profiles"""
+    return Path(__file__).resolve().parent.parent.parent / "cache" / "asr_profiles"
+
+
+def host_profile_path(profile_dir: Optional[Path] = None) -> Path:
+    """本机调优配置文件路径"""
+    profile_dir = Path(profile_dir) if profile_dir else default_profile_dir()
+    return profile_dir / f"{platform.node() or 'localhost'}.json"
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def thread_candidates(cpu_count: int, concurrency: int = 1) -> List[int]:
+    """
+    生成待测的线程数：1, 2, 4, ... 直到每个并发任务可分到的核数
+
+    Args:
+        cpu_count: 本机 CPU 核数
+        concurrency: 预计同时运行的 ASR 任务数
+
+    Returns:
+        List[int]: 升序排列的线程数
+    """
+    budget = max(1, cpu_count // max(1, concurrency))
+    candidates = []
+    threads = 1
+    while threads < budget:
+        candidates.append(threads)
+        threads *= 2
+    candidates.append(budget)
+    return candidates
+
+
+def select_best(measurements: List[Dict], max_rss_mb: Optional[float] = None) -> Optional[Dict]:
+    """
+    从测量结果中选出最优参数组合
+
+    在峰值内存不超过上限的组合中取 RTF 最小者；RTF 相差不到 5% 时
+    优先线程数更少的组合，把多余的核留给并发任务。
+
+    Args:
+        measurements: [{"num_threads", "batch_size_s", "rtf", "peak_rss_mb"}, ...]
+        max_rss_mb: 峰值内存上限（MB），None 表示不限制
+
+    Returns:
+        Optional[Dict]: 最优的测量结果，没有满足条件的组合时返回 None
+    """
+    feasible = [
+        m for m in measurements
+        if m.get("rtf") is not None and (max_rss_mb is None or m["peak_rss_mb"] <= max_rss_mb)
+    ]
+    if not feasible:
+        return None
+
+    fastest = min(m["rtf"] for m in feasible)
+    near_best = [m for m in feasible if m["rtf"] <= fastest * 1.05]
+    return min(near_best, key=lambda m: (m["num_threads"], m["rtf"]))
+
+
+def build_profile(measurements: List[Dict], best: Dict, reference: str,
+                  concurrency: int, device: str) -> Dict:
+    """
+    组装调优配置
+
+    Args:
+        measurements: 全部测量结果
+        best: select_best 选出的组合
+        reference: 参考视频路径
+        concurrency: 校准时假定的并发任务数
+        device: 推理设备
+
+    Returns:
+        Dict: 可写入 JSON 的调优配置
+    """
+    return {
+        "version": PROFILE_VERSION,
+        "host": platform.node(),
+        "cpu_count": os.cpu_count(),
+        "device": device,
+        "concurrency": concurrency,
+        "num_threads": best["num_threads"],
+        "batch_size_s": best["batch_size_s"],
+        "rtf": best["rtf"],
+        "peak_rss_mb": best["peak_rss_mb"],
+        "reference": reference,
+        "calibrated_at": datetime.now().isoformat(),
+        "measurements": measurements,
+    }
+
+
+def save_host_profile(profile: Dict, profile_dir: Optional[Path] = None) -> Path:
+    """
+    保存本机调优配置
+
+    Returns:
+        Path: 配置文件路径
+    """
+    path = host_profile_path(profile_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    logging.info(f"ASR 调优配置已保存到: {path}")
+    return path
+
+
+def load_host_profile(profile_dir: Optional[Path] = None, device: Optional[str] = None) -> Optional[Dict]:
+    """
+    读取本机调优配置
+
+    配置的 CPU 核数或推理设备与当前环境不一致时视为失效（例如镜像迁移到了别的机型）。
+
+    Args:
+        profile_dir: 配置目录，默认 default_profile_dir()
+        device: 当前推理设备，指定时需与配置一致
+
+    Returns:
+        Optional[Dict]: 调优配置，不存在或已失效时返回 None
+    """
+    path = host_profile_path(profile_dir)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"ASR 调优配置读取失败，将使用默认参数: {e}")
+        return None
+
+    if profile.get("version") != PROFILE_VERSION:
+        logging.warning(f"ASR 调优配置版本不匹配，请重新校准: {path}")
+        return None
+    if profile.get("cpu_count") != os.cpu_count():
+        logging.warning(f"ASR 调优配置的 CPU 核数（{profile.get('cpu_count')}）与本机不一致，请重新校准")
+        return None
+    if device is not None and profile.get("device") != device:
+        logging.warning(f"ASR 调优配置的设备（{profile.get('device')}）与当前设备（{device}）不一致，请重新校准")
+        return None
+
+    logging.info(f"已加载 ASR 调优配置: 线程数 {profile['num_threads']}，batch_size_s {profile['batch_size_s']}")
+    return profile
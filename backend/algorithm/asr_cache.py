@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+ASR 结果缓存
+
+以解码后音频的哈希和模型 ID / 版本为键，持久化缓存 ASR 转录结果。
+同一视频重复上传时直接命中缓存，跳过模型推理。
+缓存按总大小做 LRU 淘汰，并记录命中 / 未命中次数。
+
+缓存目录可能被多个进程同时使用（API、预加载工作池、批量转写和分片识别的工作进程），
+因此不维护集中的条目索引：条目大小和最近访问时间直接取自条目文件本身（命中时更新修改时间），
+淘汰时扫描条目目录；命中 / 未命中计数先在进程内累计，写入条目时在文件锁下合并到 stats.json。
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class ASRResultCache:
+    """
+    内容寻址的 ASR 结果缓存
+
+    目录结构：
+    cache_dir/
+        ├── stats.json        # 命中 / 未命中统计（各进程合并写入）
+        ├── .lock             # 合并统计和淘汰时使用的文件锁
+        └── entries/
+            ├── <key>.json    # 文件大小即条目大小，修改时间即最近访问时间
+            └── ...
+    """
+
+    HASH_CHUNK_SAMPLES = 1 << 20
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 2048):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_size_mb: 缓存总大小上限（MB），超出后按最近最少使用淘汰
+        """
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / "entries"
+        self.stats_path = self.cache_dir / "stats.json"
+        self.lock_path = self.cache_dir / ".lock"
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        # 本进程尚未写入 stats.json 的计数
+        self._pending = {"hits": 0, "misses": 0}
+
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        atexit.register(self.flush_stats)
+
+        logging.info(f"ASR 结果缓存目录: {self.cache_dir}（上限 {max_size_mb} MB）")
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程互斥（不支持 fcntl 的平台上只在进程内互斥）"""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _read_stats(self) -> Dict:
+        """读取已持久化的统计"""
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+            return {"hits": int(stats.get("hits", 0)), "misses": int(stats.get("misses", 0))}
+        except (OSError, ValueError) as e:
+            if self.stats_path.exists():
+                logging.warning(f"缓存统计读取失败，将重新计数: {e}")
+            return {"hits": 0, "misses": 0}
+
+    def _atomic_write_json(self, path: Path, data):
+        """以唯一的临时文件写入再原子替换，多个写入方不会互相截断"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def flush_stats(self):
+        """把本进程累计的命中 / 未命中计数合并写入 stats.json"""
+        with self._lock:
+            pending, self._pending = self._pending, {"hits": 0, "misses": 0}
+        # 缓存目录已被删除（例如退出时的临时目录）时丢弃计数
+        if not any(pending.values()) or not self.cache_dir.exists():
+            return
+        try:
+            with self._file_lock():
+                stats = self._read_stats()
+                for name, count in pending.items():
+                    stats[name] += count
+                self._atomic_write_json(self.stats_path, stats)
+        except OSError as e:
+            logging.warning(f"缓存统计写入失败: {e}")
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / f"{key}.json"
+
+    def _scan_entries(self) -> List[Tuple[str, int, float]]:
+        """扫描条目目录，返回 [(键, 大小, 最近访问时间), ...]"""
+        entries = []
+        for entry in os.scandir(self.entries_dir):
+            if not entry.name.endswith(".json") or entry.name.startswith("."):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue  # 被其他进程淘汰
+            entries.append((entry.name[:-len(".json")], stat.st_size, stat.st_mtime))
+        return entries
+
+    @classmethod
+    def make_key(cls, pcm: np.ndarray, signature: Dict) -> str:
+        """
+        计算缓存键
+
+        Args:
+            pcm: 解码后的音频数据（支持内存映射数组）
+            signature: 影响识别结果的模型 ID、版本及参数
+
+        Returns:
+            str: sha256 十六进制摘要
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps(signature, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        h.update(str(pcm.dtype).encode('utf-8'))
+        for start in range(0, len(pcm), cls.HASH_CHUNK_SAMPLES):
+            h.update(np.ascontiguousarray(pcm[start:start + cls.HASH_CHUNK_SAMPLES]).tobytes())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        读取缓存条目（命中时更新条目文件的修改时间，不写统计文件）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            Optional[Dict]: 缓存的结果，未命中时返回 None
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+            os.utime(entry_path)
+            with self._lock:
+                self._pending["hits"] += 1
+            logging.info(f"ASR 缓存命中: {key[:12]}")
+            return result
+        except FileNotFoundError:
+            pass
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"缓存条目损坏，已丢弃: {e}")
+            self._remove(key)
+
+        with self._lock:
+            self._pending["misses"] += 1
+        logging.info(f"ASR 缓存未命中: {key[:12]}")
+        return None
+
+    def put(self, key: str, result: Dict):
+        """
+        写入缓存条目，必要时淘汰旧条目，并合并本进程累计的统计
+
+        Args:
+            key: 缓存键
+            result: 要缓存的结果（需可 JSON 序列化）
+        """
+        self._atomic_write_json(self._entry_path(key), result)
+        with self._file_lock():
+            self._evict()
+        self.flush_stats()
+
+    def _remove(self, key: str):
+        """删除条目"""
+        try:
+            self._entry_path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小不超过上限（调用方持有文件锁）"""
+        entries = self._scan_entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_size_bytes:
+            return
+        for key, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.max_size_bytes:
+                break
+            total -= size
+            self._remove(key)
+            logging.info(f"ASR 缓存淘汰: {key[:12]}")
+
+    def stats(self) -> Dict:
+        """
+        获取缓存统计信息（包括本进程尚未写入的计数）
+
+        Returns:
+            Dict: 条目数、总大小、命中 / 未命中次数和命中率
+        """
+        entries = self._scan_entries()
+        stats = self._read_stats()
+        with self._lock:
+            hits = stats["hits"] + self._pending["hits"]
+            misses = stats["misses"] + self._pending["misses"]
+        return {
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "max_size_bytes": self.max_size_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+# 进程级单例
+_cache: Optional[ASRResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_asr_result_cache(cache_dir: Optional[str] = None, max_size_mb: float = 2048) -> ASRResultCache:
+    """
+    获取进程级 ASR 结果缓存（首次调用时创建）
+
+    Args:
+        cache_dir: 缓存目录，默认 <项目根目录>/cache/asr_results
+        max_size_mb: 缓存总大小上限（MB），仅在首次创建时生效
+
+    Returns:
+        ASRResultCache: 进程内共享的缓存
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if cache_dir is None:
+                    cache_dir = Path(__file__).resolve().parent.parent.parent / "cache" / "asr_results"
+                _cache = ASRResultCache(str(cache_dir), max_size_mb=max_size_mb)
+    return _cache
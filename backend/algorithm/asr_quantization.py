@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+ASR 模型 int8 动态量化
+
+对 Paraformer 的编码器 / 解码器和 CT-Transformer 标点模型中的线性层做
+int8 动态量化，用于纯 CPU 节点推理。量化后的模块缓存在模型目录旁的
+`<模型目录>-int8/` 下，之后直接加载，不再重复量化。
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+QUANT_DIR_SUFFIX = "-int8"
+QUANT_META_FILENAME = "quantize_meta.json"
+
+
+def quantized_cache_dir(model_path: str, fallback_root: Path) -> Path:
+    """
+    获取量化模块的缓存目录
+
+    Args:
+        model_path: 本地模型目录，或远程模型名称
+        fallback_root: 远程模型时缓存目录所在的根目录
+
+    Returns:
+        Path: 缓存目录，本地模型为 <模型目录>-int8
+    """
+    path = Path(model_path)
+    if path.exists():
+        return path.with_name(path.name + QUANT_DIR_SUFFIX)
+    return fallback_root / (path.name + QUANT_DIR_SUFFIX)
+
+
+def _source_signature(model_path: str) -> Dict:
+    """源模型签名，源模型或 torch 版本变化时缓存失效"""
+    signature = {"torch_version": torch.__version__, "model_path": str(model_path)}
+    weights = Path(model_path) / "model.pt"
+    if weights.exists():
+        stat = weights.stat()
+        signature["model_size"] = stat.st_size
+        signature["model_mtime"] = stat.st_mtime
+    return signature
+
+
+def _quantize(module: torch.nn.Module) -> torch.nn.Module:
+    """对线性层做 int8 动态量化"""
+    return torch.ao.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_or_quantize(module: torch.nn.Module, name: str, model_path: str, cache_dir: Path) -> torch.nn.Module:
+    """
+    加载缓存的量化模块，缓存不存在或已失效时重新量化并写入缓存
+
+    Args:
+        module: 原始 fp32 模块
+        name: 模块名称（作为缓存文件名）
+        model_path: 模块所属模型的目录或名称
+        cache_dir: 缓存目录
+
+    Returns:
+        torch.nn.Module: 量化后的模块
+    """
+    cache_file = cache_dir / f"{name}.pt"
+    meta_file = cache_dir / QUANT_META_FILENAME
+    signature = _source_signature(model_path)
+
+    meta = {}
+    if meta_file.exists():
+        try:
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            meta = {}
+
+    if cache_file.exists() and meta.get(name) == signature:
+        try:
+            # 以内存映射方式加载，预加载后 fork 的工作进程共享同一份只读权重页
+            try:
+                quantized = torch.load(cache_file, map_location="cpu", weights_only=False, mmap=True)
+            except TypeError:
+                # torch < 2.1 不支持 mmap 参数
+                quantized = torch.load(cache_file, map_location="cpu", weights_only=False)
+            logging.info(f"加载已缓存的 int8 模块: {cache_file}")
+            return quantized
+        except Exception as e:
+            logging.warning(f"量化缓存加载失败，将重新量化: {e}")
+
+    logging.info(f"正在对 {name} 做 int8 动态量化...")
+    quantized = _quantize(module)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        torch.save(quantized, cache_file)
+        meta[name] = signature
+        with open(meta_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        logging.info(f"int8 模块已缓存到: {cache_file}")
+    except Exception as e:
+        logging.warning(f"量化模块缓存写入失败: {e}")
+    return quantized
+
+
+def quantize_paraformer_pipeline(auto_model, paraformer_path: str, punc_path: Optional[str],
+                                 fallback_root: Path):
+    """
+    对 FunASR AutoModel 中的 Paraformer 编码器 / 解码器和标点模型做 int8 动态量化
+
+    Args:
+        auto_model: 已加载的 FunASR AutoModel（含标点模型）
+        paraformer_path: Paraformer 模型目录或名称
+        punc_path: 标点模型目录或名称
+        fallback_root: 远程模型量化缓存的根目录
+
+    Returns:
+        原 AutoModel 实例（模块已原地替换为量化版本）
+    """
+    asr_cache_dir = quantized_cache_dir(paraformer_path, fallback_root)
+    model = auto_model.model
+    model.encoder = load_or_quantize(model.encoder, "encoder", paraformer_path, asr_cache_dir)
+    model.decoder = load_or_quantize(model.decoder, "decoder", paraformer_path, asr_cache_dir)
+
+    if punc_path and getattr(auto_model, "punc_model", None) is not None:
+        punc_cache_dir = quantized_cache_dir(punc_path, fallback_root)
+        auto_model.punc_model = load_or_quantize(auto_model.punc_model, "punc", punc_path, punc_cache_dir)
+
+    logging.info("Paraformer / 标点模型 int8 量化完成")
+    return auto_model
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+大体积 ASR 结果文件的增量读取
+
+全天录音的 *_asr_result.json 可达数百 MB，json.load 需要把整个文件连同全部句子 dict
+一次性载入内存。本模块提供：
+
+- iter_transcript：按块读取文件，逐个产出 transcript 中的句子，内存占用与文件大小无关
+- 旁路头文件 <名称>.header.json：记录句子数、时长、视频路径等元信息以及对应 JSON 文件的
+  大小和修改时间；只需要元信息的调用方读取头文件即可，不解析转录内容
+
+ASR 结果文件的结构为 [{"transcript": [...], "video_path": ..., ...}] 或不带外层数组的对象。
+"""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+HEADER_VERSION = 1
+READ_CHUNK_CHARS = 1 << 20
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _StreamReader:
+    """按块读取文本并逐个解码 JSON 值的缓冲读取器"""
+
+    def __init__(self, f, chunk_chars: Optional[int] = None):
+        self.f = f
+        self.chunk_chars = chunk_chars or READ_CHUNK_CHARS
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_chars: int = 0) -> bool:
+        """
+        读入下一块，并继续读入直到未消费部分不少于 min_chars，已到文件末尾时返回 False
+
+        读入的块先收集再一次性拼接，避免每块都复制一遍缓冲区
+        """
+        if self.eof:
+            return False
+        chunks, available = [], len(self.buf) - self.pos
+        while not chunks or available < min_chars:
+            chunk = self.f.read(self.chunk_chars)
+            if not chunk:
+                self.eof = True
+                break
+            chunks.append(chunk)
+            available += len(chunk)
+        if not chunks:
+            return False
+        # 已消费的部分超过一块时丢弃，保持缓冲区大小有界
+        if self.pos > self.chunk_chars:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += "".join(chunks)
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符（文件结束时返回空字符串）"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, char: str):
+        """消费指定字符"""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"ASR 结果文件格式错误：期望 {char!r}，实际 {found!r}（位置 {self.pos}）")
+        self.pos += 1
+
+    def decode(self):
+        """
+        解码下一个完整的 JSON 值，缓冲区不足时继续读入
+
+        解码失败后未消费部分至少翻倍再重试，单个很大的值总的解码开销与其大小成线性关系，
+        而不是每读入一块就从头解码一次
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                # 数字等标量可能被块边界截断，需确认其后还有字符或已到文件末尾
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            if not self._fill(2 * (len(self.buf) - self.pos)):
+                # 文件已结束，按现有内容最后解码一次
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+                self.pos = end
+                return value
+
+
+def _iter_events(reader: _StreamReader, stop_after_transcript: bool = False) -> Iterator[Tuple[str, object]]:
+    """
+    逐个产出顶层对象的字段
+
+    Yields:
+        ("item", 句子) 或 ("field", (键, 值))
+    """
+    if reader.peek() == "[":
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+    reader.expect("{")
+
+    first = True
+    while True:
+        if reader.peek() == "}":
+            return
+        if not first:
+            reader.expect(",")
+        first = False
+        key = reader.decode()
+        reader.expect(":")
+
+        if key == "transcript" and reader.peek() == "[":
+            reader.expect("[")
+            first_item = True
+            while reader.peek() != "]":
+                if not first_item:
+                    reader.expect(",")
+                first_item = False
+                yield "item", reader.decode()
+            reader.expect("]")
+            if stop_after_transcript:
+                return
+        else:
+            yield "field", (key, reader.decode())
+
+
+def iter_transcript(asr_result_path) -> Iterator[Dict]:
+    """
+    逐个读取 ASR 结果文件中的句子
+
+    Args:
+        asr_result_path: *_asr_result.json 路径
+
+    Yields:
+        Dict: 统一格式的句子
+    """
+    with open(asr_result_path, 'r', encoding='utf-8') as f:
+        for kind, value in _iter_events(_StreamReader(f), stop_after_transcript=True):
+            if kind == "item":
+                yield value
+
+
+def header_path(asr_result_path) -> Path:
+    """ASR 结果文件对应的头文件路径"""
+    path = Path(asr_result_path)
+    return path.with_name(f"{path.stem}.header.json")
+
+
+def _file_signature(asr_result_path) -> Dict:
+    stat = os.stat(asr_result_path)
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def build_header(asr_result: Dict) -> Dict:
+    """
+    由内存中的 ASR 结果生成元信息
+
+    Args:
+        asr_result: 统一格式的 ASR 结果（dict）
+
+    Returns:
+        Dict: 头文件内容（不含源文件签名）
+    """
+    transcript = asr_result.get("transcript") or []
+    return {
+        "version": HEADER_VERSION,
+        "format": "v2" if transcript else "v1",
+        "total_segments": len(transcript),
+        "duration": transcript[-1].get("end_time", 0) if transcript else 0,
+        "speakers": len({item.get("spk_id") for item in transcript if item.get("spk_id") is not None}),
+        "video_path": asr_result.get("video_path"),
+        "processed_at": asr_result.get("processed_at"),
+        "text_stats": asr_result.get("text_stats", {}),
+    }
+
+
+def _scan_header(asr_result_path) -> Dict:
+    """流式扫描整个文件生成元信息（没有头文件的旧结果使用）"""
+    total, last_end, speakers, fields = 0, 0, set(), {}
+    with open(asr_result_path, 'r', encoding='utf-8') as f:
+        for kind, value in _iter_events(_StreamReader(f)):
+            if kind == "item":
+                total += 1
+                last_end = value.get("end_time", 0)
+                if value.get("spk_id") is not None:
+                    speakers.add(value["spk_id"])
+            elif value[0] in ("video_path", "processed_at", "text_stats"):
+                fields[value[0]] = value[1]
+    return {
+        "version": HEADER_VERSION,
+        "format": "v2" if total else "v1",
+        "total_segments": total,
+        "duration": last_end,
+        "speakers": len(speakers),
+        "video_path": fields.get("video_path"),
+        "processed_at": fields.get("processed_at"),
+        "text_stats": fields.get("text_stats", {}),
+    }
+
+
+def write_header(asr_result_path, header: Dict) -> Path:
+    """
+    写入头文件（需在 ASR 结果文件写完之后调用，以记录其大小和修改时间）
+
+    Args:
+        asr_result_path: *_asr_result.json 路径
+        header: build_header 的结果
+
+    Returns:
+        Path: 头文件路径
+    """
+    path = header_path(asr_result_path)
+    # 唯一的临时文件：API 请求可能同时重建同一个头文件
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({**header, **_file_signature(asr_result_path)}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return path
+
+
+def read_header(asr_result_path, rebuild: bool = True) -> Optional[Dict]:
+    """
+    读取 ASR 结果的元信息
+
+    头文件缺失或与 ASR 结果文件不一致（文件被修改过）时，rebuild 为 True 则流式扫描一遍
+    结果文件重新生成并写回头文件，否则返回 None。
+
+    Args:
+        asr_result_path: *_asr_result.json 路径
+        rebuild: 头文件不可用时是否重新生成
+
+    Returns:
+        Optional[Dict]: 元信息
+    """
+    try:
+        with open(header_path(asr_result_path), 'r', encoding='utf-8') as f:
+            header = json.load(f)
+        signature = _file_signature(asr_result_path)
+        if header.get("version") == HEADER_VERSION and all(header.get(k) == v for k, v in signature.items()):
+            return header
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    if not rebuild:
+        return None
+    logging.info(f"ASR 结果头文件不可用，流式扫描生成: {asr_result_path}")
+    header = _scan_header(asr_result_path)
+    try:
+        write_header(asr_result_path, header)
+    except OSError as e:
+        logging.warning(f"写入 ASR 结果头文件失败: {e}")
+    return header
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+单视频分片并行识别
+
+长录音按 VAD 静音处切分为若干分片，每个分片在独立的工作进程中识别，
+最后合并为与整段识别相同格式的转录结果：
+- 句子序号全局连续，时间戳换算为整段音频时间
+- 各分片独立聚类得到的说话人，通过比较 CAM++ 说话人向量统一为全局说话人 ID
+
+工作进程直接以内存映射方式读取任务目录中的 audio_16k.npy，分片音频不经过进程间传输。
+SpeakerReconciler 也用于流式识别，逐个窗口统一说话人 ID；diarize_in_windows 用它
+按窗口做说话人分离，每次只把一个窗口转换为 float32。
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from audio_ingest import to_float32
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def plan_shards(segments_ms: Sequence[Sequence[float]], total_samples: int, num_shards: int,
+                sample_rate: int) -> List[Tuple[int, int]]:
+    """
+    按 VAD 静音处规划分片边界
+
+    对每个等分点，选择离它最近的静音间隔中点作为切点；找不到静音时在等分点硬切。
+
+    Args:
+        segments_ms: VAD 片段 [[start_ms, end_ms], ...]
+        total_samples: 音频总样本数
+        num_shards: 目标分片数
+        sample_rate: 采样率
+
+    Returns:
+        List[Tuple[int, int]]: 每个分片的 [起始样本, 结束样本)
+    """
+    if num_shards <= 1 or total_samples == 0:
+        return [(0, total_samples)]
+
+    segments = sorted(segments_ms)
+    gaps = np.array([
+        (segments[i][1] + segments[i + 1][0]) / 2 * sample_rate / 1000
+        for i in range(len(segments) - 1)
+        if segments[i][1] >= 0 and segments[i + 1][0] > segments[i][1]
+    ])
+
+    cuts = []
+    for k in range(1, num_shards):
+        target = total_samples * k / num_shards
+        cut = int(gaps[np.argmin(np.abs(gaps - target))]) if len(gaps) else int(target)
+        if (not cuts or cut > cuts[-1]) and 0 < cut < total_samples:
+            cuts.append(cut)
+
+    bounds = [0] + cuts + [total_samples]
+    return [(bounds[i], bounds[i + 1]) for i in range(len(bounds) - 1)]
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    denom = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(np.dot(a, b) / denom) if denom else 0.0
+
+
+class SpeakerReconciler:
+    """
+    逐段把局部说话人映射为全局说话人
+
+    按段落顺序处理：每个局部说话人与已有全局说话人的向量均值比较余弦相似度，
+    相似度最高且超过阈值时归入该全局说话人（同一段内的说话人不会归入同一个全局说话人），
+    否则新建全局说话人。每段的映射只取决于它之前的段落，可用于分片识别结束后统一处理，
+    也可用于流式识别中逐个窗口处理。
+    """
+
+    def __init__(self, threshold: float = 0.5):
+        """
+        Args:
+            threshold: 判定为同一说话人的最低余弦相似度
+        """
+        self.threshold = threshold
+        # 全局说话人的向量之和（没有向量的说话人为 None，不参与匹配）
+        self.centroids: List[Optional[np.ndarray]] = []
+        self.counts: List[int] = []
+
+    def add(self, embeddings: Dict[str, Optional[List[float]]]) -> Dict[str, str]:
+        """
+        处理下一段的说话人
+
+        Args:
+            embeddings: {局部说话人 ID: CAM++ 向量}，向量缺失时为 None
+
+        Returns:
+            Dict[str, str]: {局部说话人 ID: 全局说话人 ID}
+        """
+        mapping: Dict[str, str] = {}
+        candidates = []
+        for local_id, vector in embeddings.items():
+            if vector is None:
+                continue
+            vector = np.asarray(vector, dtype=np.float64)
+            for global_idx, centroid in enumerate(self.centroids):
+                if centroid is None:
+                    continue
+                similarity = _cosine(vector, centroid / self.counts[global_idx])
+                if similarity >= self.threshold:
+                    candidates.append((similarity, local_id, global_idx))
+
+        # 相似度从高到低一一配对
+        used = set()
+        for similarity, local_id, global_idx in sorted(candidates, key=lambda c: -c[0]):
+            if local_id in mapping or global_idx in used:
+                continue
+            mapping[local_id] = str(global_idx)
+            used.add(global_idx)
+
+        for local_id, vector in embeddings.items():
+            if local_id in mapping:
+                global_idx = int(mapping[local_id])
+                self.centroids[global_idx] = self.centroids[global_idx] + np.asarray(vector, dtype=np.float64)
+                self.counts[global_idx] += 1
+            else:
+                mapping[local_id] = str(len(self.centroids))
+                self.centroids.append(np.asarray(vector, dtype=np.float64) if vector is not None else None)
+                self.counts.append(1)
+        return mapping
+
+
+def reconcile_speakers(shard_embeddings: List[Dict[str, Optional[List[float]]]],
+                       threshold: float = 0.5) -> List[Dict[str, str]]:
+    """
+    把各分片的局部说话人映射为全局说话人（见 SpeakerReconciler）
+
+    Args:
+        shard_embeddings: 每个分片的 {局部说话人 ID: CAM++ 向量}
+        threshold: 判定为同一说话人的最低余弦相似度
+
+    Returns:
+        List[Dict[str, str]]: 每个分片的 {局部说话人 ID: 全局说话人 ID}
+    """
+    reconciler = SpeakerReconciler(threshold)
+    return [reconciler.add(embeddings) for embeddings in shard_embeddings]
+
+
+def merge_shard_transcripts(shard_transcripts: List[List[Dict]],
+                            speaker_maps: List[Dict[str, str]]) -> List[Dict]:
+    """
+    合并各分片的转录结果
+
+    Args:
+        shard_transcripts: 每个分片的句子列表（时间戳已是整段音频时间）
+        speaker_maps: 每个分片的 {局部说话人 ID: 全局说话人 ID}
+
+    Returns:
+        List[Dict]: 序号全局连续、说话人 ID 全局一致的句子列表
+    """
+    merged = []
+    for transcript, speaker_map in zip(shard_transcripts, speaker_maps):
+        for sentence in transcript:
+            spk_id = sentence.get("spk_id")
+            merged.append({
+                **sentence,
+                "index": len(merged) + 1,
+                "spk_id": speaker_map.get(spk_id, spk_id) if spk_id is not None else None,
+            })
+    return merged
+
+
+def diarize_in_windows(pcm: np.ndarray, sample_rate: int, window_s: float,
+                       diarize: Callable[[np.ndarray], List[Dict]],
+                       embed: Optional[Callable[[np.ndarray], Optional[List[float]]]],
+                       embed_max_s: float = 30.0, threshold: float = 0.5) -> List[Dict]:
+    """
+    按窗口做说话人分离，跨窗口统一说话人 ID
+
+    每个窗口只在送入模型前从（内存映射的）int16 音频转换为 float32，内存占用与窗口长度有关，
+    与整段录音长度无关。多个窗口时，每个窗口内的说话人取最多 embed_max_s 秒的语音计算 CAM++ 向量，
+    由 SpeakerReconciler 映射为全局说话人；只有一个窗口时保留模型输出的说话人标签。
+
+    Args:
+        pcm: 整段 int16 音频（内存映射数组）
+        sample_rate: 采样率
+        window_s: 窗口时长（秒）
+        diarize: 说话人分离函数，输入 float32 窗口音频，返回 [{"spk", "start", "end"}, ...]（窗口内时间，秒）
+        embed: 说话人向量函数，输入 float32 音频，返回向量（失败时返回 None 或抛出异常）；
+            为 None 时各窗口的说话人不做合并
+        embed_max_s: 每个说话人用于计算向量的最长语音（秒）
+        threshold: 判定为同一说话人的最低余弦相似度
+
+    Returns:
+        List[Dict]: 整段音频时间的说话人分段 [{"spk", "start", "end"}, ...]
+    """
+    window = max(1, int(window_s * sample_rate))
+    starts = list(range(0, len(pcm), window))
+    reconciler = SpeakerReconciler(threshold)
+    merged = []
+    for lo in starts:
+        audio = to_float32(pcm[lo:lo + window])
+        segments = diarize(audio) or []
+
+        mapping = None
+        if len(starts) > 1:
+            pieces: Dict[str, List[np.ndarray]] = {}
+            for seg in segments:
+                spk = str(seg["spk"])
+                taken = sum(len(piece) for piece in pieces.get(spk, []))
+                if taken < embed_max_s * sample_rate:
+                    pieces.setdefault(spk, []).append(
+                        audio[int(seg["start"] * sample_rate):int(seg["end"] * sample_rate)])
+            embeddings = {}
+            for spk, spk_pieces in pieces.items():
+                if embed is None:
+                    embeddings[spk] = None
+                    continue
+                try:
+                    embeddings[spk] = embed(np.concatenate(spk_pieces)[:int(embed_max_s * sample_rate)])
+                except Exception as e:
+                    logging.warning(f"说话人 {spk} 向量计算失败: {str(e)}")
+                    embeddings[spk] = None
+            mapping = reconciler.add(embeddings)
+
+        offset = lo / sample_rate
+        for seg in segments:
+            merged.append({
+                **seg,
+                "spk": mapping.get(str(seg["spk"]), seg["spk"]) if mapping is not None else seg["spk"],
+                "start": float(seg["start"]) + offset,
+                "end": float(seg["end"]) + offset,
+            })
+    return merged
+
+
+# 工作进程内的引擎实例（每个进程只创建一次）
+_shard_engine = None
+
+
+def _init_shard_worker(engine_factory: Callable, num_threads: int):
+    """工作进程初始化：限制线程数并加载引擎"""
+    global _shard_engine
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["MKL_NUM_THREADS"] = str(num_threads)
+
+    _shard_engine = engine_factory()
+
+    import torch
+    torch.set_num_threads(num_threads)
+    logging.info(f"分片工作进程 {os.getpid()} 启动，torch 线程数: {num_threads}")
+
+
+def _transcribe_shard(audio_path: str, start_sample: int, end_sample: int) -> Dict:
+    """在工作进程中识别单个分片"""
+    pcm = np.load(audio_path, mmap_mode='r')[start_sample:end_sample]
+    return _shard_engine.transcribe_shard(pcm, start_sample)
+
+
+def create_shard_executor(engine_factory: Callable, workers: int,
+                          threads_per_worker: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    创建分片工作进程池
+
+    每个工作进程启动时各自加载一次完整的模型（ASR / VAD / 标点 / CAM++），冷启动耗时和内存
+    都是单进程的 workers 倍。需要识别多个长视频时应复用同一个进程池，只在第一次付出冷启动代价。
+
+    Args:
+        engine_factory: 在工作进程中创建引擎的可序列化工厂（引擎需实现 transcribe_shard）
+        workers: 工作进程数
+        threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+
+    Returns:
+        ProcessPoolExecutor: 分片工作进程池
+    """
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    logging.info(f"启动分片工作进程池: {workers} 个工作进程，每个 {threads_per_worker} 个线程")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_shard_worker,
+        initargs=(engine_factory, threads_per_worker),
+    )
+
+
+def run_shards(engine_factory: Callable, audio_path: str, shards: List[Tuple[int, int]],
+               workers: int, threads_per_worker: Optional[int] = None,
+               executor: Optional[ProcessPoolExecutor] = None) -> List[Dict]:
+    """
+    在多个工作进程中并行识别各分片
+
+    Args:
+        engine_factory: 在工作进程中创建引擎的可序列化工厂（引擎需实现 transcribe_shard）
+        audio_path: 任务目录中的 int16 .npy 音频
+        shards: plan_shards 规划的分片边界
+        workers: 工作进程数
+        threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+        executor: 复用的分片工作进程池（见 create_shard_executor），不指定时临时创建
+
+    Returns:
+        List[Dict]: 按分片顺序排列的 transcribe_shard 结果
+    """
+    logging.info(f"分片并行识别: {len(shards)} 个分片")
+    if executor is not None:
+        futures = [executor.submit(_transcribe_shard, str(audio_path), start, end) for start, end in shards]
+        return [future.result() for future in futures]
+
+    workers = max(1, min(workers, len(shards)))
+    with create_shard_executor(engine_factory, workers, threads_per_worker) as executor:
+        return run_shards(engine_factory, audio_path, shards, workers, executor=executor)
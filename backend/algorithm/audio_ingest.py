@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+音频提取模块
+
+使用 ffmpeg 管道将视频中的音频解码为 16kHz 单声道 PCM，
+写入任务目录下的 .npy 文件并以内存映射方式读取。
+ASR、说话人分离以及重跑都复用同一份音频，每个任务只解封装一次视频。
+"""
+
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SAMPLE_RATE = 16000
+AUDIO_FILENAME = "audio_16k.npy"
+AUDIO_META_FILENAME = "audio_16k.json"
+
+
+def iter_pcm_blocks(video_path: str, block_s: float, sample_rate: int = SAMPLE_RATE) -> Iterator[np.ndarray]:
+    """
+    通过 ffmpeg 管道按块读取单声道 int16 PCM
+
+    Args:
+        video_path: 视频文件路径
+        block_s: 每块时长（秒）
+        sample_rate: 目标采样率
+
+    Yields:
+        np.ndarray: int16 音频块
+    """
+    command = [
+        'ffmpeg', '-nostdin', '-loglevel', 'error',
+        '-i', str(video_path), '-vn', '-ac', '1', '-ar', str(sample_rate),
+        '-f', 's16le', '-',
+    ]
+    block_bytes = int(block_s * sample_rate) * 2
+    # stderr 写入临时文件而不是管道：stdout 读完之前不读取 stderr，
+    # ffmpeg 输出大量警告填满 stderr 管道缓冲区后会阻塞，与读取 stdout 的一方互相等待
+    stderr_file = tempfile.TemporaryFile()
+    try:
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr_file)
+    except FileNotFoundError:
+        stderr_file.close()
+        logging.error("错误: 'ffmpeg' 未找到。请确保 ffmpeg 已安装并处于系统的 PATH 中。")
+        raise
+
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.int16)
+        proc.wait()
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode('utf-8', errors='ignore')
+            raise RuntimeError(f"ffmpeg 音频解码失败: {stderr}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        stderr_file.close()
+
+
+def to_float32(pcm: np.ndarray) -> np.ndarray:
+    """将 int16 PCM 转换为取值范围 [-1, 1] 的 float32"""
+    return pcm.astype(np.float32) / 32768.0
+
+
+class AudioIngest:
+    """
+    单个任务的音频提取阶段
+
+    功能特性：
+    - ffmpeg 直接输出 16kHz 单声道 PCM，不经过临时 WAV
+    - 指定任务目录时写入 audio_16k.npy，之后以 mmap 方式复用
+    - 记录源视频大小和修改时间，视频变化后自动重新提取
+    - 未指定任务目录时在内存中解码
+    """
+
+    def __init__(self, video_path: str, task_dir: Optional[str] = None, sample_rate: int = SAMPLE_RATE):
+        """
+        初始化音频提取阶段
+
+        Args:
+            video_path: 视频文件路径
+            task_dir: 任务输出目录，为 None 时只在内存中解码
+            sample_rate: 目标采样率
+        """
+        self.video_path = str(video_path)
+        self.task_dir = Path(task_dir) if task_dir else None
+        self.sample_rate = sample_rate
+        self._pcm = None
+
+    @property
+    def npy_path(self) -> Optional[Path]:
+        """音频缓存文件路径"""
+        return self.task_dir / AUDIO_FILENAME if self.task_dir else None
+
+    @property
+    def meta_path(self) -> Optional[Path]:
+        """音频缓存元信息路径"""
+        return self.task_dir / AUDIO_META_FILENAME if self.task_dir else None
+
+    def _source_signature(self) -> Dict:
+        """源视频签名，用于判断缓存是否过期"""
+        stat = os.stat(self.video_path)
+        return {
+            "video_path": os.path.abspath(self.video_path),
+            "video_size": stat.st_size,
+            "video_mtime": stat.st_mtime,
+            "sample_rate": self.sample_rate,
+        }
+
+    def is_cached(self) -> bool:
+        """任务目录中是否已有与源视频一致的音频"""
+        if not self.npy_path or not self.npy_path.exists() or not self.meta_path.exists():
+            return False
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return False
+        signature = self._source_signature()
+        return all(meta.get(key) == value for key, value in signature.items())
+
+    def _extract_to_npy(self):
+        """将 ffmpeg 输出流式写入 .npy 文件"""
+        self.task_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.npy_path.with_suffix(".npy.tmp")
+
+        def write_header(f, num_samples):
+            np.lib.format.write_array_header_1_0(f, {
+                'descr': np.dtype(np.int16).str,
+                'fortran_order': False,
+                'shape': (num_samples,),
+            })
+
+        num_samples = 0
+        with open(tmp_path, 'wb') as f:
+            # 先写占位头，结束后回填实际长度（头部长度固定对齐到 64 字节）
+            write_header(f, 0)
+            header_len = f.tell()
+            for block in iter_pcm_blocks(self.video_path, block_s=30, sample_rate=self.sample_rate):
+                f.write(block.astype('<i2', copy=False).tobytes())
+                num_samples += len(block)
+            f.seek(0)
+            write_header(f, num_samples)
+            if f.tell() != header_len:
+                raise RuntimeError("音频文件头长度变化，无法回填")
+
+        os.replace(tmp_path, self.npy_path)
+        meta = self._source_signature()
+        meta["num_samples"] = num_samples
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    def ensure(self) -> Optional[Path]:
+        """
+        确保任务目录中存在音频缓存，必要时提取
+
+        Returns:
+            Optional[Path]: 音频文件路径，未指定任务目录时为 None
+        """
+        if self.task_dir is None:
+            return None
+        if self.is_cached():
+            logging.info(f"复用已提取的音频: {self.npy_path}")
+        else:
+            logging.info(f"正在提取音频: {self.video_path} -> {self.npy_path}")
+            self._extract_to_npy()
+            logging.info(f"音频提取完成: {self.npy_path}")
+        return self.npy_path
+
+    def load(self) -> np.ndarray:
+        """
+        获取 int16 PCM 数据
+
+        指定任务目录时返回内存映射数组，否则在内存中解码。
+
+        Returns:
+            np.ndarray: int16 单声道音频
+        """
+        if self._pcm is None:
+            if self.task_dir is not None:
+                self._pcm = np.load(self.ensure(), mmap_mode='r')
+            else:
+                logging.info(f"正在提取音频（内存）: {self.video_path}")
+                blocks = list(iter_pcm_blocks(self.video_path, block_s=30, sample_rate=self.sample_rate))
+                self._pcm = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.int16)
+            logging.info(f"音频时长: {len(self._pcm) / self.sample_rate:.1f}s")
+        return self._pcm
+
+    def load_float32(self) -> np.ndarray:
+        """获取 float32 音频数据（供模型直接推理）"""
+        return to_float32(self.load())
+
+    def iter_blocks(self, block_s: float) -> Iterator[np.ndarray]:
+        """
+        按块读取 float32 音频
+
+        已缓存到任务目录时从内存映射中切片，否则直接读取 ffmpeg 管道，
+        两种方式内存占用都只与块大小有关。
+
+        Args:
+            block_s: 每块时长（秒）
+
+        Yields:
+            np.ndarray: float32 音频块
+        """
+        if self.task_dir is None and self._pcm is None:
+            for block in iter_pcm_blocks(self.video_path, block_s, self.sample_rate):
+                yield to_float32(block)
+            return
+
+        pcm = self.load()
+        block_samples = int(block_s * self.sample_rate)
+        for start in range(0, len(pcm), block_samples):
+            yield to_float32(pcm[start:start + block_samples])
+
+    @property
+    def duration(self) -> float:
+        """音频时长（秒）"""
+        return len(self.load()) / self.sample_rate
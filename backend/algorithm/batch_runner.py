@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+ASR 批量处理执行器
+
+为各 ASR 引擎的 process_videos 提供多进程批量模式：
+- 每个工作进程只加载一次模型，并按配置限制 torch 线程数
+- 工作进程中的引擎沿用当前引擎的构造参数（引擎实现 engine_kwargs 时）
+- 结果按输入顺序增量写入输出 JSON，不在内存中累积全部结果；同时提交的任务数有上限，
+  已完成但尚未写出的结果最多只有这么多份
+"""
+
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm']
+
+
+def find_video_files(video_dir: str) -> List[Path]:
+    """
+    查找目录下的视频文件
+
+    Args:
+        video_dir: 视频目录路径
+
+    Returns:
+        List[Path]: 视频文件列表
+    """
+    video_dir = Path(video_dir)
+    if not video_dir.exists():
+        raise FileNotFoundError(f"视频目录不存在: {video_dir}")
+
+    video_files = []
+    for ext in VIDEO_EXTENSIONS:
+        video_files.extend(video_dir.glob(f"*{ext}"))
+
+    if not video_files:
+        raise FileNotFoundError(f"未找到视频文件: {video_dir}")
+
+    logging.info(f"找到 {len(video_files)} 个视频文件")
+    return video_files
+
+
+def summarize_result(result: Dict) -> Dict:
+    """提取结果摘要（不含完整转录文本）"""
+    return {
+        "video_path": result.get("video_path"),
+        "processed_at": result.get("processed_at"),
+        "text_stats": result.get("text_stats", {}),
+    }
+
+
+class IncrementalJSONWriter:
+    """
+    增量写入 JSON 数组
+
+    每写入一条结果立即落盘，关闭后文件内容与一次性 json.dump 列表的格式一致。
+    """
+
+    def __init__(self, output_file: str):
+        self.output_path = Path(output_file)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+        self._file.write('[')
+        self._count = 0
+
+    def write(self, result: Dict):
+        """追加一条结果"""
+        self._file.write(',\n' if self._count else '\n')
+        self._file.write(json.dumps(result, ensure_ascii=False, indent=2))
+        self._file.flush()
+        self._count += 1
+
+    def close(self):
+        """结束数组并关闭文件"""
+        if self._file.closed:
+            return
+        self._file.write('\n]' if self._count else ']')
+        self._file.close()
+        logging.info(f"结果已保存到: {self.output_path}（共 {self._count} 条）")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# 工作进程内的引擎实例（每个进程只创建一次）
+_worker_engine = None
+
+
+def _init_worker(engine_factory: Callable, num_threads: int):
+    """工作进程初始化：限制线程数并加载引擎"""
+    global _worker_engine
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["MKL_NUM_THREADS"] = str(num_threads)
+
+    _worker_engine = engine_factory()
+
+    # 引擎可能按本机调优配置设置了线程数，这里以批量模式分配的线程预算为准
+    import torch
+    torch.set_num_threads(num_threads)
+    logging.info(f"工作进程 {os.getpid()} 启动，torch 线程数: {num_threads}")
+
+
+def _process_in_worker(video_path: str) -> Dict:
+    """在工作进程中处理单个视频，返回可序列化的结果"""
+    result = _worker_engine.devour_video(video_path)
+    return _worker_engine.to_serializable(result)
+
+
+def engine_factory_for(engine, num_threads: Optional[int] = None) -> Callable:
+    """
+    在工作进程中重建与 engine 配置相同的引擎的可序列化工厂
+
+    Args:
+        engine: 当前进程中的引擎实例；实现 engine_kwargs() 时沿用其构造参数
+        num_threads: 工作进程的线程预算，引擎构造参数包含 num_threads 时替换为该值
+
+    Returns:
+        Callable: functools.partial(引擎类型, **构造参数)
+    """
+    kwargs = dict(engine.engine_kwargs()) if hasattr(engine, "engine_kwargs") else {}
+    if num_threads is not None and "num_threads" in kwargs:
+        kwargs["num_threads"] = num_threads
+    return partial(type(engine), **kwargs)
+
+
+def ordered_results(submit: Callable[[object], Future], items: Iterable,
+                    max_in_flight: int) -> Iterator[Tuple[object, Future]]:
+    """
+    按输入顺序产出已提交任务的 (输入, Future)，同时提交的任务不超过 max_in_flight 个
+
+    每取走一个结果才提交下一个任务，产出后不再持有该 Future，
+    已完成但尚未处理的结果不会随批量大小增长。
+
+    Args:
+        submit: 提交单个任务的函数，返回 Future
+        items: 输入序列
+        max_in_flight: 同时提交的任务数上限
+    """
+    items = iter(items)
+    pending = deque()
+
+    def submit_next() -> bool:
+        for item in items:
+            pending.append((item, submit(item)))
+            return True
+        return False
+
+    for _ in range(max(1, max_in_flight)):
+        if not submit_next():
+            break
+    while pending:
+        yield pending.popleft()
+        submit_next()
+
+
+def run_batch(engine, video_files: List[Path], workers: int = 1,
+              threads_per_worker: Optional[int] = None,
+              output_file: Optional[str] = None, max_in_flight: Optional[int] = None) -> List[Dict]:
+    """
+    批量处理视频
+
+    Args:
+        engine: 当前进程中的引擎实例（单进程模式直接使用，多进程模式按其配置在工作进程中重建）
+        video_files: 视频文件列表
+        workers: 工作进程数，1 表示在当前进程中串行处理
+        threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+        output_file: 输出 JSON 路径；指定时结果增量写入文件，返回值只包含摘要
+        max_in_flight: 多进程模式下同时提交的视频数上限，默认为工作进程数的 2 倍
+
+    Returns:
+        List[Dict]: 按输入顺序排列的可序列化结果（to_serializable，指定 output_file 时为摘要列表），
+            失败的视频不包含在内
+    """
+    writer = IncrementalJSONWriter(output_file) if output_file else None
+    results = []
+
+    def collect(video_file, result):
+        if writer:
+            writer.write(result)
+            results.append(summarize_result(result))
+        else:
+            results.append(result)
+        logging.info(f"✅ 完成: {Path(video_file).name}")
+
+    try:
+        if workers <= 1:
+            for video_file in video_files:
+                try:
+                    result = engine.devour_video(str(video_file))
+                    # 与多进程模式返回相同形式的结果
+                    collect(video_file, engine.to_serializable(result))
+                except Exception as e:
+                    logging.error(f"❌ 失败: {Path(video_file).name} - {str(e)}")
+            return results
+
+        if threads_per_worker is None:
+            threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+        logging.info(f"多进程批量模式: {workers} 个工作进程，每个 {threads_per_worker} 个线程")
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(engine_factory_for(engine, threads_per_worker), threads_per_worker),
+        ) as executor:
+            # 按输入顺序收集：输出与视频顺序一致，与完成先后无关；
+            # 同时提交的视频有上限，写出后即释放结果
+            in_order = ordered_results(
+                lambda f: executor.submit(_process_in_worker, str(f)),
+                video_files, max_in_flight or 2 * workers,
+            )
+            for video_file, future in in_order:
+                try:
+                    collect(video_file, future.result())
+                except Exception as e:
+                    logging.error(f"❌ 失败: {Path(video_file).name} - {str(e)}")
+                del future
+        return results
+    finally:
+        if writer:
+            writer.close()
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+旧格式（v1）词级别说话人切分基准测试
+
+生成合成的 segments / speakers 数据，分别用逐词扫描全部说话人片段的原实现和
+ASRProcessor 中基于二分查找的实现切分对话，输出两者耗时并确认结果完全一致。
+
+用法：
+    python backend/algorithm/benchmark_speaker_dialogue.py --words 100000 --turns 2000
+"""
+
+import argparse
+import logging
+import random
+import time
+from typing import Dict, List
+
+from data_processor import ASRProcessor
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def legacy_speaker_dialogue(segments: List[Dict], speakers: List[Dict]) -> List[Dict]:
+    """原实现：每个词线性扫描全部说话人片段（作为对照）"""
+    dialogue = []
+    for segment in segments:
+        if 'words' not in segment or not segment['words']:
+            max_overlap = 0
+            best_speaker = "UNKNOWN_SPEAKER"
+            for turn in speakers:
+                overlap = min(segment['end'], turn['end']) - max(segment['start'], turn['start'])
+                if overlap > max_overlap:
+                    max_overlap = overlap
+                    best_speaker = turn['speaker']
+            dialogue.append({
+                'speaker': best_speaker,
+                'start': segment['start'],
+                'end': segment['end'],
+                'text': segment['text'].strip()
+            })
+            continue
+
+        current_speaker = None
+        current_words = []
+        current_start_time = -1
+        for word_info in segment['words']:
+            word_start_time = word_info['start']
+            word_end_time = word_info['end']
+            word_speaker = None
+
+            word_midpoint_time = word_start_time + (word_end_time - word_start_time) / 2
+            for turn in speakers:
+                if turn['start'] <= word_midpoint_time < turn['end']:
+                    word_speaker = turn['speaker']
+                    break
+
+            if word_speaker is None:
+                min_distance = float('inf')
+                closest_speaker = speakers[0]['speaker'] if speakers else "UNKNOWN_SPEAKER"
+                for turn in speakers:
+                    if word_start_time >= turn['end']:
+                        distance = word_start_time - turn['end']
+                    elif word_end_time <= turn['start']:
+                        distance = turn['start'] - word_end_time
+                    else:
+                        distance = 0
+                    if distance < min_distance:
+                        min_distance = distance
+                        closest_speaker = turn['speaker']
+                        if distance == 0:
+                            break
+                word_speaker = closest_speaker
+
+            if current_speaker is None:
+                current_speaker = word_speaker
+                current_words.append(word_info['word'])
+                current_start_time = word_info['start']
+            elif word_speaker == current_speaker:
+                current_words.append(word_info['word'])
+            else:
+                if current_words:
+                    previous_word_end_time = segment['words'][segment['words'].index(word_info) - 1]['end']
+                    dialogue.append({
+                        'speaker': current_speaker,
+                        'start': current_start_time,
+                        'end': previous_word_end_time,
+                        'text': "".join(current_words)
+                    })
+                current_speaker = word_speaker
+                current_words = [word_info['word']]
+                current_start_time = word_info['start']
+
+        if current_words:
+            dialogue.append({
+                'speaker': current_speaker,
+                'start': current_start_time,
+                'end': segment['words'][-1]['end'],
+                'text': "".join(current_words)
+            })
+    return dialogue
+
+
+def synthetic_asr(num_words: int, num_turns: int, num_speakers: int = 4, overlap: bool = False,
+                  words_per_segment: int = 20, plain_every: int = 10, seed: int = 0) -> Dict:
+    """
+    生成合成的旧格式 ASR 结果
+
+    Args:
+        num_words: 词数
+        num_turns: 说话人片段数
+        num_speakers: 说话人数
+        overlap: 是否生成相互重叠、乱序的说话人片段
+        words_per_segment: 每个 segment 的词数
+        plain_every: 每隔多少个 segment 生成一个没有词级别信息的 segment
+        seed: 随机种子
+
+    Returns:
+        Dict: {"segments": [...], "speakers": [...]}
+    """
+    rng = random.Random(seed)
+    t = 0.0
+    words = []
+    for i in range(num_words):
+        t += rng.uniform(0.0, 0.3)  # 词间停顿
+        duration = rng.uniform(0.05, 0.5)
+        words.append({"word": f"w{i}", "start": round(t, 3), "end": round(t + duration, 3)})
+        t += duration
+    total = t
+
+    # 片段之间留有空隙，使部分词落在片段之外
+    bounds = sorted(rng.uniform(0, total) for _ in range(2 * num_turns))
+    speakers = [
+        {"speaker": f"SPEAKER_{rng.randrange(num_speakers):02d}",
+         "start": round(bounds[2 * i], 3), "end": round(bounds[2 * i + 1], 3)}
+        for i in range(num_turns)
+    ]
+    if overlap:
+        for turn in speakers:
+            turn["end"] = round(turn["end"] + rng.uniform(0, 20), 3)
+        rng.shuffle(speakers)
+
+    segments = []
+    for seg_idx, lo in enumerate(range(0, num_words, words_per_segment)):
+        seg_words = words[lo:lo + words_per_segment]
+        segment = {
+            "start": seg_words[0]["start"],
+            "end": seg_words[-1]["end"],
+            "text": " " + "".join(w["word"] for w in seg_words) + " ",
+        }
+        if plain_every and seg_idx % plain_every != plain_every - 1:
+            segment["words"] = seg_words
+        segments.append(segment)
+    return {"segments": segments, "speakers": speakers}
+
+
+def load_processor(data: Dict) -> ASRProcessor:
+    """由合成数据构建 ASRProcessor"""
+    return ASRProcessor.from_result(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="词级别说话人切分基准测试")
+    parser.add_argument("--words", type=int, default=100_000, help="词数")
+    parser.add_argument("--turns", type=int, default=2_000, help="说话人片段数")
+    parser.add_argument("--overlap", action="store_true", help="生成相互重叠、乱序的说话人片段")
+    args = parser.parse_args()
+
+    data = synthetic_asr(args.words, args.turns, overlap=args.overlap)
+    processor = load_processor(data)
+
+    start = time.perf_counter()
+    expected = legacy_speaker_dialogue(data["segments"], data["speakers"])
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = processor._generate_speaker_dialogue_from_words()
+    vectorized_time = time.perf_counter() - start
+
+    assert actual == expected, "切分结果与原实现不一致"
+    logging.info(f"词数: {args.words}，说话人片段数: {args.turns}，对话条目数: {len(actual)}")
+    logging.info(f"原实现: {legacy_time:.2f}s，二分查找实现: {vectorized_time:.3f}s，"
+                 f"加速 {legacy_time / max(vectorized_time, 1e-9):.0f} 倍，结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+列式存储的紧凑转录结果
+
+统一转录格式（见 transcript_schema.py）中每个句子是一个 dict，一小时的视频有数千个句子，
+每个 dict 连同其中的 float / str 对象都要单独分配。CompactTranscript 把同一份数据按列存储：
+
+- index / start / end：numpy 数组
+- 说话人：整数编码数组 + 说话人标签表（没有说话人信息时编码为 -1）
+- 文本：所有句子拼接成的一个字符串 + 每句在其中的起止偏移
+
+按序号切片（以及候选句子全部与查询范围重叠的时间范围切片）只创建数组视图，共享同一份
+文本缓冲区；与统一转录格式的 list[dict] 以及列式 JSON 之间可以无损互转。
+
+ASRProcessor 以此保存内存中的转录，transcript_store.py 的二进制存储按同样的列读写。
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+class CompactTranscript:
+    """
+    列式转录结果
+
+    句子按开始时间排序（各 ASR 引擎的输出均满足），按时间范围查询时使用二分查找。
+    """
+
+    def __init__(self, index: np.ndarray, start: np.ndarray, end: np.ndarray, speaker_codes: np.ndarray,
+                 speakers: Sequence[str], text: str, offsets: np.ndarray):
+        """
+        Args:
+            index: 句子序号
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+            speaker_codes: 说话人编码（speakers 中的下标，-1 表示没有说话人信息）
+            speakers: 说话人标签表
+            text: 所有句子拼接成的文本缓冲区
+            offsets: 长度为句子数 + 1 的偏移数组，第 i 句为 text[offsets[i]:offsets[i + 1]]
+        """
+        if not (len(index) == len(start) == len(end) == len(speaker_codes) == len(offsets) - 1):
+            raise ValueError("列长度不一致")
+        self.index = index
+        self.start = start
+        self.end = end
+        self.speaker_codes = speaker_codes
+        self.speakers = list(speakers)
+        self.text = text
+        self.offsets = offsets
+        self._max_end: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_transcript(cls, transcript: List[Dict]) -> "CompactTranscript":
+        """
+        由统一格式的句子列表构建
+
+        Args:
+            transcript: [{"index", "spk_id", "sentence", "start_time", "end_time"}, ...]
+        """
+        n = len(transcript)
+        index = np.empty(n, dtype=np.int64)
+        start = np.empty(n, dtype=np.float64)
+        end = np.empty(n, dtype=np.float64)
+        speaker_codes = np.empty(n, dtype=np.int32)
+        offsets = np.empty(n + 1, dtype=np.int64)
+        offsets[0] = 0
+
+        speaker_lookup: Dict[str, int] = {}
+        sentences = []
+        for i, item in enumerate(transcript):
+            index[i] = item["index"]
+            start[i] = item["start_time"]
+            end[i] = item["end_time"]
+            spk_id = item.get("spk_id")
+            speaker_codes[i] = -1 if spk_id is None else speaker_lookup.setdefault(spk_id, len(speaker_lookup))
+            sentences.append(item["sentence"])
+            offsets[i + 1] = offsets[i] + len(item["sentence"])
+
+        return cls(index, start, end, speaker_codes, list(speaker_lookup), "".join(sentences), offsets)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def sentence(self, i: int) -> str:
+        """第 i 句的文本"""
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def speaker(self, i: int) -> Optional[str]:
+        """第 i 句的说话人，没有说话人信息时为 None"""
+        code = self.speaker_codes[i]
+        return None if code < 0 else self.speakers[code]
+
+    def __getitem__(self, key):
+        """
+        整数下标返回统一格式的单个句子；切片返回共享底层数据的 CompactTranscript
+
+        Args:
+            key: int 或 step 为 1 的 slice
+        """
+        if isinstance(key, slice):
+            lo, hi, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("只支持连续切片")
+            hi = max(lo, hi)
+            return CompactTranscript(
+                self.index[lo:hi], self.start[lo:hi], self.end[lo:hi], self.speaker_codes[lo:hi],
+                self.speakers, self.text, self.offsets[lo:hi + 1],
+            )
+        i = range(len(self))[key]
+        return {
+            "index": int(self.index[i]),
+            "spk_id": self.speaker(i),
+            "sentence": self.sentence(i),
+            "start_time": float(self.start[i]),
+            "end_time": float(self.end[i]),
+        }
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def max_end(self) -> np.ndarray:
+        """结束时间的前缀最大值（首次使用时计算一次）"""
+        if self._max_end is None:
+            self._max_end = np.maximum.accumulate(self.end) if len(self) else self.end
+        return self._max_end
+
+    def take(self, positions: Sequence[int]) -> "CompactTranscript":
+        """
+        按下标选取句子（复制数据，文本只保留选中的句子）
+
+        Args:
+            positions: 句子下标
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        sentences = [self.sentence(i) for i in positions]
+        offsets = np.zeros(len(sentences) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in sentences], out=offsets[1:])
+        return CompactTranscript(
+            self.index[positions], self.start[positions], self.end[positions], self.speaker_codes[positions],
+            self.speakers, "".join(sentences), offsets,
+        )
+
+    def time_slice(self, start: float, end: float) -> "CompactTranscript":
+        """
+        与时间范围 [start, end) 重叠的句子
+
+        在开始时间和结束时间前缀最大值上二分查找候选区间，再剔除区间内结束时间不晚于 start 的句子
+        （被之前的长句覆盖的短句）。
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒）
+
+        Returns:
+            CompactTranscript: 全部候选都重叠时为共享底层数据的连续切片，否则为选中句子的副本
+        """
+        # 结束时间的前缀最大值单调不减，可以和开始时间一样二分查找
+        lo = int(np.searchsorted(self.max_end, start, side='right'))
+        hi = max(lo, int(np.searchsorted(self.start, end, side='left')))
+        keep = np.flatnonzero(self.end[lo:hi] > start)
+        if len(keep) == hi - lo:
+            return self[lo:hi]
+        return self.take(keep + lo)
+
+    @property
+    def duration(self) -> float:
+        """最后一句的结束时间（秒）"""
+        return float(self.end.max()) if len(self) else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        """列数据占用的字节数（文本按 UTF-8 计）"""
+        arrays = (self.index, self.start, self.end, self.speaker_codes, self.offsets)
+        return sum(a.nbytes for a in arrays) + len(self.text.encode("utf-8"))
+
+    def to_transcript(self) -> List[Dict]:
+        """转换为统一格式的句子列表"""
+        return list(self)
+
+    def to_json(self) -> Dict:
+        """
+        列式 JSON 表示
+
+        文本缓冲区只保存当前切片覆盖的部分，偏移相应平移。
+        """
+        base = int(self.offsets[0]) if len(self.offsets) else 0
+        return {
+            "format": "columnar",
+            "index": self.index.tolist(),
+            "start_time": self.start.tolist(),
+            "end_time": self.end.tolist(),
+            "speaker_codes": self.speaker_codes.tolist(),
+            "speakers": self.speakers,
+            "text": self.text[base:int(self.offsets[-1])],
+            "offsets": (self.offsets - base).tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "CompactTranscript":
+        """
+        由 to_json 的列式 JSON 或统一格式的句子列表构建
+
+        Args:
+            data: 列式 JSON（dict），或统一格式的 list[dict]
+        """
+        if isinstance(data, list):
+            return cls.from_transcript(data)
+        if data.get("format") != "columnar":
+            raise ValueError(f"未知的转录存储格式: {data.get('format')}")
+        return cls(
+            np.asarray(data["index"], dtype=np.int64),
+            np.asarray(data["start_time"], dtype=np.float64),
+            np.asarray(data["end_time"], dtype=np.float64),
+            np.asarray(data["speaker_codes"], dtype=np.int32),
+            data["speakers"],
+            data["text"],
+            np.asarray(data["offsets"], dtype=np.int64),
+        )
@@ -8,6 +8,106 @@
 import json
 import logging
 
+import numpy as np
+
+from asr_result_io import iter_transcript, read_header
+from compact_transcript import CompactTranscript
+from dialogue_chunker import chunk_dialogue
+
+# 逐块广播比较时每块最多的 (词 × 说话人片段) 元素数
+_BROADCAST_BLOCK = 1 << 22
+
+
+def _is_disjoint_sorted(turn_starts: np.ndarray, turn_ends: np.ndarray) -> bool:
+    """说话人片段是否按开始时间排序、长度为正且互不重叠"""
+    return bool(
+        np.all(turn_starts < turn_ends)
+        and np.all(turn_ends[:-1] <= turn_starts[1:])
+    )
+
+
+def _blocks(n: int, width: int):
+    """按 _BROADCAST_BLOCK 把 n 行切成若干块"""
+    step = max(1, _BROADCAST_BLOCK // max(width, 1))
+    for lo in range(0, n, step):
+        yield lo, min(n, lo + step)
+
+
+def match_words_to_turns(word_starts: np.ndarray, word_ends: np.ndarray,
+                         turn_starts: np.ndarray, turn_ends: np.ndarray) -> np.ndarray:
+    """
+    为每个词匹配说话人片段
+    
+    规则：词的中点落在某个片段 [start, end) 内时取该片段（多个片段包含时取列表中靠前的）；
+    否则取与词距离最近的片段（词与片段重叠时距离为 0，距离相同时取列表中靠前的）。
+    
+    片段有序且互不重叠时（说话人分离的常见输出），包含查找和最近片段查找都只需在片段边界上
+    二分查找；否则逐块广播比较，结果与逐个扫描片段一致。
+    
+    Args:
+        word_starts: 词开始时间
+        word_ends: 词结束时间
+        turn_starts: 片段开始时间（按原列表顺序）
+        turn_ends: 片段结束时间
+        
+    Returns:
+        np.ndarray: 每个词对应的片段下标
+    """
+    n_turns = len(turn_starts)
+    midpoints = word_starts + (word_ends - word_starts) / 2
+
+    if _is_disjoint_sorted(turn_starts, turn_ends) and np.all(word_starts <= word_ends):
+        # 包含中点的片段：开始时间 <= 中点的最后一个片段
+        containing = np.searchsorted(turn_starts, midpoints, side='right') - 1
+        clipped = np.clip(containing, 0, n_turns - 1)
+        found = (containing >= 0) & (midpoints < turn_ends[clipped])
+        result = np.where(found, clipped, -1)
+
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            ws, we = word_starts[missing], word_ends[missing]
+            after = np.searchsorted(turn_ends, ws, side='right')    # 第一个结束于词开始之后的片段
+            before = np.searchsorted(turn_starts, we, side='left')  # 第一个开始于词结束之后的片段
+            prev_idx = np.clip(after - 1, 0, n_turns - 1)
+            next_idx = np.clip(before, 0, n_turns - 1)
+            # 候选按片段下标递增：前一个片段、第一个重叠片段、后一个片段
+            distances = np.stack([
+                np.where(after > 0, ws - turn_ends[prev_idx], np.inf),
+                np.where(before > after, 0.0, np.inf),
+                np.where((before < n_turns) & (before >= after), turn_starts[next_idx] - we, np.inf),
+            ])
+            candidates = np.stack([prev_idx, np.clip(after, 0, n_turns - 1), next_idx])
+            choice = np.argmin(distances, axis=0)
+            result[missing] = candidates[choice, np.arange(len(missing))]
+        return result
+
+    result = np.empty(len(word_starts), dtype=np.int64)
+    for lo, hi in _blocks(len(word_starts), n_turns):
+        mid = midpoints[lo:hi, None]
+        contains = (turn_starts <= mid) & (mid < turn_ends)
+        ws, we = word_starts[lo:hi, None], word_ends[lo:hi, None]
+        distances = np.where(ws >= turn_ends, ws - turn_ends, np.where(we <= turn_starts, turn_starts - we, 0.0))
+        result[lo:hi] = np.where(contains.any(axis=1), contains.argmax(axis=1), distances.argmin(axis=1))
+    return result
+
+
+def match_segments_to_turns(segment_starts: np.ndarray, segment_ends: np.ndarray,
+                            turn_starts: np.ndarray, turn_ends: np.ndarray) -> np.ndarray:
+    """
+    为没有词级别信息的 segment 匹配时间重叠最多的说话人片段
+    
+    Returns:
+        np.ndarray: 每个 segment 对应的片段下标，没有重叠时为 -1
+    """
+    result = np.full(len(segment_starts), -1, dtype=np.int64)
+    for lo, hi in _blocks(len(segment_starts), len(turn_starts)):
+        overlaps = (np.minimum(segment_ends[lo:hi, None], turn_ends)
+                    - np.maximum(segment_starts[lo:hi, None], turn_starts))
+        best = overlaps.argmax(axis=1)
+        result[lo:hi] = np.where(overlaps[np.arange(hi - lo), best] > 0, best, -1)
+    return result
+
+
 class ASRProcessor:
     """
     处理 ASR 结果以创建结构化、分块的对话
@@ -17,44 +117,32 @@ class ASRProcessor:
     2. 新格式（Paraformer V2）：说话人信息已在 transcript 的每个句子中
     """
     
-    def __init__(self, asr_result_path):
+    def __init__(self, asr_result_path, chunk_policies=None):
         """
         初始化处理器，从 JSON 文件加载 ASR 结果
         
         Args:
             asr_result_path (str): ASR 结果 JSON 文件路径
+            chunk_policies (list, optional): 分块策略（见 dialogue_chunker.py），默认使用原有规则
         """
+        self.chunk_policies = chunk_policies
+        self._transcript_path = None
         logging.info(f"正在从 {asr_result_path} 加载 ASR 数据...")
         try:
-            with open(asr_result_path, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-            
-            # 处理数组格式（通常是 [{ ... }]）
-            if isinstance(self.data, list) and self.data:
-                data_dict = self.data[0]
-            else:
-                data_dict = self.data
-            
-            # 尝试加载新格式（Paraformer V2）
-            self.transcript = data_dict.get('transcript')
-            
-            if self.transcript:
-                # 新格式：transcript 中已包含说话人信息
-                logging.info(f"检测到新格式（Paraformer V2），共 {len(self.transcript)} 个句子")
-                self.format_version = 'v2'
+            # 有头文件的新格式结果不整体载入，处理时逐句流式读取
+            header = read_header(asr_result_path, rebuild=False)
+            if header and header.get('format') == 'v2' and header.get('total_segments'):
+                logging.info(f"检测到新格式（Paraformer V2），共 {header['total_segments']} 个句子，流式读取")
+                self.data = None
+                self.transcript = None
                 self.segments = None
                 self.speakers = None
-            else:
-                # 旧格式：需要分别处理 segments 和 speakers
-                self.segments = data_dict.get('segments')
-                self.speakers = data_dict.get('speakers')
-                
-                if self.segments is None or self.speakers is None:
-                    raise ValueError("JSON 文件中缺少必要字段。新格式需要 'transcript'，旧格式需要 'segments' 和 'speakers'。")
-                
-                logging.info(f"检测到旧格式，共 {len(self.segments)} 个文本片段和 {len(self.speakers)} 个说话人片段")
-                self.format_version = 'v1'
-                self.transcript = None
+                self.format_version = 'v2'
+                self._transcript_path = asr_result_path
+                return
+            
+            with open(asr_result_path, 'r', encoding='utf-8') as f:
+                self._load_data(json.load(f))
                 
         except FileNotFoundError:
             logging.error(f"错误：输入文件未找到 {asr_result_path}")
@@ -66,6 +154,56 @@ class ASRProcessor:
             logging.error(f"加载数据时发生未知错误: {e}")
             raise
     
+    @classmethod
+    def from_result(cls, asr_result, chunk_policies=None):
+        """
+        直接由内存中的 ASR 结果构建处理器，不经过 JSON 文件
+        
+        Args:
+            asr_result (dict | list): 与 ASR 结果 JSON 文件内容相同结构的数据
+            chunk_policies (list, optional): 分块策略（见 dialogue_chunker.py）
+            
+        Returns:
+            ASRProcessor: 处理器实例
+        """
+        processor = cls.__new__(cls)
+        processor.chunk_policies = chunk_policies
+        processor._transcript_path = None
+        processor._load_data(asr_result)
+        return processor
+    
+    def _load_data(self, data):
+        """识别 ASR 结果的格式并提取 transcript 或 segments / speakers"""
+        self.data = data
+        
+        # 处理数组格式（通常是 [{ ... }]）
+        if isinstance(self.data, list) and self.data:
+            data_dict = self.data[0]
+        else:
+            data_dict = self.data
+        
+        # 尝试加载新格式（Paraformer V2）
+        transcript = data_dict.get('transcript')
+        
+        if transcript:
+            # 新格式：transcript 中已包含说话人信息，按列保存
+            self.transcript = CompactTranscript.from_transcript(transcript)
+            logging.info(f"检测到新格式（Paraformer V2），共 {len(self.transcript)} 个句子")
+            self.format_version = 'v2'
+            self.segments = None
+            self.speakers = None
+        else:
+            # 旧格式：需要分别处理 segments 和 speakers
+            self.segments = data_dict.get('segments')
+            self.speakers = data_dict.get('speakers')
+            
+            if self.segments is None or self.speakers is None:
+                raise ValueError("JSON 文件中缺少必要字段。新格式需要 'transcript'，旧格式需要 'segments' 和 'speakers'。")
+            
+            logging.info(f"检测到旧格式，共 {len(self.segments)} 个文本片段和 {len(self.speakers)} 个说话人片段")
+            self.format_version = 'v1'
+            self.transcript = None
+    
     def _generate_dialogue_from_transcript_v2(self):
         """
         从新格式的 transcript 中生成对话列表
@@ -81,15 +219,30 @@ class ASRProcessor:
             list[dict]: 标准化的对话列表
         """
         logging.info("正在从新格式 transcript 生成对话列表...")
-        dialogue = []
         
-        if not self.transcript:
+        if not self.transcript and self._transcript_path is None:
             logging.warning("transcript 数据为空")
             return []
         
-        for item in self.transcript:
-            # 提取字段
-            speaker = item.get('spk_id', 'UNKNOWN')
+        dialogue = list(self._iter_dialogue_v2())
+        logging.info(f"成功生成 {len(dialogue)} 个对话条目")
+        return dialogue
+    
+    def _iter_dialogue_v2(self):
+        """
+        逐条生成新格式的对话条目
+        
+        流式读取模式下句子从 ASR 结果文件中逐个解析，不整体载入内存。
+        
+        Yields:
+            dict: 标准化的对话条目
+        """
+        if self._transcript_path is None:
+            yield from self._iter_compact_dialogue()
+            return
+        for item in iter_transcript(self._transcript_path):
+            # 提取字段（没有说话人信息时记为 UNKNOWN）
+            speaker = item.get('spk_id')
             text = item.get('sentence', '').strip()
             start_time = item.get('start_time', 0.0)
             end_time = item.get('end_time', 0.0)
@@ -98,21 +251,45 @@ class ASRProcessor:
             if not text:
                 continue
             
-            dialogue.append({
-                'speaker': f"SPEAKER_{speaker}",  # 格式化说话人 ID
+            yield {
+                'speaker': f"SPEAKER_{'UNKNOWN' if speaker is None else speaker}",  # 格式化说话人 ID
                 'start': float(start_time),
                 'end': float(end_time),
                 'text': text
-            })
+            }
+    
+    def _iter_compact_dialogue(self):
+        """
+        由内存中的列式 transcript 逐条生成对话条目
         
-        logging.info(f"成功生成 {len(dialogue)} 个对话条目")
-        return dialogue
+        时间和说话人按列一次性取出，说话人标签每个说话人只格式化一次。
+        """
+        compact = self.transcript
+        if not compact:
+            return
+        labels = [f"SPEAKER_{speaker}" for speaker in compact.speakers] + ["SPEAKER_UNKNOWN"]
+        codes = compact.speaker_codes.tolist()  # -1 对应标签表末尾的 UNKNOWN
+        starts = compact.start.tolist()
+        ends = compact.end.tolist()
+        text, offsets = compact.text, compact.offsets.tolist()
+        for i in range(len(compact)):
+            sentence = text[offsets[i]:offsets[i + 1]].strip()
+            # 跳过空文本
+            if not sentence:
+                continue
+            yield {
+                'speaker': labels[codes[i]],
+                'start': starts[i],
+                'end': ends[i],
+                'text': sentence
+            }
     
     def _generate_speaker_dialogue_from_words(self):
         """
         根据词级别的时间戳来切分对话，精确地将每个词分配给对应的说话人
         
-        此方法用于旧格式（v1）
+        此方法用于旧格式（v1）。所有词一次性匹配说话人片段（见 match_words_to_turns），
+        再按说话人切换位置把每个 segment 的词拼接为对话条目。
         
         Returns:
             list[dict]: 对话列表
@@ -124,90 +301,56 @@ class ASRProcessor:
             logging.warning("缺少 segments 或 speakers 数据，无法进行词级别切分")
             return []
 
+        turn_starts = np.array([turn['start'] for turn in self.speakers], dtype=np.float64)
+        turn_ends = np.array([turn['end'] for turn in self.speakers], dtype=np.float64)
+        labels = [turn['speaker'] for turn in self.speakers]
+        # 同一说话人的不同片段编码相同，切换判断只比较编码
+        label_lookup = {}
+        label_codes = np.array([label_lookup.setdefault(label, len(label_lookup)) for label in labels])
+
+        words = [word for segment in self.segments if segment.get('words') for word in segment['words']]
+        word_turns = match_words_to_turns(
+            np.array([word['start'] for word in words], dtype=np.float64),
+            np.array([word['end'] for word in words], dtype=np.float64),
+            turn_starts, turn_ends,
+        )
+        word_codes = label_codes[word_turns] if len(words) else word_turns
+
+        # 没有词级别信息的 segment 按整体时间重叠匹配
+        plain_segments = [segment for segment in self.segments if not segment.get('words')]
+        segment_turns = match_segments_to_turns(
+            np.array([segment['start'] for segment in plain_segments], dtype=np.float64),
+            np.array([segment['end'] for segment in plain_segments], dtype=np.float64),
+            turn_starts, turn_ends,
+        )
+
+        word_pos = 0
+        plain_pos = 0
         for segment in self.segments:
-            # 如果没有词级别信息，使用整个 segment 进行匹配
-            if 'words' not in segment or not segment['words']:
-                max_overlap = 0
-                best_speaker = "UNKNOWN_SPEAKER"
-                for turn in self.speakers:
-                    overlap_start = max(segment['start'], turn['start'])
-                    overlap_end = min(segment['end'], turn['end'])
-                    overlap = overlap_end - overlap_start
-                    if overlap > max_overlap:
-                        max_overlap = overlap
-                        best_speaker = turn['speaker']
+            if not segment.get('words'):
+                turn = segment_turns[plain_pos]
+                plain_pos += 1
                 dialogue.append({
-                    'speaker': best_speaker,
+                    'speaker': labels[turn] if turn >= 0 else "UNKNOWN_SPEAKER",
                     'start': segment['start'],
                     'end': segment['end'],
                     'text': segment['text'].strip()
                 })
                 continue
 
-            # 处理词级别信息
-            current_speaker = None
-            current_words = []
-            current_start_time = -1
-
-            for word_info in segment['words']:
-                word_start_time = word_info['start']
-                word_end_time = word_info['end']
-                word_speaker = None
-
-                # 使用词的中点时间查找说话人
-                word_midpoint_time = word_start_time + (word_end_time - word_start_time) / 2
-                for turn in self.speakers:
-                    if turn['start'] <= word_midpoint_time < turn['end']:
-                        word_speaker = turn['speaker']
-                        break
-
-                # 如果没有找到匹配的说话人，使用最近的说话人
-                if word_speaker is None:
-                    min_distance = float('inf')
-                    closest_speaker = self.speakers[0]['speaker'] if self.speakers else "UNKNOWN_SPEAKER"
-                    for turn in self.speakers:
-                        if word_start_time >= turn['end']:
-                            distance = word_start_time - turn['end']
-                        elif word_end_time <= turn['start']:
-                            distance = turn['start'] - word_end_time
-                        else:
-                            distance = 0
-                        if distance < min_distance:
-                            min_distance = distance
-                            closest_speaker = turn['speaker']
-                            if distance == 0:
-                                break
-                    word_speaker = closest_speaker
-                
-                # 处理说话人切换
-                if current_speaker is None:
-                    current_speaker = word_speaker
-                    current_words.append(word_info['word'])
-                    current_start_time = word_info['start']
-                elif word_speaker == current_speaker:
-                    current_words.append(word_info['word'])
-                else:
-                    # 说话人切换，保存当前块
-                    if current_words:
-                        previous_word_end_time = segment['words'][segment['words'].index(word_info) - 1]['end']
-                        dialogue.append({
-                            'speaker': current_speaker,
-                            'start': current_start_time,
-                            'end': previous_word_end_time,
-                            'text': "".join(current_words)
-                        })
-                    current_speaker = word_speaker
-                    current_words = [word_info['word']]
-                    current_start_time = word_info['start']
-            
-            # 保存最后一个块
-            if current_words:
+            # 处理词级别信息：在说话人切换处分段
+            segment_words = segment['words']
+            n = len(segment_words)
+            codes = word_codes[word_pos:word_pos + n]
+            bounds = [0, *(np.flatnonzero(codes[1:] != codes[:-1]) + 1).tolist(), n]
+            for lo, hi in zip(bounds[:-1], bounds[1:]):
                 dialogue.append({
-                    'speaker': current_speaker,
-                    'start': current_start_time,
-                    'end': segment['words'][-1]['end'],
-                    'text': "".join(current_words)
+                    'speaker': labels[word_turns[word_pos + lo]],
+                    'start': segment_words[lo]['start'],
+                    'end': segment_words[hi - 1]['end'],
+                    'text': "".join(word['word'] for word in segment_words[lo:hi])
                 })
+            word_pos += n
 
         logging.info(f"词级别对话切分完成，共生成 {len(dialogue)} 个对话条目")
         return dialogue
@@ -216,73 +359,19 @@ class ASRProcessor:
         """
         将对话条目列表分块
         
-        分块规则：
+        分块规则由 self.chunk_policies 决定（见 dialogue_chunker.py），默认：
         1. 说话人改变时分块
         2. 时间间隔超过 3 秒时分块
         3. 当前块文本长度达到 200 字符时分块
         
         Args:
-            speaker_dialogue (list[dict]): 对话列表
+            speaker_dialogue (Iterable[dict]): 对话条目（列表或生成器）
             
         Returns:
             list[dict]: 分块后的对话列表
         """
         logging.info("正在将对话分块...")
-        if not speaker_dialogue:
-            return []
-
-        chunks = []
-        current_chunk = []
-
-        for item in speaker_dialogue:
-            # 第一个条目
-            if not current_chunk:
-                current_chunk.append(item)
-                continue
-
-            last_item = current_chunk[-1]
-
-            # 检查分块条件
-            speaker_changed = item['speaker'] != last_item['speaker']
-            time_gap_exceeded = (item['start'] - last_item['end']) > 3.0
-
-            if speaker_changed or time_gap_exceeded:
-                # 保存当前块
-                text = "".join(d['text'] for d in current_chunk)
-                chunks.append({
-                    'speaker': current_chunk[0]['speaker'],
-                    'start': current_chunk[0]['start'],
-                    'end': current_chunk[-1]['end'],
-                    'text': text
-                })
-                current_chunk = [item]
-                continue
-
-            # 添加到当前块
-            current_chunk.append(item)
-            current_len = sum(len(d['text']) for d in current_chunk)
-
-            # 检查长度限制
-            if current_len >= 200:
-                text = "".join(d['text'] for d in current_chunk)
-                chunks.append({
-                    'speaker': current_chunk[0]['speaker'],
-                    'start': current_chunk[0]['start'],
-                    'end': current_chunk[-1]['end'],
-                    'text': text
-                })
-                current_chunk = []
-
-        # 保存最后一个块
-        if current_chunk:
-            text = "".join(d['text'] for d in current_chunk)
-            chunks.append({
-                'speaker': current_chunk[0]['speaker'],
-                'start': current_chunk[0]['start'],
-                'end': current_chunk[-1]['end'],
-                'text': text
-            })
-        
+        chunks = list(chunk_dialogue(speaker_dialogue, self.chunk_policies))
         logging.info(f"分块完成，共生成 {len(chunks)} 个块")
         return chunks
 
@@ -299,7 +388,10 @@ class ASRProcessor:
         """
         logging.info(f"开始处理 ASR 数据（格式版本: {self.format_version}）...")
         
-        if self.format_version == 'v2':
+        if self.format_version == 'v2' and self._transcript_path is not None:
+            # 新格式（流式读取）：对话条目边解析边分块
+            speaker_dialogue = self._iter_dialogue_v2()
+        elif self.format_version == 'v2':
             # 新格式：直接从 transcript 生成对话
             speaker_dialogue = self._generate_dialogue_from_transcript_v2()
         else:
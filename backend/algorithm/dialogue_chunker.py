@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+对话分块
+
+以生成器方式逐条消费对话条目（{"speaker", "start", "end", "text"}），按可配置的规则
+输出分块。当前块的字符数、token 数等统计随条目增量累加，整个过程是 O(n) 的单遍扫描。
+
+分块规则由一组策略组成，每个策略可以：
+- split_before：在加入新条目之前结束当前块（例如说话人切换、时间间隔过长、token 超预算）
+- flush_after：在加入新条目之后结束当前块（例如字符数达到上限）
+
+默认规则与原 ASRProcessor._chunk_dialogue 一致：说话人切换、间隔超过 3 秒、长度达到 200 字符。
+"""
+
+import logging
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+
+class ChunkState:
+    """当前块的增量统计"""
+
+    def __init__(self):
+        self.items: List[Dict] = []
+        self.chars = 0
+        self.tokens = 0
+
+    def add(self, item: Dict, tokens: int = 0):
+        self.items.append(item)
+        self.chars += len(item['text'])
+        self.tokens += tokens
+
+    @property
+    def last(self) -> Dict:
+        return self.items[-1]
+
+    def to_chunk(self) -> Dict:
+        """合并为一个分块"""
+        return {
+            'speaker': self.items[0]['speaker'],
+            'start': self.items[0]['start'],
+            'end': self.items[-1]['end'],
+            'text': "".join(item['text'] for item in self.items),
+        }
+
+
+class ChunkPolicy:
+    """分块策略基类，默认不触发分块"""
+
+    # 需要 token 计数时设为 True，分块器只在有策略需要时计算 token
+    needs_tokens = False
+
+    def split_before(self, state: ChunkState, item: Dict, item_tokens: int) -> bool:
+        """加入 item 之前是否结束当前块（当前块非空）"""
+        return False
+
+    def flush_after(self, state: ChunkState) -> bool:
+        """把条目加入已有块之后是否结束当前块"""
+        return False
+
+
+class SpeakerChangePolicy(ChunkPolicy):
+    """说话人切换时分块"""
+
+    def split_before(self, state, item, item_tokens):
+        return item['speaker'] != state.last['speaker']
+
+
+class TimeGapPolicy(ChunkPolicy):
+    """与上一条目的时间间隔超过 max_gap_s 时分块"""
+
+    def __init__(self, max_gap_s: float = 3.0):
+        self.max_gap_s = max_gap_s
+
+    def split_before(self, state, item, item_tokens):
+        return (item['start'] - state.last['end']) > self.max_gap_s
+
+
+class MaxCharsPolicy(ChunkPolicy):
+    """块的文本长度达到 max_chars 时分块"""
+
+    def __init__(self, max_chars: int = 200):
+        self.max_chars = max_chars
+
+    def flush_after(self, state):
+        return state.chars >= self.max_chars
+
+
+class TokenBudgetPolicy(ChunkPolicy):
+    """
+    按 LLM tokenizer 计数，保证块的 token 数不超过 max_tokens
+
+    块的 token 数按各条目 token 数之和累计；加入条目会超出预算时先结束当前块，
+    单个条目本身超出预算时独占一块。
+    """
+
+    needs_tokens = True
+
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int]):
+        if max_tokens < 1:
+            raise ValueError(f"token 预算必须大于 0，当前为: {max_tokens}")
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+
+    def split_before(self, state, item, item_tokens):
+        return state.tokens + item_tokens > self.max_tokens
+
+    def flush_after(self, state):
+        return state.tokens >= self.max_tokens
+
+
+def make_token_counter(model_type: Optional[str] = None) -> Callable[[str], int]:
+    """
+    构建 token 计数函数
+
+    优先使用 tiktoken 中与模型对应的编码（未知模型使用 cl100k_base）；
+    未安装 tiktoken 时按字符数估算。
+
+    Args:
+        model_type: LLM 模型名称（如 config.LLM_MODEL_TYPE）
+    """
+    if not TIKTOKEN_AVAILABLE:
+        logging.warning("tiktoken 未安装，token 数按字符数估算")
+        return len
+    try:
+        encoding = tiktoken.encoding_for_model(model_type) if model_type else tiktoken.get_encoding("cl100k_base")
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def default_policies(split_on_speaker: bool = True, max_gap_s: Optional[float] = 3.0,
+                     max_chars: Optional[int] = 200, max_tokens: Optional[int] = None,
+                     count_tokens: Optional[Callable[[str], int]] = None) -> List[ChunkPolicy]:
+    """
+    组装分块策略
+
+    Args:
+        split_on_speaker: 说话人切换时是否分块
+        max_gap_s: 最大时间间隔（秒），None 表示不按间隔分块
+        max_chars: 块的最大字符数，None 表示不限制
+        max_tokens: 块的 token 预算，None 表示不限制
+        count_tokens: token 计数函数，默认使用 make_token_counter()
+
+    Returns:
+        List[ChunkPolicy]: 分块策略列表
+    """
+    policies: List[ChunkPolicy] = []
+    if split_on_speaker:
+        policies.append(SpeakerChangePolicy())
+    if max_gap_s is not None:
+        policies.append(TimeGapPolicy(max_gap_s))
+    if max_chars is not None:
+        policies.append(MaxCharsPolicy(max_chars))
+    if max_tokens is not None:
+        policies.append(TokenBudgetPolicy(max_tokens, count_tokens or make_token_counter()))
+    return policies
+
+
+def policies_from_config(config) -> List[ChunkPolicy]:
+    """
+    按配置组装分块策略
+
+    读取 CHUNK_SPLIT_ON_SPEAKER / CHUNK_MAX_GAP_S / CHUNK_MAX_CHARS / CHUNK_MAX_TOKENS，
+    token 按 LLM_MODEL_TYPE 对应的 tokenizer 计数。
+    """
+    max_tokens = getattr(config, 'CHUNK_MAX_TOKENS', None)
+    return default_policies(
+        split_on_speaker=getattr(config, 'CHUNK_SPLIT_ON_SPEAKER', True),
+        max_gap_s=getattr(config, 'CHUNK_MAX_GAP_S', 3.0),
+        max_chars=getattr(config, 'CHUNK_MAX_CHARS', 200),
+        max_tokens=max_tokens,
+        count_tokens=make_token_counter(getattr(config, 'LLM_MODEL_TYPE', None)) if max_tokens else None,
+    )
+
+
+def chunk_dialogue(items: Iterable[Dict], policies: Optional[List[ChunkPolicy]] = None) -> Iterator[Dict]:
+    """
+    逐条消费对话条目并生成分块
+
+    Args:
+        items: 对话条目（可以是生成器）
+        policies: 分块策略，默认使用 default_policies()
+
+    Yields:
+        Dict: {"speaker", "start", "end", "text"}
+    """
+    if policies is None:
+        policies = default_policies()
+    token_policies = [p for p in policies if p.needs_tokens]
+    count_tokens = token_policies[0].count_tokens if token_policies else None
+
+    state = ChunkState()
+    for item in items:
+        item_tokens = count_tokens(item['text']) if count_tokens else 0
+
+        # 块的第一个条目直接加入
+        if not state.items:
+            state.add(item, item_tokens)
+            continue
+
+        if any(p.split_before(state, item, item_tokens) for p in policies):
+            yield state.to_chunk()
+            state = ChunkState()
+            state.add(item, item_tokens)
+            continue
+
+        state.add(item, item_tokens)
+        if any(p.flush_after(state) for p in policies):
+            yield state.to_chunk()
+            state = ChunkState()
+
+    if state.items:
+        yield state.to_chunk()
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+并行断点续传的模型文件下载器
+
+通过 ModelScope 的 HTTP 接口列出模型仓库中的文件并逐个下载：
+- 多个文件（可跨模型）在有限并发的线程池中同时下载
+- 未完成的文件保存为 .part，重试时用 HTTP Range 请求从断点继续
+- 所有文件共享一个进度统计，定期输出总体进度和速度
+
+接口地址可通过 endpoint 参数或 MODELSCOPE_DOMAIN 环境变量指定，测试时可指向本地 HTTP 服务。
+接口返回的文件路径不可信，绝对路径或跳出模型目录的路径会使该模型下载失败。
+"""
+
+import http.client
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_ENDPOINT = "https://www.modelscope.cn"
+
+
+def default_endpoint() -> str:
+    """ModelScope 接口地址"""
+    domain = os.environ.get("MODELSCOPE_DOMAIN", DEFAULT_ENDPOINT)
+    if not domain.startswith(("http://", "https://")):
+        domain = f"https://{domain}"
+    return domain.rstrip("/")
+
+
+def resolve_model_file(dest_dir, rel_path: str) -> Path:
+    """
+    模型文件在本地目录中的路径
+
+    Args:
+        dest_dir: 模型的本地目录
+        rel_path: 接口返回的文件相对路径
+
+    Raises:
+        ValueError: 路径为空、为绝对路径或跳出模型目录
+    """
+    root = Path(dest_dir).resolve()
+    parts = PurePosixPath(rel_path.replace("\\", "/")).parts if rel_path else ()
+    if not parts or os.path.isabs(rel_path) or parts[0] == "/" or ".." in parts:
+        raise ValueError(f"不安全的模型文件路径: {rel_path!r}")
+    dest = (root / Path(*parts)).resolve()
+    if dest == root or not dest.is_relative_to(root):
+        raise ValueError(f"模型文件路径超出模型目录: {rel_path!r}")
+    return dest
+
+
+class DownloadProgress:
+    """
+    线程安全的总体下载进度
+
+    各下载线程通过 add 汇报新下载的字节数，超过 log_interval_s 时输出一次总体进度。
+    """
+
+    def __init__(self, total_bytes: int = 0, log_interval_s: float = 2.0):
+        self.total_bytes = total_bytes
+        self.done_bytes = 0
+        self.log_interval_s = log_interval_s
+        self._start = time.monotonic()
+        self._last_log = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, nbytes: int):
+        """记录新下载（或断点续传时已存在）的字节数"""
+        with self._lock:
+            self.done_bytes += nbytes
+            now = time.monotonic()
+            if now - self._last_log < self.log_interval_s:
+                return
+            self._last_log = now
+        logging.info(self.summary())
+
+    def summary(self) -> str:
+        """总体进度描述"""
+        elapsed = max(time.monotonic() - self._start, 1e-6)
+        speed_mb = self.done_bytes / elapsed / 1024 / 1024
+        if self.total_bytes:
+            percent = self.done_bytes / self.total_bytes * 100
+            return (f"下载进度: {self.done_bytes / 1024 / 1024:.1f}/{self.total_bytes / 1024 / 1024:.1f} MB"
+                    f"（{percent:.1f}%），{speed_mb:.1f} MB/s")
+        return f"下载进度: {self.done_bytes / 1024 / 1024:.1f} MB，{speed_mb:.1f} MB/s"
+
+
+class ModelFileDownloader:
+    """
+    ModelScope 模型文件下载器
+
+    功能特性：
+    - 通过 HTTP 接口列出模型文件（路径、大小）
+    - HTTP Range 断点续传，写入 .part 文件完成后再原子重命名
+    - 指数退避重试
+    - 有限并发的并行下载和总体进度统计
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, endpoint: Optional[str] = None, max_workers: int = 4, max_retries: int = 3,
+                 retry_backoff_s: float = 2.0, timeout_s: float = 60.0):
+        """
+        初始化下载器
+
+        Args:
+            endpoint: ModelScope 接口地址，默认读取 MODELSCOPE_DOMAIN 环境变量
+            max_workers: 同时下载的文件数上限
+            max_retries: 每个文件的最大尝试次数
+            retry_backoff_s: 首次重试前的等待时间（秒），之后每次翻倍
+            timeout_s: 单次请求的超时时间（秒）
+        """
+        if max_workers < 1:
+            raise ValueError(f"并发下载数必须大于 0，当前为: {max_workers}")
+        self.endpoint = (endpoint or default_endpoint()).rstrip("/")
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_backoff_s = retry_backoff_s
+        self.timeout_s = timeout_s
+
+    def _files_url(self, model_id: str, revision: str) -> str:
+        query = urllib.parse.urlencode({"Revision": revision, "Recursive": "True"})
+        return f"{self.endpoint}/api/v1/models/{model_id}/repo/files?{query}"
+
+    def file_url(self, model_id: str, revision: str, file_path: str) -> str:
+        """单个文件的下载地址"""
+        query = urllib.parse.urlencode({"Revision": revision, "FilePath": file_path})
+        return f"{self.endpoint}/api/v1/models/{model_id}/repo?{query}"
+
+    def list_files(self, model_id: str, revision: str) -> List[Dict]:
+        """
+        列出模型仓库中的文件
+
+        Returns:
+            List[Dict]: [{"path": 相对路径, "size": 字节数}, ...]
+
+        Raises:
+            RuntimeError: 接口返回错误
+        """
+        with urllib.request.urlopen(self._files_url(model_id, revision), timeout=self.timeout_s) as resp:
+            payload = json.loads(resp.read().decode("utf-8"))
+        if payload.get("Code", 200) != 200:
+            raise RuntimeError(f"获取模型 {model_id} 文件列表失败: {payload.get('Message')}")
+
+        return [
+            {"path": item["Path"], "size": int(item.get("Size", 0))}
+            for item in payload.get("Data", {}).get("Files", [])
+            if item.get("Type", "blob") == "blob"
+        ]
+
+    def _fetch(self, url: str, dest: Path, expected_size: int, on_position: Callable[[int], None]):
+        """
+        下载一个文件，存在 .part 时从断点继续；on_position 接收当前已写入的字节数
+
+        .part 已是完整大小（上次写完后、重命名前中断）时不再请求，直接重命名；
+        服务器对断点返回 416 时从头重新下载。
+        """
+        part = dest.with_name(dest.name + ".part")
+        offset = part.stat().st_size if part.exists() else 0
+        if expected_size and offset > expected_size:
+            part.unlink()
+            offset = 0
+        if expected_size and offset == expected_size:
+            logging.info(f"{dest.name} 已下载完整，直接完成")
+            on_position(offset)
+            os.replace(part, dest)
+            return
+
+        request = urllib.request.Request(url)
+        if offset:
+            request.add_header("Range", f"bytes={offset}-")
+
+        try:
+            resp = urllib.request.urlopen(request, timeout=self.timeout_s)
+        except urllib.error.HTTPError as e:
+            if not (offset and e.code == 416):
+                raise
+            # 断点超出服务器上的文件范围，丢弃 .part 从头下载
+            logging.info(f"服务器拒绝断点位置（416），重新下载: {dest.name}")
+            part.unlink()
+            return self._fetch(url, dest, expected_size, on_position)
+
+        with resp:
+            if offset and resp.status != 206:
+                # 服务器不支持 Range，重新下载整个文件
+                logging.info(f"服务器不支持断点续传，重新下载: {dest.name}")
+                offset = 0
+            elif offset:
+                logging.info(f"断点续传 {dest.name}: 从 {offset / 1024 / 1024:.1f} MB 继续")
+                on_position(offset)
+
+            with open(part, "ab" if offset else "wb") as f:
+                position = offset
+                while True:
+                    chunk = resp.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    position += len(chunk)
+                    on_position(position)
+
+        size = part.stat().st_size
+        if expected_size and size != expected_size:
+            raise IOError(f"{dest.name} 大小不一致: 期望 {expected_size}，实际 {size}")
+        os.replace(part, dest)
+
+    def download_file(self, url: str, dest: Path, expected_size: int = 0,
+                      progress: Optional[DownloadProgress] = None) -> bool:
+        """
+        带重试地下载单个文件
+
+        Args:
+            url: 下载地址
+            dest: 目标路径
+            expected_size: 期望的文件大小（0 表示未知）
+            progress: 总体进度统计
+
+        Returns:
+            bool: 是否下载成功
+        """
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        progress = progress or DownloadProgress(expected_size)
+
+        if dest.exists() and expected_size and dest.stat().st_size == expected_size:
+            progress.add(expected_size)
+            return True
+
+        # 该文件已计入总体进度的字节数，重试 / 重新下载时不重复计入
+        counted = 0
+
+        def on_position(position: int):
+            nonlocal counted
+            if position > counted:
+                progress.add(position - counted)
+                counted = position
+
+        for attempt in range(self.max_retries):
+            if attempt > 0:
+                wait_s = self.retry_backoff_s * 2 ** (attempt - 1)
+                logging.info(f"重试下载 {dest.name} (第 {attempt + 1} 次)，等待 {wait_s:.0f} 秒")
+                time.sleep(wait_s)
+            try:
+                self._fetch(url, dest, expected_size, on_position)
+                return True
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                logging.warning(f"下载 {dest.name} 失败: {e!r}")
+        return False
+
+    def download_models(self, models: Dict[str, Dict], dest_dirs: Dict[str, Path],
+                        on_model_done: Optional[Callable[[str, bool], None]] = None) -> Dict[str, bool]:
+        """
+        并行下载多个模型的全部文件
+
+        Args:
+            models: {模型名称: {"model_id", "revision"}}
+            dest_dirs: {模型名称: 本地目录}
+            on_model_done: 某个模型全部文件结束后的回调 (模型名称, 是否成功)
+
+        Returns:
+            Dict[str, bool]: 每个模型的下载结果，文件列表获取失败的模型不在其中，
+            文件列表中有不安全路径的模型为 False
+        """
+        jobs, rejected = [], []
+        for model_name, model_config in models.items():
+            try:
+                files = self.list_files(model_config["model_id"], model_config["revision"])
+                model_jobs = [
+                    (model_name, self.file_url(model_config["model_id"], model_config["revision"], item["path"]),
+                     resolve_model_file(dest_dirs[model_name], item["path"]), item["size"])
+                    for item in files
+                ]
+            except ValueError as e:
+                # 文件列表中有不安全的路径时整个模型视为下载失败，不写入任何文件
+                logging.error(f"模型 {model_name} 的文件列表不可用: {e}")
+                rejected.append(model_name)
+                continue
+            except (urllib.error.URLError, OSError, RuntimeError) as e:
+                logging.warning(f"获取模型 {model_name} 文件列表失败: {e}")
+                continue
+            jobs.extend(model_jobs)
+
+        progress = DownloadProgress(sum(size for _, _, _, size in jobs))
+        remaining = {name: 0 for name, _, _, _ in jobs}
+        for name, _, _, _ in jobs:
+            remaining[name] += 1
+        results = {name: True for name in remaining}
+        lock = threading.Lock()
+
+        def notify(model_name: str, ok: bool):
+            # 回调异常只记录日志，不中断其他文件的下载
+            if on_model_done is None:
+                return
+            try:
+                on_model_done(model_name, ok)
+            except Exception as e:
+                logging.error(f"模型 {model_name} 下载完成回调失败: {e}", exc_info=True)
+
+        logging.info(f"开始并行下载 {len(jobs)} 个文件（{len(remaining)} 个模型），并发数: {self.max_workers}")
+
+        def run(job):
+            model_name, url, dest, size = job
+            ok = self.download_file(url, dest, size, progress)
+            with lock:
+                results[model_name] = results[model_name] and ok
+                remaining[model_name] -= 1
+                finished = remaining[model_name] == 0
+            if finished:
+                notify(model_name, results[model_name])
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(run, jobs))
+
+        for model_name in rejected:
+            results[model_name] = False
+            notify(model_name, False)
+
+        logging.info(progress.summary())
+        return results
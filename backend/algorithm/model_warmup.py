@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+服务启动时的后台模型预热
+
+按顺序执行一组加载步骤（ASR 引擎、语义模型等），记录每个步骤的状态和耗时，
+供就绪检查接口查询：全部步骤加载完成之前实例不对外接收流量。
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# 步骤状态
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelWarmup:
+    """
+    后台模型预热
+
+    功能特性：
+    - 在后台线程中依次执行加载步骤，不阻塞服务启动
+    - 记录每个步骤的状态（pending / loading / ready / failed）、开始时间和耗时
+    - 某个步骤失败时记录错误并继续后续步骤
+    - 单个步骤也可以由其他流程（如预加载工作池的 preload）通过 run_step 执行并记录
+    """
+
+    def __init__(self, steps: Dict[str, Callable[[], None]]):
+        """
+        初始化预热器
+
+        Args:
+            steps: {步骤名称: 加载函数}，按插入顺序执行
+        """
+        self.steps = dict(steps)
+        self._states = {
+            name: {"state": PENDING, "started_at": None, "duration_s": None, "error": None}
+            for name in self.steps
+        }
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._states[name].update(fields)
+
+    def run_step(self, name: str) -> bool:
+        """
+        在当前线程中执行单个加载步骤并记录状态和耗时
+
+        Args:
+            name: 步骤名称
+
+        Returns:
+            bool: 是否加载成功
+        """
+        self._update(name, state=LOADING, started_at=datetime.now().isoformat(), error=None)
+        start = time.perf_counter()
+        try:
+            self.steps[name]()
+        except Exception as e:
+            self._update(name, state=FAILED, duration_s=round(time.perf_counter() - start, 3),
+                         error=str(e))
+            logging.error(f"模型预热失败 [{name}]: {e}")
+            return False
+        duration = round(time.perf_counter() - start, 3)
+        self._update(name, state=READY, duration_s=duration)
+        logging.info(f"模型预热完成 [{name}]，耗时 {duration:.2f}s")
+        return True
+
+    def run(self):
+        """在当前线程中依次执行全部尚未执行的加载步骤（已由 run_step 单独执行过的步骤跳过）"""
+        for name in self.steps:
+            with self._lock:
+                pending = self._states[name]["state"] == PENDING
+            if pending:
+                self.run_step(name)
+
+    def start(self) -> threading.Thread:
+        """在后台线程中开始预热（重复调用不会重复执行）"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="model-warmup", daemon=True)
+                self._thread.start()
+            return self._thread
+
+    @property
+    def ready(self) -> bool:
+        """全部步骤是否已加载完成"""
+        with self._lock:
+            return all(s["state"] == READY for s in self._states.values())
+
+    def status(self) -> Dict:
+        """
+        预热状态
+
+        Returns:
+            Dict: {"ready": bool, "models": {步骤名称: {"state", "started_at", "duration_s", "error"}}}
+        """
+        with self._lock:
+            models = {name: dict(state) for name, state in self._states.items()}
+        return {
+            "ready": all(s["state"] == READY for s in models.values()),
+            "models": models,
+        }
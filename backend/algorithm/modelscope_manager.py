@@ -4,17 +4,29 @@ ModelScope 模型下载管理器
 
 自动检测和下载项目所需的 ModelScope 模型，确保本地模型可用性。
 支持断点续传、进度显示和错误重试。
+
+缺失的模型通过 model_downloader 以有限并发、HTTP Range 断点续传的方式并行下载。
+下载成功后在模型目录中写入校验清单（文件大小、修改时间；sha256 只在显式要求时计算），
+启动时只需对照清单 stat 一遍文件即可确认模型完整，结果在进程内缓存。
+计算数 GB 模型文件的哈希只在 --deep-verify 或下载时指定 --with-hashes 时进行。
 """
 
+import argparse
+import hashlib
 import os
 import logging
 import subprocess
 import sys
+import tempfile
+import threading
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import json
 import time
 
+from model_downloader import ModelFileDownloader
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -29,8 +41,16 @@ class ModelScopeManager:
     - 支持断点续传和进度显示
     - 错误重试机制
     - 模型版本管理
+    - 基于校验清单的快速完整性检查（进程内缓存），以及按需重新计算哈希的深度校验
     """
     
+    MANIFEST_FILENAME = ".videodevour_manifest.json"
+    HASH_CHUNK_SIZE = 8 * 1024 * 1024
+    
+    # 进程级校验结果缓存: {(项目根目录, 模型名称): 是否完整}
+    _verified_cache: Dict[Tuple[str, str], bool] = {}
+    _verified_lock = threading.Lock()
+    
     # 项目所需的模型配置
     REQUIRED_MODELS = {
         "speech_seaco_paraformer_large_asr_nat-zh-cn-16k-common-vocab8404-pytorch": {
@@ -89,9 +109,126 @@ class ModelScopeManager:
         logging.info(f"项目根目录: {self.project_root}")
         logging.info(f"模型存储目录: {self.models_dir}")
     
+    def _model_path(self, model_name: str) -> Path:
+        """模型的本地目录"""
+        return self.project_root / self.REQUIRED_MODELS[model_name]["local_path"]
+    
+    def _manifest_path(self, model_name: str) -> Path:
+        """模型的校验清单路径"""
+        return self._model_path(model_name) / self.MANIFEST_FILENAME
+    
+    @classmethod
+    def _hash_file(cls, path: Path) -> str:
+        """计算文件的 sha256"""
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    
+    def _iter_model_files(self, model_name: str):
+        """遍历模型目录中的文件（不含校验清单），返回相对路径和 stat 结果"""
+        local_path = self._model_path(model_name)
+        for root, _, files in os.walk(local_path):
+            for filename in files:
+                path = Path(root) / filename
+                rel_path = path.relative_to(local_path).as_posix()
+                # 跳过校验清单及其写入中的临时文件
+                if rel_path.startswith(self.MANIFEST_FILENAME) or rel_path.startswith("._"):
+                    continue
+                yield rel_path, path.stat()
+    
+    def write_manifest(self, model_name: str, with_hashes: bool = False) -> Path:
+        """
+        为模型目录写入校验清单
+        
+        Args:
+            model_name: 模型名称
+            with_hashes: 是否同时记录每个文件的 sha256（较慢）
+            
+        Returns:
+            Path: 校验清单路径
+        """
+        local_path = self._model_path(model_name)
+        files = {}
+        for rel_path, stat in self._iter_model_files(model_name):
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime}
+            if with_hashes:
+                entry["sha256"] = self._hash_file(local_path / rel_path)
+            files[rel_path] = entry
+        
+        manifest = {
+            "model_id": self.REQUIRED_MODELS[model_name]["model_id"],
+            "revision": self.REQUIRED_MODELS[model_name]["revision"],
+            "created_at": datetime.now().isoformat(),
+            "files": files,
+        }
+        manifest_path = self._save_manifest(model_name, manifest)
+        logging.info(f"已写入模型校验清单: {manifest_path}（{len(files)} 个文件）")
+        return manifest_path
+    
+    def _save_manifest(self, model_name: str, manifest: Dict) -> Path:
+        """以唯一的临时文件写入校验清单再原子替换，写入中断时不会留下损坏的清单"""
+        manifest_path = self._manifest_path(model_name)
+        fd, tmp_path = tempfile.mkstemp(dir=manifest_path.parent, prefix=f"{self.MANIFEST_FILENAME}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, manifest_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return manifest_path
+    
+    def _load_manifest(self, model_name: str) -> Optional[Dict]:
+        """读取校验清单，不存在或版本不一致时返回 None"""
+        manifest_path = self._manifest_path(model_name)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        
+        model_config = self.REQUIRED_MODELS[model_name]
+        if manifest.get("model_id") != model_config["model_id"] or manifest.get("revision") != model_config["revision"]:
+            logging.warning(f"模型 {model_name} 的校验清单版本与配置不一致，忽略清单")
+            return None
+        return manifest
+    
+    def _check_manifest(self, model_name: str, manifest: Dict) -> bool:
+        """
+        对照校验清单逐个 stat 文件
+        
+        文件缺失或大小不一致视为不完整；只有修改时间变化（例如整体拷贝到新机器）时
+        仍视为完整，但提示可运行深度校验。
+        """
+        local_path = self._model_path(model_name)
+        mtime_changed = 0
+        for rel_path, entry in manifest["files"].items():
+            try:
+                stat = os.stat(local_path / rel_path)
+            except OSError:
+                logging.warning(f"模型 {model_name} 缺少文件: {rel_path}")
+                return False
+            if stat.st_size != entry["size"]:
+                logging.warning(f"模型 {model_name} 文件大小不一致: {rel_path}")
+                return False
+            if stat.st_mtime != entry["mtime"]:
+                mtime_changed += 1
+        
+        if mtime_changed:
+            logging.info(f"模型 {model_name} 有 {mtime_changed} 个文件修改时间变化，"
+                         f"如需确认内容可运行: python modelscope_manager.py --deep-verify")
+        return True
+    
     def check_model_exists(self, model_name: str) -> bool:
         """
-        检查指定模型是否存在于本地
+        检查指定模型是否存在于本地（结果在进程内缓存）
+        
+        有校验清单时对照清单检查，否则检查关键文件，通过后补写清单。
         
         Args:
             model_name: 模型名称（在 REQUIRED_MODELS 中定义）
@@ -102,13 +239,42 @@ class ModelScopeManager:
         if model_name not in self.REQUIRED_MODELS:
             logging.error(f"未知模型: {model_name}")
             return False
-            
-        model_config = self.REQUIRED_MODELS[model_name]
-        local_path = self.project_root / model_config["local_path"]
         
-        # 检查模型目录是否存在且包含必要文件
-        if not local_path.exists():
-            return False
+        cache_key = (str(self.project_root), model_name)
+        with self._verified_lock:
+            cached = self._verified_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        if not self._model_path(model_name).exists():
+            exists = False
+        else:
+            manifest = self._load_manifest(model_name)
+            if manifest is not None:
+                exists = self._check_manifest(model_name, manifest)
+            else:
+                exists = self._check_key_files(model_name)
+                if exists:
+                    try:
+                        self.write_manifest(model_name)
+                    except OSError as e:
+                        logging.warning(f"模型 {model_name} 校验清单写入失败: {e}")
+        
+        # 只缓存完整的结果，缺失的模型下载后需要重新检查
+        if exists:
+            with self._verified_lock:
+                self._verified_cache[cache_key] = True
+        return exists
+    
+    @classmethod
+    def clear_verification_cache(cls):
+        """清空进程内的校验结果缓存"""
+        with cls._verified_lock:
+            cls._verified_cache.clear()
+    
+    def _check_key_files(self, model_name: str) -> bool:
+        """检查模型目录是否包含关键文件（没有校验清单时使用）"""
+        local_path = self._model_path(model_name)
             
         # 根据不同模型定义不同的关键文件
         if model_name == "speech_campplus_sv_zh-cn_16k-common":
@@ -124,6 +290,65 @@ class ModelScopeManager:
                 
         return True
     
+    def deep_verify(self, model_names: Optional[List[str]] = None, record_hashes: bool = False) -> Dict[str, Dict]:
+        """
+        深度校验：重新计算清单中已记录哈希的文件的 sha256 并比对
+        
+        清单中尚未记录哈希的文件只比对大小；record_hashes 为 True 时（--deep-verify）
+        改为以当前内容为基准补记哈希。没有清单的模型按关键文件检查后写入清单。
+        
+        Args:
+            model_names: 要校验的模型，默认全部本地已存在的模型
+            record_hashes: 是否为尚未记录哈希的文件计算并补记哈希
+            
+        Returns:
+            Dict[str, Dict]: {模型名称: {"ok", "missing", "mismatched", "hashed"}}
+        """
+        if model_names is None:
+            model_names = [name for name in self.REQUIRED_MODELS if self._model_path(name).exists()]
+        
+        report = {}
+        for model_name in model_names:
+            local_path = self._model_path(model_name)
+            manifest = self._load_manifest(model_name)
+            if manifest is None:
+                if not self._check_key_files(model_name):
+                    report[model_name] = {"ok": False, "missing": [], "mismatched": [], "hashed": False}
+                    logging.info(f"深度校验 {model_name}: ❌ 缺少关键文件")
+                    continue
+                logging.info(f"模型 {model_name} 没有校验清单，将以当前文件为基准生成")
+                self.write_manifest(model_name, with_hashes=record_hashes)
+                report[model_name] = {"ok": True, "missing": [], "mismatched": [], "hashed": record_hashes}
+                continue
+            
+            missing, mismatched, updated = [], [], False
+            for rel_path, entry in manifest["files"].items():
+                path = local_path / rel_path
+                if not path.exists():
+                    missing.append(rel_path)
+                    continue
+                if "sha256" in entry:
+                    if self._hash_file(path) != entry["sha256"]:
+                        mismatched.append(rel_path)
+                elif path.stat().st_size != entry["size"]:
+                    mismatched.append(rel_path)
+                elif record_hashes:
+                    entry["sha256"] = self._hash_file(path)
+                    updated = True
+            
+            if updated and not missing and not mismatched:
+                self._save_manifest(model_name, manifest)
+            
+            ok = not missing and not mismatched
+            report[model_name] = {"ok": ok, "missing": missing, "mismatched": mismatched, "hashed": updated}
+            status = "✅ 通过" if ok else f"❌ 缺失 {len(missing)} 个，内容不一致 {len(mismatched)} 个"
+            logging.info(f"深度校验 {model_name}: {status}")
+            
+            if not ok:
+                with self._verified_lock:
+                    self._verified_cache.pop((str(self.project_root), model_name), None)
+        return report
+    
     def get_missing_models(self) -> List[str]:
         """
         获取缺失的模型列表
@@ -163,13 +388,14 @@ class ModelScopeManager:
                 logging.error(f"modelscope 安装失败: {e}")
                 return False
     
-    def download_model(self, model_name: str, force_download: bool = False) -> bool:
+    def download_model(self, model_name: str, force_download: bool = False, with_hashes: bool = False) -> bool:
         """
         下载指定模型
         
         Args:
             model_name: 模型名称
             force_download: 是否强制重新下载
+            with_hashes: 校验清单是否记录 sha256（需要完整读取模型文件）
             
         Returns:
             bool: 下载是否成功
@@ -211,24 +437,37 @@ class ModelScopeManager:
             logging.info(f"模型 {model_name} 下载成功")
             logging.info(f"缓存路径: {cache_dir}")
             
-            # 验证下载是否成功
-            if self.check_model_exists(model_name):
-                logging.info(f"模型 {model_name} 验证成功")
-                return True
-            else:
-                logging.error(f"模型 {model_name} 下载后验证失败")
-                return False
+            return self._finish_download(model_name, with_hashes)
                 
         except Exception as e:
             logging.error(f"模型 {model_name} 下载失败: {str(e)}")
             return False
     
-    def download_all_missing_models(self, max_retries: int = 3) -> Dict[str, bool]:
+    def _finish_download(self, model_name: str, with_hashes: bool = False) -> bool:
+        """验证下载是否成功，并为新下载的文件写入校验清单（默认只记录大小和修改时间）"""
+        if self._check_key_files(model_name):
+            self.write_manifest(model_name, with_hashes=with_hashes)
+            with self._verified_lock:
+                self._verified_cache[(str(self.project_root), model_name)] = True
+            logging.info(f"模型 {model_name} 验证成功")
+            return True
+        logging.error(f"模型 {model_name} 下载后验证失败")
+        return False
+    
+    def download_all_missing_models(self, max_retries: int = 3, max_workers: int = 4,
+                                    endpoint: Optional[str] = None, with_hashes: bool = False) -> Dict[str, bool]:
         """
-        下载所有缺失的模型
+        并行下载所有缺失的模型
+        
+        各模型的文件在同一个线程池中下载，同时下载的文件数不超过 max_workers；
+        未完成的文件在重试时断点续传。无法通过 HTTP 接口获取文件列表的模型
+        退回到 snapshot_download 逐个下载。
         
         Args:
-            max_retries: 最大重试次数
+            max_retries: 每个文件的最大尝试次数
+            max_workers: 同时下载的文件数上限
+            endpoint: ModelScope 接口地址，默认读取 MODELSCOPE_DOMAIN 环境变量
+            with_hashes: 校验清单是否记录 sha256（需要完整读取模型文件）
             
         Returns:
             Dict[str, bool]: 每个模型的下载结果
@@ -245,20 +484,38 @@ class ModelScopeManager:
         total_size = sum(self.REQUIRED_MODELS[model]["size_gb"] for model in missing_models)
         logging.info(f"预计总下载大小: {total_size:.1f} GB")
         
+        downloader = ModelFileDownloader(endpoint=endpoint, max_workers=max_workers, max_retries=max_retries)
         results = {}
         
+        def on_model_done(model_name: str, success: bool):
+            # 某个模型的文件全部结束后立即校验，不必等待其他模型
+            results[model_name] = success and self._finish_download(model_name, with_hashes)
+            if results[model_name]:
+                logging.info(f"✅ 模型 {model_name} 下载成功")
+            else:
+                logging.error(f"❌ 模型 {model_name} 下载失败（已重试 {max_retries} 次）")
+        
+        downloader.download_models(
+            {name: self.REQUIRED_MODELS[name] for name in missing_models},
+            {name: self._model_path(name) for name in missing_models},
+            on_model_done=on_model_done,
+        )
+        
         for model_name in missing_models:
+            if model_name in results:
+                continue
             logging.info(f"\n{'='*50}")
-            logging.info(f"正在处理模型: {model_name}")
+            logging.info(f"使用 snapshot_download 下载模型: {model_name}")
             logging.info(f"描述: {self.REQUIRED_MODELS[model_name]['description']}")
             
             success = False
             for attempt in range(max_retries):
                 if attempt > 0:
-                    logging.info(f"重试下载 {model_name} (第 {attempt + 1} 次)")
-                    time.sleep(5)  # 等待 5 秒后重试
+                    wait_s = downloader.retry_backoff_s * 2 ** (attempt - 1)
+                    logging.info(f"重试下载 {model_name} (第 {attempt + 1} 次)，等待 {wait_s:.0f} 秒")
+                    time.sleep(wait_s)
                     
-                success = self.download_model(model_name)
+                success = self.download_model(model_name, with_hashes=with_hashes)
                 if success:
                     break
                     
@@ -326,13 +583,24 @@ class ModelScopeManager:
 
 def main():
     """主函数 - 用于测试和手动下载模型"""
+    parser = argparse.ArgumentParser(description="ModelScope 模型下载与校验")
+    parser.add_argument("--deep-verify", action="store_true", help="重新计算模型文件哈希并与校验清单比对")
+    parser.add_argument("--with-hashes", action="store_true", help="下载完成后在校验清单中记录文件哈希")
+    parser.add_argument("--workers", type=int, default=4, help="同时下载的文件数上限")
+    parser.add_argument("models", nargs="*", help="要深度校验的模型名称，默认全部")
+    args = parser.parse_args()
+    
     manager = ModelScopeManager()
     
+    if args.deep_verify:
+        report = manager.deep_verify(args.models or None, record_hashes=True)
+        sys.exit(0 if all(r["ok"] for r in report.values()) else 1)
+    
     # 打印当前状态
     manager.print_model_status()
     
     # 下载缺失的模型
-    results = manager.download_all_missing_models()
+    results = manager.download_all_missing_models(max_workers=args.workers, with_hashes=args.with_hashes)
     
     if results:
         # 再次打印状态
@@ -5,13 +5,20 @@ This module contains the core pipeline logic for processing videos.
 import logging
 import os
 import json
+import threading
 from datetime import datetime
 
 # Local imports from the project
-from backend.devour.asr_engine_paraformer_v2 import VideoDevourASRParaformerV2
+from backend.devour.asr_engine import select_engine
+from backend.devour.asr_engine_pool import get_asr_engine_pool
 from backend.algorithm.data_processor import ASRProcessor
+from backend.algorithm.dialogue_chunker import policies_from_config
+from backend.algorithm.asr_result_io import build_header, write_header
+from backend.algorithm.transcript_store import store_path, write_transcript_store
 from backend.algorithm.llm_handler import LLMHandler
-from backend.algorithm.text_similarity_matcher import TextSimilarityMatcher
+from backend.algorithm.text_similarity_matcher import SENTENCE_TRANSFORMERS_AVAILABLE, TextSimilarityMatcher, get_semantic_model
+from backend.algorithm.prefork import PreforkExecutor
+from backend.algorithm.model_warmup import ModelWarmup
 import backend.algorithm.outline_handler as outline_handler
 import backend.algorithm.video_handler as video_handler
 import backend.algorithm.image_processor as image_processor
@@ -51,22 +58,152 @@ def _setup_environment(video_path: str):
     
     return main_output_path, video_name, timestamp
 
+def _get_asr_pool():
+    """
+    Returns the process-wide ASR engine pool configured from config.
+    
+    config.ASR_ENGINE names an engine from the registry in asr_engine.py, or 'auto'
+    to pick the cheapest available engine meeting ASR_MAX_RTF / ASR_MIN_QUALITY.
+    """
+    engine_name = getattr(config, 'ASR_ENGINE', 'paraformer_v2')
+    if engine_name == 'auto':
+        engine_name = select_engine(
+            max_rtf=getattr(config, 'ASR_MAX_RTF', None),
+            min_quality=getattr(config, 'ASR_MIN_QUALITY', None),
+        )
+    if engine_name == 'onnx':
+        engine_kwargs = {
+            'intra_op_threads': getattr(config, 'ASR_ONNX_INTRA_OP_THREADS', 4),
+            'inter_op_threads': getattr(config, 'ASR_ONNX_INTER_OP_THREADS', 1),
+        }
+    elif engine_name == 'paraformer_v2':
+        engine_kwargs = {
+            'quantize_int8': getattr(config, 'ASR_QUANTIZE_INT8', False),
+            'trim_silence': getattr(config, 'ASR_TRIM_SILENCE', False),
+            'shard_workers': getattr(config, 'ASR_SHARD_WORKERS', 1),
+        }
+    else:
+        engine_kwargs = {}
+    return get_asr_engine_pool(
+        getattr(config, 'ASR_ENGINE_POOL_SIZE', 1),
+        engine_kwargs=engine_kwargs,
+        engine_name=engine_name,
+    )
+
+def _model_warmup_steps():
+    """Returns the model-loading steps of the warm-up, keyed by step name."""
+    steps = {'asr_engine': lambda: _get_asr_pool().preload()}
+    if SENTENCE_TRANSFORMERS_AVAILABLE:
+        steps['semantic_model'] = get_semantic_model
+    return steps
+
+def preload_pipeline_models():
+    """
+    Loads the ASR engines (Paraformer / punctuation / CAM++) and the MiniLM matcher model.
+    
+    Each model is loaded as a step of the model warm-up, so /api/ready reports
+    per-model states and durations for the loads done before forking workers.
+    """
+    warmup = get_model_warmup()
+    models = warmup.status()["models"]
+    for name in _model_warmup_steps():
+        if models[name]["state"] != "ready":
+            warmup.run_step(name)
+
+_prefork_executor = None
+_prefork_lock = threading.Lock()
+
+def get_prefork_executor():
+    """
+    Returns the shared pre-fork executor for pipeline runs, or None when
+    config.PIPELINE_WORKERS is not set. Models are loaded once in this process
+    and shared copy-on-write with the forked workers.
+    """
+    global _prefork_executor
+    workers = getattr(config, 'PIPELINE_WORKERS', 0)
+    if workers < 1:
+        return None
+    if _prefork_executor is None:
+        with _prefork_lock:
+            if _prefork_executor is None:
+                _prefork_executor = PreforkExecutor(workers, preload=preload_pipeline_models)
+    return _prefork_executor
+
+_model_warmup = None
+_model_warmup_lock = threading.Lock()
+
+def get_model_warmup():
+    """
+    Returns the process-wide background warm-up for the models listed in
+    config.WARMUP_MODELS ('asr_engine', 'semantic_model'). When the pre-fork
+    executor is enabled, pipelines run in its workers: the preload runs every
+    model step in the parent before forking, and a final 'prefork_workers' step
+    reports the fork. The API forks on the main thread at startup before this
+    warm-up thread starts, so the thread only finds the steps already done.
+    """
+    global _model_warmup
+    if _model_warmup is None:
+        with _model_warmup_lock:
+            if _model_warmup is None:
+                steps = _model_warmup_steps()
+                prefork = get_prefork_executor()
+                if prefork is not None:
+                    steps['prefork_workers'] = prefork.start
+                else:
+                    wanted = getattr(config, 'WARMUP_MODELS', ('asr_engine', 'semantic_model'))
+                    steps = {name: load for name, load in steps.items() if name in wanted}
+                _model_warmup = ModelWarmup(steps)
+    return _model_warmup
+
+def _write_json_in_background(path: str, data, header: dict = None, transcript=None) -> threading.Thread:
+    """
+    Writes data to path as JSON on a background thread. The file is written
+    under a temporary name and renamed, so readers never see a partial file.
+    If header is given, the metadata sidecar is written once the JSON is in place;
+    if transcript is given, the binary time-indexed transcript is written next to it.
+    """
+    def write():
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            if header is not None:
+                write_header(path, header)
+            if transcript is not None and len(transcript):
+                write_transcript_store(store_path(path), transcript)
+            logging.info(f"ASR结果已保存到: {path}")
+        except Exception as e:
+            logging.error(f"保存ASR结果失败: {e}", exc_info=True)
+
+    writer = threading.Thread(target=write, name="asr-result-writer", daemon=True)
+    writer.start()
+    return writer
+
 def _run_asr_and_process(video_path: str, video_name: str, main_output_path: str):
-    """Runs ASR on the video and processes the result."""
+    """
+    Runs ASR on the video and processes the in-memory result. The JSON artifact
+    is written in the background; returns (processed_dialogue, writer thread).
+    """
     logging.info("--- 步骤 0 & 1: 语音识别与数据处理 ---")
-    asr_engine = VideoDevourASRParaformerV2()
-    asr_result = asr_engine.devour_video(video_path)
+    pool = _get_asr_pool()
+    with pool.engine() as asr_engine:
+        options = {'streaming': getattr(config, 'ASR_STREAMING', False)} if asr_engine.SUPPORTS_STREAMING else {}
+        asr_result = asr_engine.normalize(
+            asr_engine.devour_video(video_path, task_dir=main_output_path, **options)
+        )
+    logging.info(f"ASR引擎池状态: {pool.stats()}")
     asr_result_path = os.path.join(main_output_path, f"{video_name}_asr_result.json")
-    with open(asr_result_path, 'w', encoding='utf-8') as f:
-        json.dump([asr_result], f, ensure_ascii=False, indent=2)
-    logging.info(f"ASR结果已保存到: {asr_result_path}")
+    processor = ASRProcessor.from_result([asr_result], chunk_policies=policies_from_config(config))
+    # The binary store is written from the processor's columnar transcript (None for v1 results)
+    writer = _write_json_in_background(asr_result_path, [asr_result], header=build_header(asr_result),
+                                       transcript=processor.transcript)
     
-    processor = ASRProcessor(asr_result_path)
     processed_dialogue = processor.process()
     if not processed_dialogue:
         logging.warning("处理后的对话为空。")
     logging.info("--- ASR数据处理完成 ---")
-    return processed_dialogue
+    return processed_dialogue, writer
 
 def _generate_and_match_outline(processed_dialogue: list, main_output_path: str):
     """Generates an outline and matches dialogue chunks to its headings."""
@@ -121,10 +258,11 @@ def _generate_and_match_outline(processed_dialogue: list, main_output_path: str)
 
 def run_full_pipeline(video_path: str):
     """Orchestrates the full video processing pipeline."""
+    asr_writer = None
     try:
         main_output_path, video_name, timestamp = _setup_environment(video_path)
         
-        processed_dialogue = _run_asr_and_process(video_path, video_name, main_output_path)
+        processed_dialogue, asr_writer = _run_asr_and_process(video_path, video_name, main_output_path)
         if not processed_dialogue:
             raise ValueError("ASR处理后对话为空，流程中止。")
 
@@ -174,3 +312,7 @@ def run_full_pipeline(video_path: str):
     except Exception as e:
         logging.error(f"处理流程中发生错误: {e}", exc_info=True)
         print(f"处理失败，发生未知错误: {e}")
+    finally:
+        # The ASR artifact must be on disk before the run is reported as finished
+        if asr_writer is not None:
+            asr_writer.join()
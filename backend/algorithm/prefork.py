@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+预加载 + fork 的多进程工作池
+
+在父进程中一次性加载所有模型，再以 fork 方式创建工作进程。子进程继承父进程的
+内存页，模型权重在被写入之前一直由所有工作进程共享（写时复制），
+每个工作进程不再各自持有一份 Paraformer / 标点 / CAM++ / MiniLM 权重。
+
+同时提供基于 /proc/<pid>/smaps_rollup 的内存报告，区分每个工作进程独占的内存和共享的内存。
+
+fork 只复制调用线程：其他线程在 fork 时持有的锁在子进程中永远不会释放（Python 3.12 起
+对多线程进程调用 fork 会给出 DeprecationWarning）。因此 start() 应在启动任何线程之前、
+在主线程中调用——API 在 startup 钩子中最先调用它，随后才启动后台预热线程；
+fork 时进程中已有其他线程会记录警告，线程数见 memory_report() 的 threads_at_fork。
+"""
+
+import gc
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, float]:
+    """
+    解析 /proc/<pid>/smaps_rollup
+
+    Args:
+        text: smaps_rollup 文件内容
+
+    Returns:
+        Dict[str, float]: rss / pss / shared / unique（MB）
+    """
+    fields = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 3 and parts[0].endswith(':') and parts[2] == 'kB':
+            fields[parts[0][:-1]] = int(parts[1])
+
+    to_mb = lambda kb: round(kb / 1024, 1)
+    return {
+        "rss_mb": to_mb(fields.get("Rss", 0)),
+        "pss_mb": to_mb(fields.get("Pss", 0)),
+        "shared_mb": to_mb(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)),
+        "unique_mb": to_mb(fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)),
+    }
+
+
+def os_thread_count() -> int:
+    """
+    当前进程的操作系统线程数（包括 torch / OpenMP 等原生线程）
+
+    非 Linux 时退化为 Python 线程数。
+    """
+    try:
+        with open("/proc/self/status", 'r') as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+def _noop():
+    return os.getpid()
+
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """
+    读取单个进程的内存占用
+
+    Returns:
+        Optional[Dict[str, float]]: parse_smaps_rollup 的结果，非 Linux 或进程已退出时返回 None
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            return parse_smaps_rollup(f.read())
+    except OSError:
+        return None
+
+
+class PreforkExecutor:
+    """
+    预加载模型后 fork 出工作进程的执行器
+
+    功能特性：
+    - 首次提交任务前在父进程中执行 preload，加载全部模型
+    - 冻结 GC 跟踪的对象，避免子进程 GC 扫描时改写对象头、触发整页复制
+    - 以 fork 方式一次性创建全部工作进程，共享父进程中的模型权重
+    - start() 返回时全部工作进程均已创建并可以执行任务
+    - 提供父进程和各工作进程的独占 / 共享内存报告
+    """
+
+    def __init__(self, workers: int, preload: Optional[Callable] = None):
+        """
+        初始化执行器
+
+        Args:
+            workers: 工作进程数
+            preload: 在父进程中加载模型的函数
+        """
+        if workers < 1:
+            raise ValueError(f"工作进程数必须大于 0，当前为: {workers}")
+        self.workers = workers
+        self.preload = preload
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.threads_at_fork: Optional[int] = None
+
+    def _start(self) -> ProcessPoolExecutor:
+        """预加载模型并 fork 工作进程"""
+        with self._lock:
+            if self._executor is None:
+                if self.preload is not None:
+                    logging.info("正在父进程中预加载模型...")
+                    self.preload()
+                gc.collect()
+                gc.freeze()
+                self.threads_at_fork = os_thread_count()
+                if self.threads_at_fork > 1:
+                    logging.warning(f"fork 工作进程时进程中已有 {self.threads_at_fork} 个线程，"
+                                    f"应在启动其他线程之前调用 PreforkExecutor.start()")
+                executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=get_context("fork"),
+                )
+                # 进程池只在提交任务时创建进程：提交并等待与工作进程数相同的空任务，
+                # 确保返回前全部工作进程都已 fork 完成
+                for future in [executor.submit(_noop) for _ in range(self.workers)]:
+                    future.result()
+                self._executor = executor
+                logging.info(f"预加载完成，fork 出 {len(self._worker_pids())} 个工作进程")
+            return self._executor
+
+    def _worker_pids(self) -> List[int]:
+        """本执行器的工作进程 pid"""
+        executor = self._executor
+        processes = getattr(executor, "_processes", None) or {}
+        return list(processes)
+
+    def start(self):
+        """
+        预加载模型并创建全部工作进程（否则在首次提交任务时进行）
+
+        需在启动其他线程之前于主线程中调用，见模块说明。
+        """
+        self._start()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """在工作进程中执行 fn（fn 需为模块级函数）"""
+        return self._start().submit(fn, *args, **kwargs)
+
+    def memory_report(self) -> Dict:
+        """
+        父进程和各工作进程的内存占用
+
+        Returns:
+            Dict: {"started", "threads_at_fork": fork 时的线程数, "parent": {...},
+                   "workers": [{"pid", "rss_mb", "pss_mb", "shared_mb", "unique_mb"}, ...],
+                   "total_unique_mb": 各进程独占内存之和}
+        """
+        parent = process_memory(os.getpid())
+        workers: List[Dict] = []
+        for pid in self._worker_pids():
+            memory = process_memory(pid)
+            if memory is not None:
+                workers.append({"pid": pid, **memory})
+
+        processes = ([parent] if parent else []) + workers
+        return {
+            "started": self._executor is not None,
+            "threads_at_fork": self.threads_at_fork,
+            "parent": parent,
+            "workers": workers,
+            "total_unique_mb": round(sum(p["unique_mb"] for p in processes), 1),
+        }
+
+    def shutdown(self, wait: bool = True):
+        """关闭工作进程"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+                gc.unfreeze()
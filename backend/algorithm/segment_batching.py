@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+VAD 流式分段与片段分批识别
+
+SenseVoice 引擎（backend/devour/asr_engine_paraformer.py）的分段与组批逻辑，
+模型以回调的形式传入，本模块不依赖 torch / funasr：
+- stream_vad：按块把 int16 音频送入流式 VAD，拼接跨块的片段
+- bucket_segments：按时长分桶组成批次，每批总时长有上限
+- recognize_batch_with_fallback：整批识别失败时退化为逐条识别
+- concat_with_gaps / split_segments_by_file：Whisper 引擎多文件合并转写时拼接音频、按文件边界拆分结果
+"""
+
+import logging
+from bisect import bisect_right
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from audio_ingest import to_float32
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def stream_vad(generate: Callable, pcm: np.ndarray, sample_rate: int, block_ms: int,
+               max_single_segment_ms: int = 30000) -> List[List[int]]:
+    """
+    流式 VAD：按块送入 FSMN-VAD，只在块内转换为 float32
+
+    Args:
+        generate: 流式 VAD 模型的 generate 方法
+        pcm: 整段 int16 音频（内存映射数组）
+        sample_rate: 采样率
+        block_ms: 每次送入的音频时长（毫秒）
+        max_single_segment_ms: 最大单个片段时长（毫秒）
+
+    Returns:
+        List[List[int]]: VAD 片段 [[start_ms, end_ms], ...]
+    """
+    cache = {}
+    segments = []
+    open_start = None
+    block = int(block_ms * sample_rate / 1000)
+    for start in range(0, len(pcm), block):
+        res = generate(
+            input=to_float32(pcm[start:start + block]),
+            cache=cache,
+            is_final=start + block >= len(pcm),
+            chunk_size=block_ms,
+            max_single_segment_time=max_single_segment_ms,
+        )
+        # 流式输出中 [beg, -1] 表示片段开始、[-1, end] 表示片段结束，两者可能落在不同的块中
+        for beg, end in (res[0].get('value', []) if res else []):
+            if beg != -1 and end != -1:
+                segments.append([beg, end])
+            elif beg != -1:
+                open_start = beg
+            elif open_start is not None:
+                segments.append([open_start, end])
+                open_start = None
+    if open_start is not None:
+        segments.append([open_start, int(len(pcm) * 1000 / sample_rate)])
+    return segments
+
+
+def bucket_segments(segments_vad: Sequence[Sequence[float]], max_batch_s: float) -> List[List[int]]:
+    """
+    将 VAD 片段按时长分桶组成批次
+
+    片段按时长排序后依次装入批次，每个批次的总时长不超过 max_batch_s
+    （单个片段超过上限时独占一批），相近长度的片段放在一起以减少 padding。
+
+    Args:
+        segments_vad: VAD 片段列表 [[start_ms, end_ms], ...]
+        max_batch_s: 每个批次的总时长上限（秒）
+
+    Returns:
+        List[List[int]]: 每个批次包含的片段序号
+    """
+    order = sorted(range(len(segments_vad)), key=lambda i: segments_vad[i][1] - segments_vad[i][0])
+    batches = []
+    current, current_s = [], 0.0
+    for i in order:
+        duration_s = (segments_vad[i][1] - segments_vad[i][0]) / 1000.0
+        if current and current_s + duration_s > max_batch_s:
+            batches.append(current)
+            current, current_s = [], 0.0
+        current.append(i)
+        current_s += duration_s
+    if current:
+        batches.append(current)
+    return batches
+
+
+def recognize_batch_with_fallback(batch: Sequence[int], audios: Sequence[np.ndarray],
+                                  recognize: Callable[[List[np.ndarray]], List[Optional[str]]],
+                                  batch_no: int = 1) -> Dict[int, Optional[str]]:
+    """
+    识别一个批次，整批失败时退化为逐条识别，只跳过真正失败的片段
+
+    Args:
+        batch: 批次内的片段序号
+        audios: 与 batch 一一对应的音频
+        recognize: 批量识别函数，返回与输入一一对应的文本
+        batch_no: 批次编号（用于日志）
+
+    Returns:
+        Dict[int, Optional[str]]: {片段序号: 识别文本}，识别失败为 None
+    """
+    try:
+        return dict(zip(batch, recognize(list(audios))))
+    except Exception as e:
+        logging.warning(f"  批次 {batch_no} 识别失败，改为逐条识别: {str(e)}")
+    texts = {}
+    for i, audio in zip(batch, audios):
+        try:
+            texts[i] = recognize([audio])[0]
+        except Exception as item_error:
+            logging.warning(f"  片段 {i+1} 识别失败: {str(item_error)}")
+            texts[i] = None
+    return texts
+
+
+def concat_with_gaps(audios: Sequence[np.ndarray], sample_rate: int,
+                     gap_s: float) -> Tuple[np.ndarray, List[float]]:
+    """
+    在各文件音频之后插入静音并拼接为一段
+
+    Args:
+        audios: 各文件的 float32 音频
+        sample_rate: 采样率
+        gap_s: 文件之间插入的静音时长（秒）
+
+    Returns:
+        Tuple[np.ndarray, List[float]]: (拼接后的音频, 各文件在拼接音频中的起始时间（秒）)
+    """
+    gap = np.zeros(int(gap_s * sample_rate), dtype=np.float32)
+    offsets, pieces, position = [], [], 0
+    for audio in audios:
+        offsets.append(position / sample_rate)
+        pieces.extend([audio, gap])
+        position += len(audio) + len(gap)
+    return (np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)), offsets
+
+
+def split_segments_by_file(segments: Sequence[Dict], offsets: Sequence[float]) -> List[List[Dict]]:
+    """
+    按文件边界拆分合并转写的片段，时间戳换算为各文件内时间
+
+    片段按开始时间归属：开始于某个文件（或其后的静音间隔）内的片段属于该文件。
+
+    Args:
+        segments: 合并转写的片段 [{"start", "end", ...}, ...]
+        offsets: 各文件在拼接音频中的起始时间（秒，升序）
+
+    Returns:
+        List[List[Dict]]: 与文件一一对应的片段列表
+    """
+    per_file = [[] for _ in offsets]
+    for segment in segments:
+        file_idx = max(0, bisect_right(offsets, segment['start']) - 1)
+        offset = offsets[file_idx]
+        per_file[file_idx].append({
+            **segment,
+            "start": segment['start'] - offset,
+            "end": segment['end'] - offset,
+        })
+    return per_file
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+语音区间压缩
+
+根据 VAD 检测到的语音片段，把长时间的静音 / 纯音乐段落从音频中剔除，
+只把语音区间拼接成紧凑的音频交给 ASR 模型。压缩时记录偏移映射，
+识别结果的时间戳通过映射换算回原视频时间，因此下游按时间戳切分视频、
+抽取帧的步骤无需感知压缩。
+"""
+
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class OffsetMap:
+    """
+    压缩音频时间 -> 原始音频时间的分段线性映射
+
+    每个保留区间记录其在压缩音频中的起点、在原始音频中的起点和长度（秒）。
+    """
+
+    def __init__(self, compact_starts: Sequence[float], original_starts: Sequence[float],
+                 lengths: Sequence[float]):
+        self.compact_starts = np.asarray(compact_starts, dtype=np.float64)
+        self.original_starts = np.asarray(original_starts, dtype=np.float64)
+        self.lengths = np.asarray(lengths, dtype=np.float64)
+
+    @property
+    def compact_duration(self) -> float:
+        """压缩后的音频总时长（秒）"""
+        return float(self.lengths.sum())
+
+    def to_original(self, t, is_end: bool = False):
+        """
+        将压缩音频中的时间换算为原始音频时间
+
+        Args:
+            t: 压缩音频时间（秒），标量或数组
+            is_end: 是否为结束时间；恰好落在两个区间交界处时，结束时间映射到前一区间的末尾，
+                    开始时间映射到后一区间的开头
+
+        Returns:
+            与输入形状一致的原始音频时间（秒）
+        """
+        if len(self.lengths) == 0:
+            return t
+        t_arr = np.asarray(t, dtype=np.float64)
+        side = 'left' if is_end else 'right'
+        idx = np.clip(np.searchsorted(self.compact_starts, t_arr, side=side) - 1, 0, len(self.lengths) - 1)
+        offset = np.clip(t_arr - self.compact_starts[idx], 0.0, self.lengths[idx])
+        original = self.original_starts[idx] + offset
+        return float(original) if original.ndim == 0 else original
+
+    def remap_transcript(self, transcript: List[Dict]) -> List[Dict]:
+        """
+        原地换算标准化转录结果中的 start_time / end_time
+
+        Args:
+            transcript: normalize_result 格式的句子列表（时间戳为压缩音频时间）
+
+        Returns:
+            List[Dict]: 同一列表，时间戳已换算为原始音频时间
+        """
+        if not transcript:
+            return transcript
+        starts = self.to_original(np.array([s["start_time"] for s in transcript]))
+        ends = self.to_original(np.array([s["end_time"] for s in transcript]), is_end=True)
+        for sentence, st, ed in zip(transcript, np.atleast_1d(starts), np.atleast_1d(ends)):
+            sentence["start_time"] = round(float(st), 3)
+            sentence["end_time"] = round(float(max(st, ed)), 3)
+        return transcript
+
+
+def merge_speech_regions(segments_ms: Sequence[Sequence[float]], total_s: float,
+                         pad_s: float = 0.2, min_gap_s: float = 1.0) -> List[Tuple[float, float]]:
+    """
+    把 VAD 片段扩展边距后合并为保留区间
+
+    Args:
+        segments_ms: VAD 片段 [[start_ms, end_ms], ...]
+        total_s: 原始音频总时长（秒）
+        pad_s: 每个片段两端保留的静音边距（秒），避免切掉字头字尾
+        min_gap_s: 短于该值的间隔不剔除，保留自然停顿
+
+    Returns:
+        List[Tuple[float, float]]: 升序排列、互不重叠的保留区间（秒）
+    """
+    regions: List[Tuple[float, float]] = []
+    for start_ms, end_ms in sorted(segments_ms):
+        if end_ms < 0:
+            end_ms = total_s * 1000
+        start = max(0.0, start_ms / 1000 - pad_s)
+        end = min(total_s, end_ms / 1000 + pad_s)
+        if end <= start:
+            continue
+        if regions and start - regions[-1][1] < min_gap_s:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+def compact_speech(audio: np.ndarray, segments_ms: Sequence[Sequence[float]], sample_rate: int,
+                   pad_s: float = 0.2, min_gap_s: float = 1.0) -> Tuple[np.ndarray, OffsetMap]:
+    """
+    只保留语音区间，拼接为紧凑音频
+
+    Args:
+        audio: 原始音频
+        segments_ms: VAD 片段 [[start_ms, end_ms], ...]
+        sample_rate: 采样率
+        pad_s: 片段两端保留的边距（秒）
+        min_gap_s: 最短剔除间隔（秒）
+
+    Returns:
+        Tuple[np.ndarray, OffsetMap]: (紧凑音频, 压缩时间 -> 原始时间映射)
+    """
+    total_s = len(audio) / sample_rate
+    regions = merge_speech_regions(segments_ms, total_s, pad_s, min_gap_s)
+
+    pieces, compact_starts, original_starts, lengths = [], [], [], []
+    compact_samples = 0
+    for start, end in regions:
+        start_sample, end_sample = int(start * sample_rate), int(end * sample_rate)
+        if end_sample <= start_sample:
+            continue
+        pieces.append(audio[start_sample:end_sample])
+        compact_starts.append(compact_samples / sample_rate)
+        original_starts.append(start_sample / sample_rate)
+        lengths.append((end_sample - start_sample) / sample_rate)
+        compact_samples += end_sample - start_sample
+
+    compact = np.concatenate(pieces) if pieces else audio[:0]
+    offset_map = OffsetMap(compact_starts, original_starts, lengths)
+    logging.info(f"语音区间压缩: {total_s:.1f}s -> {offset_map.compact_duration:.1f}s"
+                 f"（{len(regions)} 个区间，剔除 {total_s - offset_map.compact_duration:.1f}s 静音 / 非语音）")
+    return compact, offset_map
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ASR 调优配置的参数选择和读写
+"""
+import logging
+import tempfile
+
+from asr_autotune import build_profile, load_host_profile, save_host_profile, select_best, thread_candidates
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MEASUREMENTS = [
+    {"num_threads": 4, "batch_size_s": 300, "rtf": 0.100, "peak_rss_mb": 3000},
+    {"num_threads": 8, "batch_size_s": 300, "rtf": 0.098, "peak_rss_mb": 3100},
+    {"num_threads": 8, "batch_size_s": 600, "rtf": 0.060, "peak_rss_mb": 5200},
+    {"num_threads": 16, "batch_size_s": 600, "rtf": None, "peak_rss_mb": 9000},
+]
+
+
+def test_thread_candidates():
+    """
+    线程数按 2 的幂递增，上限为每个并发任务可分到的核数
+    """
+    assert thread_candidates(32) == [1, 2, 4, 8, 16, 32]
+    assert thread_candidates(32, concurrency=4) == [1, 2, 4, 8]
+    assert thread_candidates(12, concurrency=2) == [1, 2, 4, 6]
+    assert thread_candidates(2, concurrency=8) == [1]
+
+
+def test_select_best():
+    """
+    取 RTF 最小的组合，受内存上限约束，RTF 接近时优先更少线程
+    """
+    assert select_best(MEASUREMENTS)["batch_size_s"] == 600
+    assert select_best(MEASUREMENTS, max_rss_mb=4000) == MEASUREMENTS[0]
+    assert select_best(MEASUREMENTS, max_rss_mb=1000) is None
+
+
+def test_profile_roundtrip():
+    """
+    保存后可以读回，设备不一致时视为失效
+    """
+    with tempfile.TemporaryDirectory() as profile_dir:
+        assert load_host_profile(profile_dir) is None
+
+        best = select_best(MEASUREMENTS)
+        save_host_profile(build_profile(MEASUREMENTS, best, "ref.mp4", 1, "cpu"), profile_dir)
+
+        profile = load_host_profile(profile_dir, device="cpu")
+        assert profile["num_threads"] == 8
+        assert profile["batch_size_s"] == 600
+        assert load_host_profile(profile_dir, device="cuda:0") is None
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ASR 调优配置测试开始\n")
+    test_thread_candidates()
+    test_select_best()
+    test_profile_roundtrip()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ASRResultCache 的命中统计和 LRU 淘汰
+"""
+import logging
+import sys
+import tempfile
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+from asr_cache import ASRResultCache
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SIGNATURE = {"engine": "VideoDevourASRParaformerV2", "models": {"iic/model": "v2.0.4"}}
+
+
+def test_cache_key():
+    """
+    相同音频和模型得到相同的键，音频或模型版本变化时键也变化
+    """
+    pcm = np.arange(1000, dtype=np.int16)
+    key = ASRResultCache.make_key(pcm, SIGNATURE)
+
+    assert key == ASRResultCache.make_key(pcm.copy(), SIGNATURE)
+    assert key != ASRResultCache.make_key(pcm[:-1], SIGNATURE)
+    assert key != ASRResultCache.make_key(pcm, {**SIGNATURE, "models": {"iic/model": "v2.0.5"}})
+
+
+def test_cache_hit_miss():
+    """
+    未命中 -> 写入 -> 命中；命中不写统计文件，flush_stats 后其他实例可见
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ASRResultCache(cache_dir)
+        result = {"transcript": [{"index": 1, "spk_id": "0", "sentence": "你好", "start_time": 0.0, "end_time": 1.0}]}
+
+        assert cache.get("k1") is None
+        cache.put("k1", result)
+        stats_mtime = Path(cache_dir, "stats.json").stat().st_mtime_ns
+        assert cache.get("k1") == result
+        assert Path(cache_dir, "stats.json").stat().st_mtime_ns == stats_mtime
+        assert cache.stats()["hits"] == 1
+
+        cache.flush_stats()
+        stats = ASRResultCache(cache_dir).stats()
+        assert stats["entries"] == 1
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+
+def test_cache_lru_eviction():
+    """
+    超出大小上限时淘汰最近最少使用的条目
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        payload = {"transcript": ["x" * 600]}
+        cache = ASRResultCache(cache_dir, max_size_mb=1000 / (1024 * 1024))
+
+        cache.put("old", payload)
+        time.sleep(0.01)
+        cache.put("new", payload)
+        assert cache.get("old") is None
+        assert cache.get("new") == payload
+        assert cache.stats()["entries"] == 1
+
+
+def _worker(cache_dir, worker_id):
+    cache = ASRResultCache(cache_dir)
+    for i in range(5):
+        key = f"w{worker_id}-{i}"
+        assert cache.get(key) is None
+        cache.put(key, {"transcript": [key]})
+        assert cache.get(key) == {"transcript": [key]}
+    cache.flush_stats()
+
+
+def test_cache_shared_between_processes():
+    """
+    多个进程共用缓存目录时条目和计数都不会互相覆盖，淘汰时计入其他进程写入的条目
+    """
+    if sys.platform != "linux":
+        return
+    with tempfile.TemporaryDirectory() as cache_dir:
+        ctx = get_context("fork")
+        workers = [ctx.Process(target=_worker, args=(cache_dir, i)) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+            assert worker.exitcode == 0
+
+        stats = ASRResultCache(cache_dir).stats()
+        assert stats["entries"] == 15
+        assert stats["hits"] == 15
+        assert stats["misses"] == 15
+
+        # 上限只够保留一个条目：其他进程写入的条目同样被淘汰
+        small = ASRResultCache(cache_dir, max_size_mb=stats["size_bytes"] / 15 / (1024 * 1024))
+        small.put("latest", {"transcript": ["x"]})
+        assert small.stats()["entries"] == 1
+        assert small.get("latest") == {"transcript": ["x"]}
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ASRResultCache 测试开始\n")
+    test_cache_key()
+    test_cache_hit_miss()
+    test_cache_lru_eviction()
+    test_cache_shared_between_processes()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ASR 引擎注册表的可用性检查和自动选择缓存
+"""
+import logging
+import sys
+from pathlib import Path
+
+# 添加引擎模块路径
+sys.path.append(str(Path(__file__).parent.parent / "devour"))
+import asr_engine
+from asr_engine import available_engines, register_engine, select_engine
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+_checks = []
+
+
+class _FastEngineWithoutConfig:
+    """开销最小、但缺少配置文件的假引擎"""
+    ENGINE_NAME = "test_fast"
+    LOAD_COST_S = 0.0
+    EXPECTED_RTF = 0.001
+    QUALITY = 3
+    SUPPORTS_STREAMING = False
+
+    @classmethod
+    def missing_prerequisites(cls):
+        _checks.append(cls.ENGINE_NAME)
+        return ["config.yaml"]
+
+
+class _SlowEngine:
+    """前置条件齐全的假引擎"""
+    ENGINE_NAME = "test_slow"
+    LOAD_COST_S = 0.0
+    EXPECTED_RTF = 0.002
+    QUALITY = 3
+    SUPPORTS_STREAMING = False
+
+    @classmethod
+    def missing_prerequisites(cls):
+        _checks.append(cls.ENGINE_NAME)
+        return []
+
+
+def test_prerequisites_and_selection_cache():
+    """
+    缺少前置条件的引擎不参与选择；可用引擎和选择结果按进程缓存，不会重复检查
+    """
+    register_engine("test_fast", __name__, "_FastEngineWithoutConfig")
+    register_engine("test_slow", __name__, "_SlowEngine")
+    try:
+        names = [info["name"] for info in available_engines()]
+        assert "test_slow" in names and "test_fast" not in names
+
+        _checks.clear()
+        assert select_engine(min_quality="high") == "test_slow"
+        assert select_engine(min_quality="high") == "test_slow"
+        assert _checks == []
+
+        available_engines(refresh=True)
+        assert sorted(_checks) == ["test_fast", "test_slow"]
+    finally:
+        for name in ("test_fast", "test_slow"):
+            asr_engine._ENGINES.pop(name, None)
+        asr_engine.clear_engine_cache()
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ASR 引擎注册表测试开始\n")
+    test_prerequisites_and_selection_cache()
+    logging.info("\n🎉 所有测试完成！")
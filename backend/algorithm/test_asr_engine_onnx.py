@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ONNX 引擎的子句切分、会话参数、批量识别和工作进程构造参数
+（会话参数需要 onnxruntime，未安装时跳过）
+"""
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加引擎模块路径
+sys.path.append(str(Path(__file__).parent.parent / "devour"))
+import asr_engine_onnx
+from batch_runner import engine_factory_for
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_RATE = 16000
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+
+
+def _engine(intra_op_threads=4, inter_op_threads=1):
+    """不检查模型、不加载模型的引擎实例"""
+    engine = object.__new__(asr_engine_onnx.VideoDevourASRONNX)
+    engine.intra_op_threads = intra_op_threads
+    engine.inter_op_threads = inter_op_threads
+    engine.use_cache = False
+    engine.result_cache = None
+    engine.project_root = Path("/srv/video-devour")
+    return engine
+
+
+def test_split_sentences():
+    """
+    按标点切分子句，时间按字符数在片段内线性插值，首尾与片段边界对齐
+    """
+    engine = _engine()
+    sentences = engine.split_sentences("今天天气很好，我们去公园吧。好的", 1000, 2600)
+
+    assert [s["text"] for s in sentences] == ["今天天气很好，", "我们去公园吧。", "好的"]
+    assert sentences[0]["start"] == 1000 and sentences[-1]["end"] == 2600
+    assert [s["end"] for s in sentences[:-1]] == [s["start"] for s in sentences[1:]]
+    assert sentences[0]["end"] == 1000 + 1600 * 7 / 16
+    assert engine.split_sentences("", 0, 1000) == []
+    assert engine.split_sentences("，。", 0, 1000) == []
+
+
+def test_session_options():
+    """
+    会话参数使用配置的 intra-op / inter-op 线程数，inter-op 大于 1 时并行执行算子
+    """
+    if not ONNXRUNTIME_AVAILABLE:
+        return
+    import onnxruntime as ort
+    asr_engine_onnx.ort = ort
+
+    options = _engine(intra_op_threads=3, inter_op_threads=1)._session_options()
+    assert options.intra_op_num_threads == 3 and options.inter_op_num_threads == 1
+    assert options.execution_mode == ort.ExecutionMode.ORT_SEQUENTIAL
+    assert options.graph_optimization_level == ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    options = _engine(intra_op_threads=2, inter_op_threads=4)._session_options()
+    assert options.inter_op_num_threads == 4
+    assert options.execution_mode == ort.ExecutionMode.ORT_PARALLEL
+
+
+def test_engine_kwargs_and_export_dir():
+    """
+    工作进程按相同的线程配置重建引擎；导出目录位于 cache/onnx，不写入下载的模型目录
+    """
+    engine = _engine(intra_op_threads=2, inter_op_threads=3)
+    factory = engine_factory_for(engine, num_threads=8)
+    assert factory.func is asr_engine_onnx.VideoDevourASRONNX
+    assert factory.keywords == {"intra_op_threads": 2, "inter_op_threads": 3, "use_cache": False}
+
+    export_dir = engine._export_dir("asr")
+    model_dir = engine._model_dir("asr")
+    assert export_dir.parent == engine.project_root / "cache" / "onnx"
+    assert export_dir.name == model_dir.name
+    assert model_dir not in export_dir.parents
+
+
+class _FakeParaformer:
+    """记录每次调用的片段数，文本为片段的秒数"""
+
+    def __init__(self, fail_batches=False):
+        self.calls = []
+        self.fail_batches = fail_batches
+
+    def __call__(self, audios):
+        self.calls.append(len(audios))
+        if self.fail_batches and len(audios) > 1:
+            raise RuntimeError("内存不足")
+        return [{"preds": (f"片 段 {len(a) // SAMPLE_RATE}", [])} for a in audios]
+
+
+def test_transcribe_batches_segments():
+    """
+    VAD 片段按时长分桶批量识别，文本按片段顺序输出；整批失败时逐条识别
+    """
+    segments = [[0, 2000], [3000, 8000], [9000, 10000], [11000, 14000]]
+    audio = np.zeros(15 * SAMPLE_RATE, dtype=np.float32)
+
+    for fail_batches, expected_calls in ((False, [4]), (True, [4, 1, 1, 1, 1])):
+        engine = _engine()
+        engine._asr_model = _FakeParaformer(fail_batches)
+        engine._vad_model = lambda _: [segments]
+        engine._punc_model = lambda text: (text + "。", [])
+
+        results = engine.transcribe(audio)
+
+        assert engine._asr_model.calls == expected_calls
+        assert [r["sentence"] for r in results] == ["片段2。", "片段5。", "片段1。", "片段3。"]
+        assert [(r["start_time"], r["end_time"]) for r in results] == [(0, 2), (3, 8), (9, 10), (11, 14)]
+        assert {r["spk_id"] for r in results} == {engine.SPEAKER_ID}
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ONNX 引擎测试开始\n")
+    test_split_sentences()
+    test_session_options()
+    test_engine_kwargs_and_export_dir()
+    test_transcribe_batches_segments()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ASR 引擎池的借出 / 归还、等待超时、创建失败回滚、占用统计和默认引擎的延迟加载
+"""
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+# asr_engine_pool 以包路径导入注册表，添加仓库根目录
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.devour import asr_engine
+from backend.devour.asr_engine_pool import ASREnginePool
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class _FakeEngine:
+    """记录加载次数的假引擎"""
+    created = 0
+
+    def __init__(self):
+        _FakeEngine.created += 1
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+
+
+def test_acquire_and_release():
+    """
+    引擎按需创建且借出前已加载；归还后再次借出的是同一个引擎，不会重复创建
+    """
+    pool = ASREnginePool(size=2, engine_factory=_FakeEngine)
+    first = pool.acquire()
+    assert first.loaded
+    assert pool.stats()["in_use"] == 1 and pool.stats()["created"] == 1
+
+    pool.release(first)
+    with pool.engine() as engine:
+        assert engine is first
+    stats = pool.stats()
+    assert stats["created"] == 1 and stats["idle"] == 1 and stats["in_use"] == 0
+    assert stats["total_checkouts"] == 2
+
+
+def test_acquire_timeout_and_handoff():
+    """
+    池满时借用等待：超时抛出 TimeoutError；其他任务归还后等待者拿到归还的引擎
+    """
+    pool = ASREnginePool(size=1, engine_factory=_FakeEngine)
+    engine = pool.acquire()
+
+    start = time.time()
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "池满时应当超时"
+    except TimeoutError:
+        pass
+    assert time.time() - start >= 0.1
+    assert pool.stats()["waiting"] == 0
+
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+    waiter.start()
+    while pool.stats()["waiting"] == 0:
+        time.sleep(0.01)
+    pool.release(engine)
+    waiter.join(5)
+    assert got == [engine]
+    assert pool.stats()["created"] == 1
+
+
+def test_failed_creation_rolls_back():
+    """
+    工厂函数失败时释放占位：preload 和 acquire 都抛出原异常，之后仍能正常创建引擎
+    """
+    attempts = []
+
+    def flaky_factory():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise RuntimeError("模型文件缺失")
+        return _FakeEngine()
+
+    pool = ASREnginePool(size=1, engine_factory=flaky_factory)
+    for call in (pool.preload, pool.acquire):
+        try:
+            call()
+            assert False, "工厂函数失败时应抛出异常"
+        except RuntimeError as e:
+            assert str(e) == "模型文件缺失"
+        assert pool.stats()["created"] == 0
+
+    pool.preload()
+    stats = pool.stats()
+    assert stats["created"] == 1 and stats["idle"] == 1
+    assert pool.acquire(timeout=1).loaded
+
+
+def test_default_engine_is_loaded_lazily():
+    """
+    导入引擎池不会导入默认引擎模块；默认工厂在创建引擎时才按名称从注册表加载
+    """
+    assert "backend.devour.asr_engine_paraformer_v2" not in sys.modules
+
+    original = asr_engine._ENGINES["paraformer_v2"]
+    asr_engine.register_engine("paraformer_v2", __name__, "_FakeEngine")
+    try:
+        pool = ASREnginePool(size=1)
+        assert isinstance(pool.acquire(), _FakeEngine)
+    finally:
+        asr_engine.register_engine("paraformer_v2", *original)
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ASR 引擎池测试开始\n")
+    test_acquire_and_release()
+    test_acquire_timeout_and_handoff()
+    test_failed_creation_rolls_back()
+    test_default_engine_is_loaded_lazily()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+测试 Whisper 引擎的多文件合并转写、批次失败回退和按语言缓存的对齐模型
+（需要 whisperx，未安装时跳过）
+"""
+import importlib.util
+import logging
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加引擎模块路径
+sys.path.append(str(Path(__file__).parent.parent / "devour"))
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_RATE = 16000
+WHISPERX_AVAILABLE = importlib.util.find_spec("whisperx") is not None
+
+
+def _engine():
+    """不读取配置、不加载模型的引擎实例"""
+    import asr_engine_whisper
+    engine = object.__new__(asr_engine_whisper.VideoDevourASR)
+    engine.device = "cpu"
+    engine._align_models = {}
+    return engine
+
+
+def test_transcribe_many_splits_at_file_boundaries():
+    """
+    合并转写的片段按文件边界（跨过 FILE_GAP_S 静音）拆分回各文件
+    """
+    if not WHISPERX_AVAILABLE:
+        return
+    engine = _engine()
+    gap = engine.FILE_GAP_S
+    audios = [np.ones(4 * SAMPLE_RATE, dtype=np.float32), np.ones(6 * SAMPLE_RATE, dtype=np.float32)]
+    seen = []
+
+    def transcribe(audio):
+        seen.append(len(audio))
+        return {"language": "zh", "segments": [
+            {"start": 1.0, "end": 3.5, "text": "甲"},
+            {"start": 4 + gap + 0.5, "end": 4 + gap + 5.0, "text": "乙"},
+        ]}
+
+    engine._transcribe = transcribe
+    results = engine._transcribe_many(audios, SAMPLE_RATE)
+
+    assert seen == [(4 + 6 + 2 * gap) * SAMPLE_RATE]
+    assert [[s["text"] for s in r["segments"]] for r in results] == [["甲"], ["乙"]]
+    assert (results[1]["segments"][0]["start"], results[1]["segments"][0]["end"]) == (0.5, 5.0)
+    assert all(r["language"] == "zh" for r in results)
+
+
+def test_align_models_cached_per_language():
+    """
+    每种语言的对齐模型只加载一次
+    """
+    if not WHISPERX_AVAILABLE:
+        return
+    import asr_engine_whisper
+    engine = _engine()
+    loads = []
+    original = asr_engine_whisper.whisperx.load_align_model
+    asr_engine_whisper.whisperx.load_align_model = lambda language_code, device: (
+        loads.append(language_code) or (f"model-{language_code}", {"language": language_code}))
+    try:
+        assert engine.get_align_model("zh") == ("model-zh", {"language": "zh"})
+        assert engine.get_align_model("en")[0] == "model-en"
+        assert engine.get_align_model("zh")[0] == "model-zh"
+    finally:
+        asr_engine_whisper.whisperx.load_align_model = original
+    assert loads == ["zh", "en"]
+
+
+def test_failed_batch_falls_back_to_single_files():
+    """
+    合并转写的批次失败时逐个处理该批次的文件，只跳过真正失败的文件
+    """
+    if not WHISPERX_AVAILABLE:
+        return
+    import asr_engine_whisper
+    engine = _engine()
+    engine.devour_videos = lambda batch: (_ for _ in ()).throw(RuntimeError("解码失败"))
+
+    def devour_video(video_path, task_dir=None):
+        if "bad" in video_path:
+            raise RuntimeError("音频提取失败")
+        return {"video_path": video_path, "transcript": [], "speakers": None}
+
+    engine.devour_video = devour_video
+    videos = [Path("a.mp4"), Path("bad.mp4"), Path("c.mp4")]
+    original = asr_engine_whisper.find_video_files
+    asr_engine_whisper.find_video_files = lambda video_dir: videos
+    try:
+        results = engine.process_videos("videos", files_per_batch=3)
+    finally:
+        asr_engine_whisper.find_video_files = original
+    assert [r["video_path"] for r in results] == ["a.mp4", "c.mp4"]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 Whisper 引擎测试开始\n")
+    test_transcribe_many_splits_at_file_boundaries()
+    test_align_models_cached_per_language()
+    test_failed_batch_falls_back_to_single_files()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+测试 int8 量化模块的缓存：量化、保存、重新加载，以及源模型变化后重建缓存
+（需要 torch，未安装时跳过）
+"""
+import importlib.util
+import logging
+import tempfile
+from pathlib import Path
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+
+
+def test_quantized_cache_round_trip():
+    """
+    首次量化并写入缓存；再次调用直接加载缓存且输出一致；model.pt 变化后缓存失效并重新量化
+    """
+    if not TORCH_AVAILABLE:
+        return
+    import torch
+    import asr_quantization
+    from asr_quantization import QUANT_META_FILENAME, load_or_quantize, quantized_cache_dir
+
+    quantize_calls = []
+    original_quantize = asr_quantization._quantize
+
+    def counting_quantize(module):
+        quantize_calls.append(module)
+        return original_quantize(module)
+
+    asr_quantization._quantize = counting_quantize
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            model_dir = Path(tmp) / "paraformer"
+            model_dir.mkdir()
+            (model_dir / "model.pt").write_bytes(b"weights-v1")
+            cache_dir = quantized_cache_dir(str(model_dir), Path(tmp) / "fallback")
+            assert cache_dir == Path(tmp) / "paraformer-int8"
+
+            torch.manual_seed(0)
+            # quantize_dynamic 只替换子模块，线性层放在容器中
+            linear = torch.nn.Sequential(torch.nn.Linear(16, 8))
+            x = torch.randn(4, 16)
+
+            quantized = load_or_quantize(linear, "encoder", str(model_dir), cache_dir)
+            assert len(quantize_calls) == 1
+            assert isinstance(quantized[0], torch.ao.nn.quantized.dynamic.Linear)
+            assert (cache_dir / "encoder.pt").exists() and (cache_dir / QUANT_META_FILENAME).exists()
+            assert torch.allclose(quantized(x), linear(x), atol=0.1)
+
+            reloaded = load_or_quantize(linear, "encoder", str(model_dir), cache_dir)
+            assert len(quantize_calls) == 1
+            assert reloaded is not quantized
+            assert torch.equal(reloaded(x), quantized(x))
+
+            (model_dir / "model.pt").write_bytes(b"weights-v2-longer")
+            load_or_quantize(linear, "encoder", str(model_dir), cache_dir)
+            assert len(quantize_calls) == 2
+    finally:
+        asr_quantization._quantize = original_quantize
+
+
+if __name__ == "__main__":
+    logging.info("🧪 int8 量化缓存测试开始\n")
+    test_quantized_cache_round_trip()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+测试 ASR 结果文件的增量读取和头文件
+"""
+import io
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import asr_result_io
+from asr_result_io import build_header, header_path, iter_transcript, read_header, write_header
+from data_processor import ASRProcessor
+from transcript_schema import build_result
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def _result(n=200):
+    transcript = [
+        {"index": i + 1, "spk_id": str(i % 3), "sentence": f"第{i}句，含有\"引号\"和 {{括号}} 与 \\\\ 反斜杠。",
+         "start_time": i * 1.5, "end_time": i * 1.5 + 1.25}
+        for i in range(n)
+    ]
+    return build_result(transcript, "/videos/lecture.mp4")
+
+
+def test_iter_transcript_across_chunk_boundaries():
+    """
+    以很小的块读取时逐句产出的结果与 json.load 一致
+    """
+    result = _result()
+    original_chunk = asr_result_io.READ_CHUNK_CHARS
+    asr_result_io.READ_CHUNK_CHARS = 7
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for data in ([result], result):
+                path = Path(tmp) / "demo_asr_result.json"
+                path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+                assert list(iter_transcript(path)) == result["transcript"]
+    finally:
+        asr_result_io.READ_CHUNK_CHARS = original_chunk
+
+
+def test_large_value_decoded_in_few_attempts():
+    """
+    单个很大的值跨越大量块时，解码重试次数随大小按对数增长，而不是每块重试一次
+    """
+    attempts = []
+
+    class _CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            attempts.append(idx)
+            return super().raw_decode(s, idx)
+
+    value = {"transcript": [{"sentence": "很长的一句" * 20, "start_time": i} for i in range(2000)]}
+    text = json.dumps(value, ensure_ascii=False) + " 42"
+    original_decoder = asr_result_io._decoder
+    asr_result_io._decoder = _CountingDecoder()
+    try:
+        reader = asr_result_io._StreamReader(io.StringIO(text), chunk_chars=100)
+        assert reader.decode() == value
+        assert reader.decode() == 42
+    finally:
+        asr_result_io._decoder = original_decoder
+    # 约 2500 块，逐块重试需要上千次解码
+    assert len(text) // 100 > 2000
+    assert len(attempts) < 30, len(attempts)
+
+
+def test_header_sidecar():
+    """
+    头文件记录时长等元信息；结果文件被修改后头文件失效并重新扫描生成
+    """
+    result = _result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo_asr_result.json"
+        path.write_text(json.dumps([result], ensure_ascii=False, indent=2), encoding="utf-8")
+
+        # 没有头文件时流式扫描生成，与内存中生成的一致
+        scanned = read_header(path)
+        assert header_path(path).exists()
+        expected = build_header(result)
+        assert {k: scanned[k] for k in expected} == expected
+        assert scanned["duration"] == result["transcript"][-1]["end_time"]
+        assert scanned["total_segments"] == 200
+
+        write_header(path, build_header(result))
+        assert read_header(path, rebuild=False)["total_segments"] == 200
+
+        # 结果文件被修改后头文件失效
+        shorter = _result(10)
+        path.write_text(json.dumps([shorter], ensure_ascii=False), encoding="utf-8")
+        os.utime(path, ns=(1, 1))
+        assert read_header(path, rebuild=False) is None
+        assert read_header(path)["total_segments"] == 10
+
+
+def test_processor_streams_with_header():
+    """
+    有头文件时 ASRProcessor 不整体载入结果文件，处理结果与内存中处理一致
+    """
+    result = _result()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo_asr_result.json"
+        path.write_text(json.dumps([result], ensure_ascii=False, indent=2), encoding="utf-8")
+        write_header(path, build_header(result))
+
+        processor = ASRProcessor(str(path))
+        assert processor.data is None and processor.format_version == 'v2'
+        assert processor.process() == ASRProcessor.from_result([result]).process()
+
+
+if __name__ == "__main__":
+    logging.info("🧪 ASR 结果增量读取测试开始\n")
+    test_iter_transcript_across_chunk_boundaries()
+    test_large_value_decoded_in_few_attempts()
+    test_header_sidecar()
+    test_processor_streams_with_header()
+    logging.info("\n🎉 所有测试完成！")
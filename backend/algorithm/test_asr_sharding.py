@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+测试分片规划、跨分片说话人统一和转录合并
+"""
+import logging
+
+import numpy as np
+
+from asr_sharding import (SpeakerReconciler, diarize_in_windows, merge_shard_transcripts, plan_shards,
+                          reconcile_speakers)
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_RATE = 16000
+
+
+def test_plan_shards_at_silence():
+    """
+    切点落在离等分点最近的静音中点，分片首尾相接覆盖整段音频
+    """
+    segments = [[0, 9000], [11000, 19000], [21000, 29000], [31000, 40000]]
+    total = 40 * SAMPLE_RATE
+    shards = plan_shards(segments, total, 2, SAMPLE_RATE)
+
+    assert shards == [(0, 20 * SAMPLE_RATE), (20 * SAMPLE_RATE, total)]
+    assert plan_shards(segments, total, 1, SAMPLE_RATE) == [(0, total)]
+    assert plan_shards([], total, 4, SAMPLE_RATE)[1] == (10 * SAMPLE_RATE, 20 * SAMPLE_RATE)
+
+
+def test_reconcile_speakers():
+    """
+    向量相近的说话人跨分片归为同一 ID，同一分片内的说话人不会合并
+    """
+    shard_embeddings = [
+        {"0": [1.0, 0.0, 0.0], "1": [0.0, 1.0, 0.0]},
+        {"0": [0.0, 0.9, 0.1], "1": [0.95, 0.05, 0.0], "2": [0.0, 0.0, 1.0]},
+        {"0": [0.9, 0.1, 0.0], "1": [1.0, 0.0, 0.05]},
+    ]
+    maps = reconcile_speakers(shard_embeddings, threshold=0.5)
+
+    assert maps[0] == {"0": "0", "1": "1"}
+    assert maps[1] == {"0": "1", "1": "0", "2": "2"}
+    assert len(set(maps[2].values())) == 2
+    assert "0" in maps[2].values()
+
+    # 流式识别逐窗口处理，结果与一次性处理全部分片相同
+    reconciler = SpeakerReconciler(threshold=0.5)
+    assert [reconciler.add(embeddings) for embeddings in shard_embeddings] == maps
+
+
+def test_merge_shard_transcripts():
+    """
+    合并后序号全局连续，说话人 ID 按映射替换
+    """
+    shard_transcripts = [
+        [{"index": 1, "spk_id": "0", "sentence": "甲", "start_time": 0.0, "end_time": 1.0}],
+        [{"index": 1, "spk_id": "0", "sentence": "乙", "start_time": 20.0, "end_time": 21.0},
+         {"index": 2, "spk_id": "1", "sentence": "丙", "start_time": 22.0, "end_time": 23.0}],
+    ]
+    merged = merge_shard_transcripts(shard_transcripts, [{"0": "0"}, {"0": "1", "1": "0"}])
+
+    assert [s["index"] for s in merged] == [1, 2, 3]
+    assert [s["spk_id"] for s in merged] == ["0", "1", "0"]
+    assert merged[1]["start_time"] == 20.0
+
+
+def test_diarize_in_windows():
+    """
+    按窗口做说话人分离，每次只转换一个窗口；窗口内标签不同的同一说话人被统一，时间换算为整段时间
+    """
+    # 说话人由振幅区分：甲 0.1，乙 0.6；第二个窗口中乙先说话，局部标签与第一个窗口相反
+    turns = [(0, 4, 0.1), (5, 9, 0.6), (11, 14, 0.6), (15, 19, 0.1), (21, 24, 0.1)]
+    pcm = np.zeros(25 * SAMPLE_RATE, dtype=np.int16)
+    for beg, end, level in turns:
+        pcm[beg * SAMPLE_RATE:end * SAMPLE_RATE] = int(level * 32768)
+    window_lengths = []
+
+    def diarize(audio):
+        assert audio.dtype == np.float32
+        window_lengths.append(len(audio))
+        segments, labels = [], {}
+        for second in range(0, len(audio) // SAMPLE_RATE):
+            level = round(float(audio[second * SAMPLE_RATE]), 1)
+            if level == 0:
+                continue
+            spk = labels.setdefault(level, len(labels))
+            if segments and segments[-1]["spk"] == spk and segments[-1]["end"] == second:
+                segments[-1]["end"] = second + 1
+            else:
+                segments.append({"spk": spk, "start": second, "end": second + 1})
+        return segments
+
+    def embed(audio):
+        level = float(np.abs(audio).mean())
+        return [level, 1.0 - level]
+
+    segments = diarize_in_windows(pcm, SAMPLE_RATE, 10, diarize, embed)
+
+    assert window_lengths == [10 * SAMPLE_RATE, 10 * SAMPLE_RATE, 5 * SAMPLE_RATE]
+    assert [(s["start"], s["end"]) for s in segments] == [(beg, end) for beg, end, _ in turns]
+    assert [s["spk"] for s in segments] == ["0", "1", "1", "0", "0"]
+
+    # 只有一个窗口时保留模型输出的说话人标签，不计算向量
+    single = diarize_in_windows(pcm, SAMPLE_RATE, 30, diarize, embed=None)
+    assert [s["spk"] for s in single] == [0, 1, 1, 0, 0]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 分片识别测试开始\n")
+    test_plan_shards_at_silence()
+    test_reconcile_speakers()
+    test_merge_shard_transcripts()
+    test_diarize_in_windows()
+    logging.info("\n🎉 所有测试完成！")
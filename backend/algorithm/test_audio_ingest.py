@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+测试音频提取：ffmpeg 管道读取、.npy 占位头回填、缓存签名失效和按块读取
+
+用一个假的 ffmpeg 脚本代替真实的 ffmpeg：脚本把生成的 16kHz 单声道 WAV 原样输出为 s16le PCM，
+并可以先向 stderr 写入大量警告，测试不依赖系统安装的 ffmpeg。
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import wave
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+import audio_ingest
+from audio_ingest import SAMPLE_RATE, AudioIngest, iter_pcm_blocks, to_float32
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+FAKE_FFMPEG = f"""#!{sys.executable}
+import os, sys, wave
+path = sys.argv[sys.argv.index('-i') + 1]
+sys.stderr.write('W' * int(os.environ.get('FAKE_FFMPEG_STDERR_BYTES', '0')))
+sys.stderr.flush()
+try:
+    with wave.open(path, 'rb') as f:
+        sys.stdout.buffer.write(f.readframes(f.getnframes()))
+except (OSError, wave.Error) as e:
+    sys.stderr.write(f'{{path}}: Invalid data found when processing input ({{e}})')
+    sys.exit(1)
+"""
+
+
+@contextmanager
+def _fake_ffmpeg(stderr_bytes=0):
+    """把假的 ffmpeg 放到 PATH 最前面"""
+    saved = dict(os.environ)
+    with tempfile.TemporaryDirectory() as bin_dir:
+        script = Path(bin_dir) / "ffmpeg"
+        script.write_text(FAKE_FFMPEG)
+        script.chmod(0o755)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ["FAKE_FFMPEG_STDERR_BYTES"] = str(stderr_bytes)
+        try:
+            yield
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+def _write_wav(path, seconds, seed=0):
+    """生成 16kHz 单声道 int16 WAV，返回写入的样本"""
+    samples = np.random.default_rng(seed).integers(-20000, 20000, int(seconds * SAMPLE_RATE), dtype=np.int16)
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(samples.tobytes())
+    return samples
+
+
+def test_stderr_flood_does_not_deadlock():
+    """
+    ffmpeg 向 stderr 写入远超管道缓冲区的警告时仍能读完 stdout；失败时错误信息包含 stderr
+    """
+    if os.name != "posix":
+        return
+    with tempfile.TemporaryDirectory() as tmp, _fake_ffmpeg(stderr_bytes=1 << 20):
+        wav = Path(tmp) / "input.wav"
+        samples = _write_wav(wav, 2.5)
+        result = {}
+
+        def read():
+            result["blocks"] = list(iter_pcm_blocks(str(wav), block_s=1))
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        reader.join(30)
+        assert not reader.is_alive(), "读取 ffmpeg 输出时死锁"
+        assert [len(b) for b in result["blocks"]] == [SAMPLE_RATE, SAMPLE_RATE, SAMPLE_RATE // 2]
+        assert np.array_equal(np.concatenate(result["blocks"]), samples)
+
+        broken = Path(tmp) / "broken.mp4"
+        broken.write_bytes(b"not a video")
+        try:
+            list(iter_pcm_blocks(str(broken), block_s=1))
+            assert False, "解码失败时应抛出异常"
+        except RuntimeError as e:
+            assert "Invalid data found when processing input" in str(e)
+
+
+def test_npy_header_backfill():
+    """
+    .npy 先写占位头、结束后回填实际长度：可以用 mmap 直接读取，内容与源音频一致
+    """
+    if os.name != "posix":
+        return
+    with tempfile.TemporaryDirectory() as tmp, _fake_ffmpeg():
+        wav = Path(tmp) / "input.wav"
+        samples = _write_wav(wav, 3.2)
+        ingest = AudioIngest(str(wav), task_dir=str(Path(tmp) / "task"))
+        npy_path = ingest.ensure()
+
+        pcm = np.load(npy_path, mmap_mode='r')
+        assert pcm.dtype == np.int16 and pcm.shape == (len(samples),)
+        assert np.array_equal(pcm, samples)
+        assert not npy_path.with_suffix(".npy.tmp").exists()
+        assert ingest.duration == len(samples) / SAMPLE_RATE
+
+
+def test_cache_signature_invalidation():
+    """
+    源文件未变化时复用缓存；文件内容（大小 / 修改时间）或采样率变化后重新提取
+    """
+    if os.name != "posix":
+        return
+    with tempfile.TemporaryDirectory() as tmp, _fake_ffmpeg():
+        wav = Path(tmp) / "input.wav"
+        task_dir = str(Path(tmp) / "task")
+        _write_wav(wav, 1.0)
+
+        calls = []
+        original = audio_ingest.iter_pcm_blocks
+
+        def counting(*args, **kwargs):
+            calls.append(1)
+            return original(*args, **kwargs)
+
+        audio_ingest.iter_pcm_blocks = counting
+        try:
+            AudioIngest(str(wav), task_dir=task_dir).ensure()
+            assert AudioIngest(str(wav), task_dir=task_dir).is_cached()
+            AudioIngest(str(wav), task_dir=task_dir).ensure()
+            assert len(calls) == 1
+
+            assert not AudioIngest(str(wav), task_dir=task_dir, sample_rate=8000).is_cached()
+
+            samples = _write_wav(wav, 2.0, seed=1)
+            os.utime(wav, (1_000_000_000, 1_000_000_000))
+            ingest = AudioIngest(str(wav), task_dir=task_dir)
+            assert not ingest.is_cached()
+            assert np.array_equal(ingest.load(), samples)
+            assert len(calls) == 2
+        finally:
+            audio_ingest.iter_pcm_blocks = original
+
+
+def test_iter_blocks():
+    """
+    未指定任务目录时直接读取 ffmpeg 管道，已缓存时从内存映射切片，两种方式结果一致
+    """
+    if os.name != "posix":
+        return
+    with tempfile.TemporaryDirectory() as tmp, _fake_ffmpeg():
+        wav = Path(tmp) / "input.wav"
+        samples = _write_wav(wav, 2.5)
+
+        streamed = list(AudioIngest(str(wav)).iter_blocks(block_s=1))
+        cached = list(AudioIngest(str(wav), task_dir=str(Path(tmp) / "task")).iter_blocks(block_s=1))
+
+        for blocks in (streamed, cached):
+            assert [len(b) for b in blocks] == [SAMPLE_RATE, SAMPLE_RATE, SAMPLE_RATE // 2]
+            assert all(b.dtype == np.float32 for b in blocks)
+            assert np.array_equal(np.concatenate(blocks), to_float32(samples))
+
+
+if __name__ == "__main__":
+    logging.info("🧪 音频提取测试开始\n")
+    test_stderr_flood_does_not_deadlock()
+    test_npy_header_backfill()
+    test_cache_signature_invalidation()
+    test_iter_blocks()
+    logging.info("\n🎉 所有测试完成！")
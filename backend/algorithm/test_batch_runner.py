@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+测试批量处理执行器的引擎配置传递和结果顺序
+"""
+import importlib.util
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch_runner import engine_factory_for, ordered_results, run_batch
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class _FakeEngine:
+    """记录构造参数的假引擎，视频名中的数字越小处理越慢"""
+
+    def __init__(self, quantize_int8: bool = False, num_threads=None):
+        self.quantize_int8 = quantize_int8
+        self.num_threads = num_threads
+
+    def engine_kwargs(self):
+        return {"quantize_int8": self.quantize_int8, "num_threads": self.num_threads}
+
+    def devour_video(self, video_path: str):
+        time.sleep(0.3 / int(video_path[-1]))
+        return {"video_path": video_path, "quantize_int8": self.quantize_int8, "num_threads": self.num_threads}
+
+    def to_serializable(self, result):
+        return {**result, "serialized": True}
+
+
+def test_engine_factory_keeps_config():
+    """
+    工作进程中的引擎沿用原引擎的构造参数，线程数替换为工作进程的预算
+    """
+    rebuilt = engine_factory_for(_FakeEngine(quantize_int8=True, num_threads=8), num_threads=2)()
+    assert rebuilt.quantize_int8 is True
+    assert rebuilt.num_threads == 2
+
+
+def test_results_in_input_order():
+    """
+    多进程模式下结果按输入顺序返回，而不是按完成顺序
+    """
+    # 工作进程初始化时按线程预算设置 torch 线程数
+    if importlib.util.find_spec("torch") is None:
+        return
+    videos = [f"video{i}" for i in range(1, 5)]
+    results = run_batch(_FakeEngine(quantize_int8=True), videos, workers=2, threads_per_worker=1)
+    assert [r["video_path"] for r in results] == videos
+    assert all(r["quantize_int8"] for r in results)
+    assert all(r["num_threads"] == 1 for r in results)
+    assert all(r["serialized"] for r in results)
+
+
+def test_serial_results_are_serializable():
+    """
+    单进程模式与多进程模式一样返回 to_serializable 之后的结果
+    """
+    results = run_batch(_FakeEngine(), ["video9", "video8"], workers=1)
+    assert [r["video_path"] for r in results] == ["video9", "video8"]
+    assert all(r["serialized"] for r in results)
+
+
+def test_ordered_results_bounds_in_flight():
+    """
+    同时提交的任务不超过上限，结果按输入顺序产出，取走的 Future 不再被持有
+    """
+    lock = threading.Lock()
+    state = {"submitted": 0, "consumed": 0, "max_outstanding": 0}
+
+    def work(i):
+        time.sleep(0.01 * (i % 3))
+        return i * i
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        def submit(i):
+            with lock:
+                state["submitted"] += 1
+                state["max_outstanding"] = max(state["max_outstanding"], state["submitted"] - state["consumed"])
+            return executor.submit(work, i)
+
+        values = []
+        for i, future in ordered_results(submit, range(20), max_in_flight=3):
+            values.append((i, future.result()))
+            state["consumed"] += 1
+
+    assert values == [(i, i * i) for i in range(20)]
+    assert state["max_outstanding"] == 3
+
+
+if __name__ == "__main__":
+    logging.info("🧪 批量处理执行器测试开始\n")
+    test_engine_factory_keeps_config()
+    test_results_in_input_order()
+    test_serial_results_are_serializable()
+    test_ordered_results_bounds_in_flight()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+测试列式转录结果的切片和无损互转
+"""
+import json
+import logging
+
+import numpy as np
+
+from compact_transcript import CompactTranscript
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+TRANSCRIPT = [
+    {"index": 1, "spk_id": "0", "sentence": "大家好，", "start_time": 0.0, "end_time": 1.25},
+    {"index": 2, "spk_id": "1", "sentence": "今天讲 transformer。", "start_time": 1.5, "end_time": 4.0},
+    {"index": 3, "spk_id": None, "sentence": "", "start_time": 4.0, "end_time": 4.0},
+    {"index": 4, "spk_id": "0", "sentence": "先看注意力机制😀", "start_time": 10.1, "end_time": 13.3},
+]
+
+
+def test_roundtrip_is_lossless():
+    """
+    句子列表 -> 列式 -> JSON -> 列式 -> 句子列表 保持不变
+    """
+    compact = CompactTranscript.from_transcript(TRANSCRIPT)
+    assert compact.to_transcript() == TRANSCRIPT
+
+    restored = CompactTranscript.from_json(json.loads(json.dumps(compact.to_json(), ensure_ascii=False)))
+    assert restored.to_transcript() == TRANSCRIPT
+    assert compact.speakers == ["0", "1"]
+
+
+def test_slices_share_buffers():
+    """
+    按序号和时间范围切片返回共享底层数据的视图
+    """
+    compact = CompactTranscript.from_transcript(TRANSCRIPT)
+
+    middle = compact[1:3]
+    assert middle.to_transcript() == TRANSCRIPT[1:3]
+    assert np.shares_memory(middle.start, compact.start)
+    assert middle.text is compact.text
+
+    assert compact.time_slice(1.3, 5.0).to_transcript() == TRANSCRIPT[1:3]
+    assert compact.time_slice(11.0, 12.0).to_transcript() == TRANSCRIPT[3:]
+    assert len(compact.time_slice(5.0, 9.0)) == 0
+
+    # 切片导出的 JSON 只包含切片覆盖的文本
+    restored = CompactTranscript.from_json(middle.to_json())
+    assert restored.to_transcript() == TRANSCRIPT[1:3]
+    assert compact[-1] == TRANSCRIPT[-1]
+
+
+def test_time_slice_excludes_covered_sentences():
+    """
+    被之前的长句覆盖、但本身不与查询范围重叠的句子不出现在时间范围切片中
+    """
+    transcript = [
+        {"index": 1, "spk_id": "0", "sentence": "很长的一句", "start_time": 0.0, "end_time": 30.0},
+        {"index": 2, "spk_id": "1", "sentence": "插话", "start_time": 2.0, "end_time": 3.0},
+        {"index": 3, "spk_id": "1", "sentence": "继续", "start_time": 10.0, "end_time": 12.0},
+    ]
+    compact = CompactTranscript.from_transcript(transcript)
+    max_end = compact.max_end
+    assert compact.time_slice(5.0, 11.0).to_transcript() == [transcript[0], transcript[2]]
+    assert compact.time_slice(2.5, 11.0).to_transcript() == transcript
+    assert compact.max_end is max_end
+    assert compact.take([2, 0]).to_transcript() == [transcript[2], transcript[0]]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 列式转录结果测试开始\n")
+    test_roundtrip_is_lossless()
+    test_slices_share_buffers()
+    test_time_slice_excludes_covered_sentences()
+    logging.info("\n🎉 所有测试完成！")
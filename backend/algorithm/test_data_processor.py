@@ -4,6 +4,7 @@
 """
 import json
 import logging
+import tempfile
 from pathlib import Path
 from data_processor import ASRProcessor
 
@@ -94,6 +95,33 @@ def test_paraformer_v2():
     return True
 
 
+def test_from_result_matches_file():
+    """
+    直接由内存中的 ASR 结果构建的处理器与从 JSON 文件加载的结果一致
+    """
+    asr_result = [{
+        "transcript": [
+            {"index": 1, "spk_id": "0", "sentence": "大家好。", "start_time": 0.0, "end_time": 1.2},
+            {"index": 2, "spk_id": "0", "sentence": "今天讲分块。", "start_time": 1.3, "end_time": 3.0},
+            {"index": 3, "spk_id": "1", "sentence": "好的。", "start_time": 3.1, "end_time": 3.8},
+            {"index": 4, "spk_id": None, "sentence": "（掌声）", "start_time": 3.9, "end_time": 4.5},
+        ],
+        "video_path": "demo.mp4",
+    }]
+    with tempfile.NamedTemporaryFile('w', suffix='.json', encoding='utf-8', delete=False) as f:
+        json.dump(asr_result, f, ensure_ascii=False)
+    try:
+        from_file = ASRProcessor(f.name).process()
+    finally:
+        Path(f.name).unlink()
+    
+    processor = ASRProcessor.from_result(asr_result)
+    assert processor.format_version == 'v2'
+    assert len(processor.transcript) == 4
+    assert processor.process() == from_file
+    assert [chunk['speaker'] for chunk in from_file] == ["SPEAKER_0", "SPEAKER_1", "SPEAKER_UNKNOWN"]
+
+
 def compare_chunk_quality(chunked_dialogue):
     """
     分析分块质量
@@ -141,6 +169,7 @@ def compare_chunk_quality(chunked_dialogue):
 if __name__ == "__main__":
     logging.info("🧪 ASRProcessor 测试开始\n")
     
+    test_from_result_matches_file()
     success = test_paraformer_v2()
     
     if success:
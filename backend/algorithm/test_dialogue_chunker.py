@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+测试对话分块策略
+"""
+import logging
+import random
+
+from dialogue_chunker import TokenBudgetPolicy, chunk_dialogue, default_policies
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def legacy_chunk_dialogue(speaker_dialogue):
+    """原 ASRProcessor._chunk_dialogue 的规则（作为对照）"""
+    def merge(items):
+        return {'speaker': items[0]['speaker'], 'start': items[0]['start'],
+                'end': items[-1]['end'], 'text': "".join(d['text'] for d in items)}
+
+    chunks, current = [], []
+    for item in speaker_dialogue:
+        if not current:
+            current.append(item)
+            continue
+        last = current[-1]
+        if item['speaker'] != last['speaker'] or (item['start'] - last['end']) > 3.0:
+            chunks.append(merge(current))
+            current = [item]
+            continue
+        current.append(item)
+        if sum(len(d['text']) for d in current) >= 200:
+            chunks.append(merge(current))
+            current = []
+    if current:
+        chunks.append(merge(current))
+    return chunks
+
+
+def _dialogue(n, seed=0):
+    rng = random.Random(seed)
+    t, items = 0.0, []
+    for _ in range(n):
+        start = t + rng.choice([0.1, 0.5, 4.0])
+        end = start + rng.uniform(0.5, 5.0)
+        items.append({'speaker': f"SPEAKER_{rng.randrange(2)}", 'start': start, 'end': end,
+                      'text': "字" * rng.randint(1, 120)})
+        t = end
+    return items
+
+
+def test_default_policies_match_legacy():
+    """
+    默认策略与原分块规则结果一致，且可以直接消费生成器
+    """
+    for seed in range(5):
+        items = _dialogue(500, seed)
+        assert list(chunk_dialogue(iter(items))) == legacy_chunk_dialogue(items)
+    assert list(chunk_dialogue([])) == []
+
+
+def test_token_budget():
+    """
+    按 token 预算分块时每个块都不超过预算（单个超长条目独占一块）
+    """
+    count_tokens = len
+    items = _dialogue(500, seed=1)
+    items.append({'speaker': items[-1]['speaker'], 'start': items[-1]['end'], 'end': items[-1]['end'] + 1,
+                  'text': "字" * 400})
+    policies = default_policies(split_on_speaker=False, max_gap_s=None, max_chars=None,
+                                max_tokens=150, count_tokens=count_tokens)
+    assert isinstance(policies[0], TokenBudgetPolicy)
+
+    chunks = list(chunk_dialogue(items, policies))
+    assert "".join(c['text'] for c in chunks) == "".join(i['text'] for i in items)
+    oversized = [c for c in chunks if count_tokens(c['text']) > 150]
+    assert [c['text'] for c in oversized] == ["字" * 400]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 对话分块测试开始\n")
+    test_default_policies_match_legacy()
+    test_token_budget()
+    logging.info("\n🎉 所有测试完成！")
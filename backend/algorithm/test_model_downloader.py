@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+测试并行断点续传下载（使用本地 HTTP 服务模拟 ModelScope 接口）
+"""
+import json
+import logging
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from model_downloader import DownloadProgress, ModelFileDownloader, resolve_model_file
+from modelscope_manager import ModelScopeManager
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODEL_NAME = "punc_ct-transformer_cn-en-common-vocab471067-large"
+MODEL_ID = ModelScopeManager.REQUIRED_MODELS[MODEL_NAME]["model_id"]
+FILES = {
+    "config.yaml": b"model: test\n",
+    "model.pt": bytes(range(256)) * 400,
+    "tokens/vocab.txt": "你好\n世界\n".encode("utf-8"),
+}
+
+
+class FakeModelScopeHandler(BaseHTTPRequestHandler):
+    """模拟 ModelScope 文件列表和文件下载接口，支持 Range 请求"""
+
+    # 首次下载 model.pt 时只返回前一半数据后断开，用于测试断点续传
+    truncate_once = set()
+    range_requests = []
+    # 只出现在文件列表中的额外路径，用于测试不安全的路径
+    extra_listed = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+
+        if parsed.path == f"/api/v1/models/{MODEL_ID}/repo/files":
+            files = [{"Path": path, "Size": len(data), "Type": "blob"} for path, data in FILES.items()]
+            files += [{"Path": path, "Size": 1, "Type": "blob"} for path in self.extra_listed]
+            body = json.dumps({"Code": 200, "Data": {"Files": files}}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if parsed.path != f"/api/v1/models/{MODEL_ID}/repo" or query.get("FilePath", [""])[0] not in FILES:
+            self.send_error(404)
+            return
+
+        file_path = query["FilePath"][0]
+        data = FILES[file_path]
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            self.range_requests.append((file_path, start))
+            if start >= len(data):
+                self.send_error(416)
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+
+        if file_path in self.truncate_once:
+            self.truncate_once.discard(file_path)
+            self.wfile.write(data[start:start + len(data) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:])
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeModelScopeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_resume_after_truncated_download():
+    """
+    连接中断后重试时用 Range 请求从断点继续，最终文件内容完整
+    """
+    server, endpoint = _serve()
+    FakeModelScopeHandler.truncate_once = {"model.pt"}
+    FakeModelScopeHandler.range_requests = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            downloader = ModelFileDownloader(endpoint=endpoint, retry_backoff_s=0.0)
+            dest = Path(tmp) / "model.pt"
+            progress = DownloadProgress(len(FILES["model.pt"]))
+            url = downloader.file_url(MODEL_ID, "master", "model.pt")
+
+            assert downloader.download_file(url, dest, len(FILES["model.pt"]), progress)
+            assert dest.read_bytes() == FILES["model.pt"]
+            assert FakeModelScopeHandler.range_requests == [("model.pt", len(FILES["model.pt"]) // 2)]
+            assert progress.done_bytes == len(FILES["model.pt"])
+    finally:
+        server.shutdown()
+
+
+def test_complete_part_file():
+    """
+    .part 已是完整大小时不再发送请求直接完成；大小未知时服务器返回 416，从头重新下载
+    """
+    server, endpoint = _serve()
+    FakeModelScopeHandler.truncate_once = set()
+    FakeModelScopeHandler.range_requests = []
+    data = FILES["model.pt"]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            downloader = ModelFileDownloader(endpoint=endpoint, retry_backoff_s=0.0)
+            url = downloader.file_url(MODEL_ID, "master", "model.pt")
+
+            dest = Path(tmp) / "model.pt"
+            dest.with_name("model.pt.part").write_bytes(data)
+            progress = DownloadProgress(len(data))
+            assert downloader.download_file(url, dest, len(data), progress)
+            assert dest.read_bytes() == data and progress.done_bytes == len(data)
+            assert FakeModelScopeHandler.range_requests == []
+
+            dest = Path(tmp) / "unknown_size.pt"
+            dest.with_name("unknown_size.pt.part").write_bytes(data)
+            assert downloader.download_file(url, dest, 0)
+            assert dest.read_bytes() == data
+            assert FakeModelScopeHandler.range_requests == [("model.pt", len(data))]
+            assert not list(Path(tmp).glob("*.part"))
+    finally:
+        server.shutdown()
+
+
+def test_parallel_download_all_missing_models():
+    """
+    ModelScopeManager 通过 HTTP 接口并行下载缺失模型，并写入校验清单
+    """
+    server, endpoint = _serve()
+    FakeModelScopeHandler.truncate_once = set()
+    ModelScopeManager.clear_verification_cache()
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            manager = ModelScopeManager(root)
+            # 其他模型视为已存在，只下载一个
+            for name in manager.REQUIRED_MODELS:
+                if name != MODEL_NAME:
+                    ModelScopeManager._verified_cache[(str(manager.project_root), name)] = True
+
+            results = manager.download_all_missing_models(max_retries=2, max_workers=3, endpoint=endpoint)
+
+            assert results == {MODEL_NAME: True}
+            model_dir = manager._model_path(MODEL_NAME)
+            for path, data in FILES.items():
+                assert (model_dir / path).read_bytes() == data
+            assert (model_dir / ModelScopeManager.MANIFEST_FILENAME).exists()
+            assert not list(model_dir.rglob("*.part"))
+    finally:
+        server.shutdown()
+        ModelScopeManager.clear_verification_cache()
+
+
+def test_unsafe_paths_rejected():
+    """
+    接口返回绝对路径或跳出模型目录的路径时拒绝整个模型，不在目录外写入文件
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = Path(tmp) / "model"
+        assert resolve_model_file(model_dir, "tokens/vocab.txt") == (model_dir / "tokens" / "vocab.txt").resolve()
+        for path in ("../escape.txt", "tokens/../../escape.txt", "/etc/passwd", "..\\escape.txt", ""):
+            try:
+                resolve_model_file(model_dir, path)
+                assert False, path
+            except ValueError:
+                pass
+
+    server, endpoint = _serve()
+    FakeModelScopeHandler.truncate_once = set()
+    FakeModelScopeHandler.extra_listed = ["../escape.txt"]
+    done = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            downloader = ModelFileDownloader(endpoint=endpoint, retry_backoff_s=0.0)
+            results = downloader.download_models(
+                {MODEL_NAME: {"model_id": MODEL_ID, "revision": "master"}},
+                {MODEL_NAME: Path(tmp) / "model"},
+                on_model_done=lambda name, ok: done.append((name, ok)),
+            )
+            assert results == {MODEL_NAME: False}
+            assert done == [(MODEL_NAME, False)]
+            assert list(Path(tmp).iterdir()) == []
+    finally:
+        FakeModelScopeHandler.extra_listed = []
+        server.shutdown()
+
+
+def test_failing_callback_does_not_abort_downloads():
+    """
+    某个模型的完成回调抛出异常时，其他模型继续下载并正常返回结果
+    """
+    server, endpoint = _serve()
+    FakeModelScopeHandler.truncate_once = set()
+    done = []
+
+    def on_model_done(name, ok):
+        done.append(name)
+        if name == "a":
+            raise RuntimeError("校验失败")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            downloader = ModelFileDownloader(endpoint=endpoint, max_workers=1, retry_backoff_s=0.0)
+            models = {name: {"model_id": MODEL_ID, "revision": "master"} for name in ("a", "b")}
+            results = downloader.download_models(models, {name: Path(tmp) / name for name in models},
+                                                 on_model_done=on_model_done)
+            assert results == {"a": True, "b": True}
+            assert done == ["a", "b"]
+            assert (Path(tmp) / "b" / "model.pt").read_bytes() == FILES["model.pt"]
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    logging.info("🧪 模型并行下载测试开始\n")
+    test_resume_after_truncated_download()
+    test_complete_part_file()
+    test_parallel_download_all_missing_models()
+    test_unsafe_paths_rejected()
+    test_failing_callback_does_not_abort_downloads()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+测试后台模型预热的状态和耗时记录
+"""
+import logging
+import threading
+
+from model_warmup import ModelWarmup
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def test_background_warmup_states():
+    """
+    预热在后台线程中执行，加载期间未就绪，全部完成后就绪并记录耗时
+    """
+    release = threading.Event()
+    loaded = []
+    warmup = ModelWarmup({
+        "asr_engine": lambda: (release.wait(5), loaded.append("asr_engine")),
+        "semantic_model": lambda: loaded.append("semantic_model"),
+    })
+
+    assert warmup.status()["models"]["asr_engine"]["state"] == "pending"
+    thread = warmup.start()
+    assert warmup.start() is thread
+    assert not warmup.ready
+
+    release.set()
+    thread.join(5)
+
+    status = warmup.status()
+    assert status["ready"]
+    assert loaded == ["asr_engine", "semantic_model"]
+    assert all(m["state"] == "ready" and m["duration_s"] is not None for m in status["models"].values())
+
+
+def test_failed_step_is_reported():
+    """
+    某个步骤失败时记录错误，后续步骤继续执行，整体不就绪
+    """
+    def broken():
+        raise RuntimeError("模型文件缺失")
+
+    warmup = ModelWarmup({"asr_engine": broken, "semantic_model": lambda: None})
+    warmup.run()
+
+    status = warmup.status()
+    assert not status["ready"]
+    assert status["models"]["asr_engine"]["state"] == "failed"
+    assert status["models"]["asr_engine"]["error"] == "模型文件缺失"
+    assert status["models"]["semantic_model"]["state"] == "ready"
+
+
+def test_steps_run_elsewhere_are_reported():
+    """
+    由其他流程（预加载工作池的 preload）通过 run_step 执行的步骤记录状态和耗时，run() 不会重复执行
+    """
+    loaded = []
+    warmup = ModelWarmup({
+        "asr_engine": lambda: loaded.append("asr_engine"),
+        "semantic_model": lambda: loaded.append("semantic_model"),
+        "prefork_workers": lambda: loaded.append("prefork_workers"),
+    })
+
+    assert warmup.run_step("asr_engine")
+    assert warmup.run_step("semantic_model")
+    models = warmup.status()["models"]
+    assert models["asr_engine"]["state"] == "ready" and models["asr_engine"]["duration_s"] is not None
+    assert models["prefork_workers"]["state"] == "pending"
+
+    warmup.run()
+    assert loaded == ["asr_engine", "semantic_model", "prefork_workers"]
+    assert warmup.ready
+
+
+if __name__ == "__main__":
+    logging.info("🧪 模型预热测试开始\n")
+    test_background_warmup_states()
+    test_failed_step_is_reported()
+    test_steps_run_elsewhere_are_reported()
+    logging.info("\n🎉 所有测试完成！")
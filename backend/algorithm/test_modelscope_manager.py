@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+测试模型校验清单的快速检查、进程内缓存和深度校验
+"""
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from modelscope_manager import ModelScopeManager
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+MODEL_NAME = "punc_ct-transformer_cn-en-common-vocab471067-large"
+
+
+def _make_model(root: str) -> Path:
+    """在临时项目目录中伪造一个已下载的模型"""
+    manager = ModelScopeManager(root)
+    model_dir = manager._model_path(MODEL_NAME)
+    model_dir.mkdir(parents=True, exist_ok=True)
+    (model_dir / "config.yaml").write_text("model: test\n")
+    (model_dir / "model.pt").write_bytes(b"\x00" * 1024)
+    return model_dir
+
+
+def test_manifest_fast_check_and_cache():
+    """
+    没有清单时按关键文件检查并补写清单；之后对照清单检查，结果在进程内缓存
+    """
+    ModelScopeManager.clear_verification_cache()
+    with tempfile.TemporaryDirectory() as root:
+        model_dir = _make_model(root)
+        manager = ModelScopeManager(root)
+
+        assert manager.check_model_exists(MODEL_NAME)
+        assert (model_dir / ModelScopeManager.MANIFEST_FILENAME).exists()
+
+        # 缓存命中时不再访问文件系统
+        (model_dir / "model.pt").write_bytes(b"\x00" * 10)
+        assert manager.check_model_exists(MODEL_NAME)
+
+        # 清空缓存后对照清单发现大小不一致
+        ModelScopeManager.clear_verification_cache()
+        assert not manager.check_model_exists(MODEL_NAME)
+
+
+def test_mtime_change_is_tolerated():
+    """
+    仅修改时间变化（如整体拷贝）时仍视为完整
+    """
+    ModelScopeManager.clear_verification_cache()
+    with tempfile.TemporaryDirectory() as root:
+        model_dir = _make_model(root)
+        manager = ModelScopeManager(root)
+        manager.write_manifest(MODEL_NAME)
+
+        os.utime(model_dir / "model.pt", (1, 1))
+        assert manager.check_model_exists(MODEL_NAME)
+
+
+def test_deep_verify_detects_corruption():
+    """
+    --deep-verify 补记哈希，并发现大小不变但内容被改写的文件
+    """
+    ModelScopeManager.clear_verification_cache()
+    with tempfile.TemporaryDirectory() as root:
+        model_dir = _make_model(root)
+        manager = ModelScopeManager(root)
+        manager.write_manifest(MODEL_NAME)
+
+        report = manager.deep_verify([MODEL_NAME], record_hashes=True)
+        assert report[MODEL_NAME]["ok"] and report[MODEL_NAME]["hashed"]
+
+        (model_dir / "model.pt").write_bytes(b"\x01" * 1024)
+        assert manager.check_model_exists(MODEL_NAME)
+
+        report = manager.deep_verify([MODEL_NAME])
+        assert not report[MODEL_NAME]["ok"]
+        assert report[MODEL_NAME]["mismatched"] == ["model.pt"]
+
+
+def test_hashes_only_on_request():
+    """
+    下载完成和未指定补记哈希的深度校验只写入大小和修改时间，不计算哈希；清单原子替换
+    """
+    ModelScopeManager.clear_verification_cache()
+    with tempfile.TemporaryDirectory() as root:
+        model_dir = _make_model(root)
+        manager = ModelScopeManager(root)
+        manifest_path = model_dir / ModelScopeManager.MANIFEST_FILENAME
+
+        assert manager._finish_download(MODEL_NAME)
+        files = json.loads(manifest_path.read_text(encoding="utf-8"))["files"]
+        assert sorted(files) == ["config.yaml", "model.pt"]
+        assert all("sha256" not in entry for entry in files.values())
+
+        report = manager.deep_verify([MODEL_NAME])
+        assert report[MODEL_NAME]["ok"] and not report[MODEL_NAME]["hashed"]
+        assert all("sha256" not in entry for entry in json.loads(manifest_path.read_text(encoding="utf-8"))["files"].values())
+
+        # 大小变化在不计算哈希时也能发现
+        (model_dir / "model.pt").write_bytes(b"\x00" * 10)
+        assert manager.deep_verify([MODEL_NAME])[MODEL_NAME]["mismatched"] == ["model.pt"]
+        assert sorted(p.name for p in model_dir.iterdir()) == [ModelScopeManager.MANIFEST_FILENAME, "config.yaml", "model.pt"]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 模型校验清单测试开始\n")
+    test_manifest_fast_check_and_cache()
+    test_mtime_change_is_tolerated()
+    test_deep_verify_detects_corruption()
+    test_hashes_only_on_request()
+    logging.info("\n🎉 所有测试完成！")
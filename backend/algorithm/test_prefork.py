@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+测试预加载工作池的内存报告
+"""
+import logging
+import os
+import sys
+import threading
+from multiprocessing import Process
+
+from prefork import PreforkExecutor, os_thread_count, parse_smaps_rollup
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SMAPS_ROLLUP = """55d0c0a00000-7ffc8a7fe000 ---p 00000000 00:00 0                          [rollup]
+Rss:              409600 kB
+Pss:              153600 kB
+Shared_Clean:     307200 kB
+Shared_Dirty:      10240 kB
+Private_Clean:     20480 kB
+Private_Dirty:     71680 kB
+Referenced:       409600 kB
+"""
+
+_PRELOADED = []
+
+
+def _preload():
+    _PRELOADED.append(bytearray(1024 * 1024))
+
+
+def _preloaded_in_child():
+    return os.getpid(), len(_PRELOADED)
+
+
+def test_parse_smaps_rollup():
+    """
+    独占内存为 Private_*，共享内存为 Shared_*
+    """
+    memory = parse_smaps_rollup(SMAPS_ROLLUP)
+    assert memory == {"rss_mb": 400.0, "pss_mb": 150.0, "shared_mb": 310.0, "unique_mb": 90.0}
+
+
+def test_children_inherit_preloaded_state():
+    """
+    预加载只在父进程执行一次，fork 出的工作进程直接看到已加载的对象
+    """
+    if sys.platform != "linux":
+        return
+    executor = PreforkExecutor(2, preload=_preload)
+    try:
+        pid, preloaded = executor.submit(_preloaded_in_child).result()
+        assert pid != os.getpid()
+        assert preloaded == 1
+        assert len(_PRELOADED) == 1
+
+        report = executor.memory_report()
+        assert report["started"]
+        assert len(report["workers"]) == 2
+    finally:
+        executor.shutdown()
+
+
+def test_start_forks_all_workers():
+    """
+    start() 返回时全部工作进程已经创建；内存报告只统计本执行器的工作进程
+    """
+    if sys.platform != "linux":
+        return
+    unrelated = Process(target=threading.Event().wait, args=(30,), daemon=True)
+    unrelated.start()
+    executor = PreforkExecutor(2)
+    try:
+        executor.start()
+        report = executor.memory_report()
+        pids = {worker["pid"] for worker in report["workers"]}
+        assert len(pids) == 2
+        assert unrelated.pid not in pids
+    finally:
+        executor.shutdown()
+        unrelated.terminate()
+        unrelated.join()
+
+
+def test_threads_at_fork_reported():
+    """
+    fork 时进程中存在其他线程会被记录在内存报告中
+    """
+    if sys.platform != "linux":
+        return
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, daemon=True)
+    thread.start()
+    executor = PreforkExecutor(1)
+    try:
+        threads = os_thread_count()
+        executor.start()
+        assert threads >= 2
+        assert executor.memory_report()["threads_at_fork"] >= 2
+    finally:
+        stop.set()
+        thread.join()
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    logging.info("🧪 预加载工作池测试开始\n")
+    test_parse_smaps_rollup()
+    test_children_inherit_preloaded_state()
+    test_start_forks_all_workers()
+    test_threads_at_fork_reported()
+    logging.info("\n🎉 所有测试完成！")
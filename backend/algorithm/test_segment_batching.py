@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+测试 VAD 流式分段的跨块拼接、片段分桶、批量识别的逐条回退和多文件合并转写的拆分
+"""
+import logging
+
+import numpy as np
+
+from segment_batching import (bucket_segments, concat_with_gaps, recognize_batch_with_fallback, split_segments_by_file,
+                              stream_vad)
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_RATE = 16000
+BLOCK_MS = 10000
+
+
+class _FakeStreamVAD:
+    """
+    按振幅判定语音的假流式 VAD：片段开始和结束落在不同的块中时，
+    分别输出 [beg, -1] 和 [-1, end]，与 FSMN-VAD 的流式输出一致
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def generate(self, input, cache, is_final, chunk_size, max_single_segment_time):
+        assert input.dtype == np.float32 and len(input) <= chunk_size * SAMPLE_RATE // 1000
+        offset_ms = cache.get("offset_ms", 0)
+        self.calls.append((offset_ms, is_final))
+        voiced = np.abs(input) > 0.1
+        values = []
+        in_speech = cache.get("in_speech", False)
+        for i in range(0, len(voiced), SAMPLE_RATE // 100):
+            t_ms = offset_ms + i * 1000 // SAMPLE_RATE
+            if voiced[i] and not in_speech:
+                values.append([t_ms, -1])
+                in_speech = True
+            elif not voiced[i] and in_speech:
+                values.append([-1, t_ms])
+                in_speech = False
+        # 同一块内开始并结束的片段合并为 [beg, end]
+        merged = []
+        for beg, end in values:
+            if beg == -1 and merged and merged[-1][1] == -1 and merged[-1][0] != -1:
+                merged[-1][1] = end
+            else:
+                merged.append([beg, end])
+        cache["in_speech"] = in_speech
+        cache["offset_ms"] = offset_ms + len(input) * 1000 // SAMPLE_RATE
+        return [{"value": merged}]
+
+
+def _pcm(total_s, speech_ms):
+    pcm = np.zeros(int(total_s * SAMPLE_RATE), dtype=np.int16)
+    for beg, end in speech_ms:
+        pcm[beg * SAMPLE_RATE // 1000:end * SAMPLE_RATE // 1000] = 10000
+    return pcm
+
+
+def test_stream_vad_stitches_across_block_boundary():
+    """
+    跨越 10 秒块边界的片段被拼接为一个完整片段，块内片段原样保留，最后一块标记为结束
+    """
+    vad = _FakeStreamVAD()
+    pcm = _pcm(25, [(1000, 3000), (8000, 12500), (15000, 16000)])
+    segments = stream_vad(vad.generate, pcm, SAMPLE_RATE, BLOCK_MS)
+
+    assert segments == [[1000, 3000], [8000, 12500], [15000, 16000]]
+    assert vad.calls == [(0, False), (10000, False), (20000, True)]
+
+
+def test_stream_vad_closes_open_segment_at_end():
+    """
+    音频结束时仍未结束的片段以音频末尾作为结束时间
+    """
+    vad = _FakeStreamVAD()
+    segments = stream_vad(vad.generate, _pcm(12, [(9000, 12000)]), SAMPLE_RATE, BLOCK_MS)
+    assert segments == [[9000, 12000]]
+
+
+def test_bucket_segments():
+    """
+    片段按时长排序分批，每批总时长不超过上限，超长片段独占一批，所有片段恰好出现一次
+    """
+    segments = [[0, 5000], [6000, 7000], [8000, 30000], [31000, 33000], [34000, 104000], [105000, 106500]]
+    batches = bucket_segments(segments, max_batch_s=25)
+
+    assert batches == [[1, 5, 3, 0], [2], [4]]
+    assert sorted(i for batch in batches for i in batch) == list(range(len(segments)))
+    assert bucket_segments([], 60) == []
+
+
+def test_recognize_batch_fallback():
+    """
+    整批识别失败时逐条识别，只有真正失败的片段为 None
+    """
+    calls = []
+
+    def recognize(audios):
+        calls.append(len(audios))
+        if len(audios) > 1:
+            raise RuntimeError("显存不足")
+        if audios[0][0] < 0:
+            raise ValueError("坏片段")
+        return [f"文本{int(audios[0][0])}"]
+
+    audios = [np.full(10, v, dtype=np.float32) for v in (1.0, -1.0, 3.0)]
+    texts = recognize_batch_with_fallback([4, 7, 9], audios, recognize)
+
+    assert texts == {4: "文本1", 7: None, 9: "文本3"}
+    assert calls == [3, 1, 1, 1]
+
+    assert recognize_batch_with_fallback([0], audios[:1], recognize) == {0: "文本1"}
+
+
+def test_split_segments_at_file_boundaries():
+    """
+    多文件拼接时文件之间插入静音；片段按开始时间归属文件，时间换算为文件内时间
+    """
+    gap_s = 30
+    audios = [np.ones(3 * SAMPLE_RATE, dtype=np.float32), np.ones(5 * SAMPLE_RATE, dtype=np.float32),
+              np.ones(2 * SAMPLE_RATE, dtype=np.float32)]
+    audio, offsets = concat_with_gaps(audios, SAMPLE_RATE, gap_s)
+
+    assert offsets == [0.0, 33.0, 68.0]
+    assert len(audio) == (3 + 5 + 2 + 3 * gap_s) * SAMPLE_RATE
+    assert not audio[3 * SAMPLE_RATE:33 * SAMPLE_RATE].any()
+
+    segments = [
+        {"start": 0.5, "end": 2.5, "text": "甲"},
+        {"start": 33.0, "end": 34.0, "text": "乙"},    # 恰好在第二个文件开头
+        {"start": 36.5, "end": 38.0, "text": "丙"},
+        {"start": 68.2, "end": 69.9, "text": "丁"},
+    ]
+    per_file = split_segments_by_file(segments, offsets)
+
+    assert [[s["text"] for s in file_segments] for file_segments in per_file] == [["甲"], ["乙", "丙"], ["丁"]]
+    assert (per_file[1][0]["start"], per_file[1][1]["end"]) == (0.0, 5.0)
+    assert abs(per_file[2][0]["start"] - 0.2) < 1e-9
+    assert split_segments_by_file([], offsets) == [[], [], []]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 VAD 分段与分批识别测试开始\n")
+    test_stream_vad_stitches_across_block_boundary()
+    test_stream_vad_closes_open_segment_at_end()
+    test_bucket_segments()
+    test_recognize_batch_fallback()
+    test_split_segments_at_file_boundaries()
+    logging.info("\n🎉 所有测试完成！")
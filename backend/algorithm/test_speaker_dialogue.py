@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+测试旧格式（v1）词级别说话人切分与原实现结果一致
+"""
+import logging
+
+from benchmark_speaker_dialogue import legacy_speaker_dialogue, load_processor, synthetic_asr
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def test_disjoint_turns_match_legacy():
+    """
+    有序、互不重叠的说话人片段（二分查找路径）
+    """
+    for seed in range(5):
+        data = synthetic_asr(2000, 60, seed=seed)
+        processor = load_processor(data)
+        assert processor._generate_speaker_dialogue_from_words() == \
+            legacy_speaker_dialogue(data["segments"], data["speakers"])
+
+
+def test_overlapping_turns_match_legacy():
+    """
+    乱序、相互重叠的说话人片段（逐块广播路径）
+    """
+    for seed in range(5):
+        data = synthetic_asr(2000, 60, overlap=True, seed=seed)
+        processor = load_processor(data)
+        assert processor._generate_speaker_dialogue_from_words() == \
+            legacy_speaker_dialogue(data["segments"], data["speakers"])
+
+
+def test_word_outside_all_turns():
+    """
+    词不在任何片段内时取最近的片段，距离相同时取靠前的片段
+    """
+    data = {
+        "segments": [{"start": 0.0, "end": 9.0, "text": "abc", "words": [
+            {"word": "a", "start": 0.0, "end": 1.0},
+            {"word": "b", "start": 4.0, "end": 5.0},
+            {"word": "c", "start": 8.0, "end": 9.0},
+        ]}],
+        "speakers": [
+            {"speaker": "S1", "start": 2.0, "end": 3.0},
+            {"speaker": "S2", "start": 6.0, "end": 7.0},
+        ],
+    }
+    dialogue = load_processor(data)._generate_speaker_dialogue_from_words()
+    assert dialogue == legacy_speaker_dialogue(data["segments"], data["speakers"])
+    assert [d["speaker"] for d in dialogue] == ["S1", "S2"]
+
+
+if __name__ == "__main__":
+    logging.info("🧪 词级别说话人切分测试开始\n")
+    test_disjoint_turns_match_legacy()
+    test_overlapping_turns_match_legacy()
+    test_word_outside_all_turns()
+    logging.info("\n🎉 所有测试完成！")
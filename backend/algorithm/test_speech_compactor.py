@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+测试语音区间压缩和时间戳换算
+"""
+import logging
+
+import numpy as np
+
+from speech_compactor import OffsetMap, compact_speech, merge_speech_regions
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SAMPLE_RATE = 16000
+
+
+def test_merge_speech_regions():
+    """
+    片段扩展边距，短停顿合并，长静音剔除
+    """
+    segments = [[1000, 2000], [2500, 3000], [10000, 12000]]
+    regions = merge_speech_regions(segments, total_s=20.0, pad_s=0.2, min_gap_s=1.0)
+    assert regions == [(0.8, 3.2), (9.8, 12.2)]
+
+
+def test_compact_and_remap():
+    """
+    压缩后的音频只包含语音区间，转录时间戳换算回原始时间
+    """
+    audio = np.arange(20 * SAMPLE_RATE, dtype=np.float32)
+    compact, offset_map = compact_speech(audio, [[1000, 3000], [10000, 12000]], SAMPLE_RATE, pad_s=0.0)
+
+    assert len(compact) == 4 * SAMPLE_RATE
+    assert compact[2 * SAMPLE_RATE] == audio[10 * SAMPLE_RATE]
+
+    transcript = [
+        {"index": 1, "spk_id": "0", "sentence": "第一句", "start_time": 0.5, "end_time": 2.0},
+        {"index": 2, "spk_id": "0", "sentence": "第二句", "start_time": 2.0, "end_time": 3.5},
+    ]
+    offset_map.remap_transcript(transcript)
+    assert (transcript[0]["start_time"], transcript[0]["end_time"]) == (1.5, 3.0)
+    assert (transcript[1]["start_time"], transcript[1]["end_time"]) == (10.0, 11.5)
+
+
+def test_empty_offset_map():
+    """
+    没有语音区间时时间戳保持不变
+    """
+    assert OffsetMap([], [], []).to_original(3.0) == 3.0
+
+
+if __name__ == "__main__":
+    logging.info("🧪 语音区间压缩测试开始\n")
+    test_merge_speech_regions()
+    test_compact_and_remap()
+    test_empty_offset_map()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+测试并发任务共享进程级线程数预算
+"""
+import logging
+import threading
+
+from thread_budget import SharedThreadBudget
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+class _FakeThreads:
+    """模拟 torch 的进程级线程数设置"""
+
+    def __init__(self, value):
+        self.value = value
+        self.history = []
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+        self.history.append(value)
+
+
+def test_overlapping_budgets_restore_original():
+    """
+    两个任务交错进入和退出时，运行期间取最大预算，全部退出后恢复最初的线程数
+    """
+    threads = _FakeThreads(4)
+    budget = SharedThreadBudget(threads.get, threads.set)
+
+    first = budget.use(8)
+    second = budget.use(12)
+    first.__enter__()
+    assert threads.value == 8
+    second.__enter__()
+    assert threads.value == 12
+    # 先进入的任务先退出：不能恢复成它进入前看到的 4
+    first.__exit__(None, None, None)
+    assert threads.value == 12
+    second.__exit__(None, None, None)
+    assert threads.value == 4
+
+
+def test_concurrent_threads():
+    """
+    多个线程并发使用预算，结束后线程数回到原值
+    """
+    threads = _FakeThreads(2)
+    budget = SharedThreadBudget(threads.get, threads.set)
+    start = threading.Barrier(6)
+
+    def run(n):
+        start.wait()
+        for _ in range(200):
+            with budget.use(n):
+                assert threads.value >= n
+
+    workers = [threading.Thread(target=run, args=(n,)) for n in (3, 5, 7, 3, 5, 9)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert threads.value == 2
+
+
+if __name__ == "__main__":
+    logging.info("🧪 线程数预算测试开始\n")
+    test_overlapping_budgets_restore_original()
+    test_concurrent_threads()
+    logging.info("\n🎉 所有测试完成！")
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+测试各引擎输出到统一转录格式的转换
+"""
+import logging
+
+from transcript_schema import TRANSCRIPT_FIELDS, UNKNOWN_SPEAKER, build_result, segments_to_transcript
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def test_segments_to_transcript():
+    """
+    片段按重叠最多的说话人分配 spk_id，没有重叠时使用 UNKNOWN_SPEAKER，空文本被跳过，序号连续
+    """
+    segments = [
+        {"start": 0.0, "end": 2.0, "text": " 大家好 "},
+        {"start": 2.0, "end": 3.0, "text": ""},
+        {"start": 3.0, "end": 6.0, "text": "今天讲分片"},
+        {"start": 9.0, "end": 10.0, "text": "没有说话人"},
+    ]
+    speakers = [
+        {"speaker": "SPEAKER_00", "start": 0.0, "end": 3.5},
+        {"speaker": "SPEAKER_01", "start": 3.5, "end": 8.0},
+    ]
+    transcript = segments_to_transcript(segments, speakers)
+
+    assert [s["index"] for s in transcript] == [1, 2, 3]
+    assert [s["spk_id"] for s in transcript] == ["SPEAKER_00", "SPEAKER_01", UNKNOWN_SPEAKER]
+    assert transcript[0]["sentence"] == "大家好"
+    assert all(tuple(s) == TRANSCRIPT_FIELDS for s in transcript)
+
+    # 没有说话人时间轴时所有句子都是 UNKNOWN_SPEAKER
+    assert [s["spk_id"] for s in segments_to_transcript(segments)] == [UNKNOWN_SPEAKER] * 3
+
+
+def test_build_result():
+    """
+    统一格式的结果包含转录、统计信息和引擎附加字段
+    """
+    transcript = segments_to_transcript([{"start": 0.0, "end": 2.0, "text": "你好 世界"}])
+    result = build_result(transcript, "a.mp4", processed_at="2025-01-01T00:00:00", language="zh")
+
+    assert result["processed_at"] == "2025-01-01T00:00:00"
+    assert result["language"] == "zh"
+    assert result["text_stats"]["total_segments"] == 1
+    assert result["text_stats"]["total_words"] == 2
+    assert build_result([], "a.mp4")["text_stats"] == {}
+
+
+if __name__ == "__main__":
+    logging.info("🧪 统一转录格式测试开始\n")
+    test_segments_to_transcript()
+    test_build_result()
+    logging.info("\n🎉 所有测试完成！")
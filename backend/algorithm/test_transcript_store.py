@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+测试二进制转录存储与按时间范围查询
+"""
+import json
+import logging
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from asr_result_io import iter_transcript
+from compact_transcript import CompactTranscript
+from transcript_schema import build_result
+from transcript_store import TranscriptStore, open_transcript_store, store_path, write_transcript_store
+
+# 配置日志
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def _transcript(n=500, seed=0):
+    rng = random.Random(seed)
+    transcript, t = [], 0.0
+    for i in range(n):
+        t += rng.uniform(0.0, 2.0)
+        transcript.append({
+            "index": i + 1,
+            "spk_id": None if i % 7 == 0 else f"SPEAKER_{i % 3:02d}",
+            "sentence": f"第{i}句：中文、English 与 emoji 🎉",
+            # 偶尔出现很长的句子，使后面的句子被它覆盖
+            "start_time": round(t, 3),
+            "end_time": round(t + (30.0 if i % 50 == 0 else rng.uniform(0.2, 3.0)), 3),
+        })
+    return transcript
+
+
+def test_roundtrip_and_query():
+    """
+    写入后读回的句子与原始数据一致，时间范围查询与内存中的 CompactTranscript.time_slice 一致
+    """
+    transcript = _transcript()
+    compact = CompactTranscript.from_transcript(transcript)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_transcript_store(Path(tmp) / "demo.transcript.bin", transcript)
+        store = TranscriptStore(path)
+        assert len(store) == len(transcript)
+        assert store.slice(0, len(store)).to_transcript() == transcript
+        assert store.query() == transcript
+
+        rng = random.Random(1)
+        for _ in range(200):
+            start = rng.uniform(-5, compact.duration + 5)
+            end = start + rng.uniform(0.01, 60)
+            expected = [item for item in transcript if item["start_time"] < end and item["end_time"] > start]
+            assert compact.time_slice(start, end).to_transcript() == expected, (start, end)
+            assert store.query(start, end) == expected, (start, end)
+        assert store.query(compact.duration + 1, compact.duration + 2) == []
+    logging.info("✅ 读写与时间范围查询一致")
+
+
+def test_unsorted_and_empty():
+    """
+    乱序输入按开始时间排序存储；空转录可以写入和查询
+    """
+    transcript = _transcript(50)
+    shuffled = transcript[:]
+    random.Random(2).shuffle(shuffled)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = TranscriptStore(write_transcript_store(Path(tmp) / "a.transcript.bin", shuffled))
+        assert store.query() == transcript
+
+        empty = TranscriptStore(write_transcript_store(Path(tmp) / "b.transcript.bin", []))
+        assert len(empty) == 0 and empty.duration == 0.0
+        assert empty.query(0, 10) == []
+    logging.info("✅ 乱序与空转录")
+
+
+def test_build_from_asr_result_file():
+    """
+    由 ASR 结果文件流式生成存储；文件更新后重新打开得到新内容
+    """
+    transcript = _transcript(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        asr_path = Path(tmp) / "demo_asr_result.json"
+        asr_path.write_text(json.dumps([build_result(transcript, "/videos/demo.mp4")], ensure_ascii=False),
+                            encoding="utf-8")
+        bin_path = store_path(asr_path)
+        assert bin_path.name == "demo_asr_result.transcript.bin"
+
+        write_transcript_store(bin_path, iter_transcript(asr_path))
+        store = open_transcript_store(bin_path)
+        assert open_transcript_store(bin_path) is store
+        assert store.query(10, 20) == [item for item in transcript
+                                       if item["start_time"] < 20 and item["end_time"] > 10]
+
+        write_transcript_store(bin_path, transcript[:10])
+        assert len(open_transcript_store(bin_path)) == 10
+    logging.info("✅ 由 ASR 结果文件生成")
+
+
+def test_concurrent_rebuilds():
+    """
+    多个请求同时重建同一份存储时互不干扰，最终文件完整且没有残留的临时文件
+    """
+    transcript = _transcript(300)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "demo.transcript.bin"
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: write_transcript_store(path, transcript), range(16)))
+        assert TranscriptStore(path).query() == transcript
+        assert [p.name for p in Path(tmp).iterdir()] == [path.name]
+    logging.info("✅ 并发重建")
+
+
+if __name__ == "__main__":
+    logging.info("🧪 二进制转录存储测试开始\n")
+    test_roundtrip_and_query()
+    test_unsorted_and_empty()
+    test_build_from_asr_result_file()
+    test_concurrent_rebuilds()
+    logging.info("\n🎉 所有测试完成！")
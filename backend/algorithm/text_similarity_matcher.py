@@ -6,6 +6,7 @@
 如果重复率达到90%以上，说明该块属于对应的大纲标题
 """
 import logging
+import threading
 from difflib import SequenceMatcher
 
 try:
@@ -17,6 +18,29 @@ except ImportError:
     logging.warning("sentence-transformers 库未安装，将使用基于字符串的相似度计算")
 
 
+SEMANTIC_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+# 进程级共享的语义模型
+_semantic_model = None
+_semantic_model_lock = threading.Lock()
+
+
+def get_semantic_model():
+    """
+    获取进程级共享的语义模型（首次调用时加载）
+    
+    多个匹配器实例以及预加载后 fork 出的工作进程复用同一份模型权重。
+    """
+    global _semantic_model
+    if _semantic_model is None:
+        with _semantic_model_lock:
+            if _semantic_model is None:
+                logging.info("正在加载轻量级语义模型...")
+                _semantic_model = SentenceTransformer(SEMANTIC_MODEL_NAME)
+                logging.info("语义模型加载成功")
+    return _semantic_model
+
+
 class TextSimilarityMatcher:
     """
     文本相似度匹配器
@@ -41,9 +65,7 @@ class TextSimilarityMatcher:
         
         if self.use_semantic:
             try:
-                logging.info("正在加载轻量级语义模型...")
-                self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-                logging.info("语义模型加载成功")
+                self.model = get_semantic_model()
             except Exception as e:
                 logging.error(f"加载语义模型失败: {e}")
                 self.model = None
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+进程级线程数预算
+
+torch.set_num_threads 设置的是进程级的 intra-op 线程池，同一进程中并发的任务
+（例如引擎池中同时运行的多个引擎）各自设置再各自恢复会互相覆盖，最后留下错误的线程数。
+SharedThreadBudget 用一把锁和引用计数协调：第一个进入的任务保存原值，
+运行期间线程数取所有活动预算中的最大值，最后一个退出的任务恢复原值。
+"""
+
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+
+class SharedThreadBudget:
+    """
+    多个并发任务共享的进程级线程数预算
+
+    功能特性：
+    - 引用计数：只有第一个进入的任务保存原值，只有最后一个退出的任务恢复原值
+    - 并发任务的预算不同时取最大值，任务退出后降回剩余任务的最大预算
+    """
+
+    def __init__(self, get_threads: Callable[[], int], set_threads: Callable[[int], None]):
+        """
+        Args:
+            get_threads: 读取当前线程数（如 torch.get_num_threads）
+            set_threads: 设置线程数（如 torch.set_num_threads）
+        """
+        self._get = get_threads
+        self._set = set_threads
+        self._lock = threading.Lock()
+        self._active = Counter()
+        self._saved: Optional[int] = None
+
+    @contextmanager
+    def use(self, num_threads: int) -> Iterator[None]:
+        """在上下文内按 num_threads 参与线程数预算"""
+        with self._lock:
+            if not self._active:
+                self._saved = self._get()
+            self._active[num_threads] += 1
+            self._set(max(self._active))
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active[num_threads] -= 1
+                if not self._active[num_threads]:
+                    del self._active[num_threads]
+                self._set(max(self._active) if self._active else self._saved)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+统一的转录结果格式
+
+所有 ASR 引擎的输出都规范化为 Paraformer V2 的格式，ASRProcessor 只需处理这一种：
+
+{
+    "transcript": [
+        {"index": 1, "spk_id": "0", "sentence": "你好，世界！", "start_time": 0.0, "end_time": 1.5},
+        ...
+    ],
+    "video_path": str,
+    "processed_at": str,
+    "text_stats": {...}
+}
+
+时间单位均为秒；没有说话人信息时 spk_id 为 None，
+由片段转换（segments_to_transcript）的句子无法分配说话人时 spk_id 为 UNKNOWN_SPEAKER。
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+TRANSCRIPT_FIELDS = ("index", "spk_id", "sentence", "start_time", "end_time")
+
+# 无法分配说话人时使用的 spk_id（ASRProcessor 显示为 SPEAKER_UNKNOWN）
+UNKNOWN_SPEAKER = "UNKNOWN"
+
+
+def compute_text_stats(transcript: List[Dict]) -> Dict:
+    """
+    计算转录文本统计信息
+
+    Args:
+        transcript: 统一格式的句子列表
+
+    Returns:
+        Dict: 句子数、词数、字符数、平均句子时长，转录为空时返回空字典
+    """
+    if not transcript:
+        return {}
+    total_text = " ".join([seg.get('sentence', '') for seg in transcript])
+    return {
+        "total_segments": len(transcript),
+        "total_words": len(total_text.split()),
+        "total_chars": len(total_text),
+        "avg_segment_duration": sum([
+            seg.get('end_time', 0) - seg.get('start_time', 0)
+            for seg in transcript
+        ]) / len(transcript),
+    }
+
+
+def build_result(transcript: List[Dict], video_path: str, **extra) -> Dict:
+    """
+    组装统一格式的识别结果
+
+    Args:
+        transcript: 统一格式的句子列表
+        video_path: 视频文件路径
+        **extra: 引擎特有的附加字段（如 language）
+
+    Returns:
+        Dict: 统一格式的结果
+    """
+    return {
+        "transcript": transcript,
+        "video_path": video_path,
+        "processed_at": extra.pop("processed_at", None) or datetime.now().isoformat(),
+        "text_stats": compute_text_stats(transcript),
+        **extra,
+    }
+
+
+def assign_speaker(start: float, end: float, speakers: Optional[List[Dict]]) -> Optional[str]:
+    """
+    按时间重叠最多的原则为一个片段分配说话人
+
+    Args:
+        start: 片段开始时间（秒）
+        end: 片段结束时间（秒）
+        speakers: 说话人时间轴 [{"speaker", "start", "end"}, ...]
+
+    Returns:
+        Optional[str]: 说话人标签，没有重叠时返回 None
+    """
+    best_speaker, max_overlap = None, 0.0
+    for turn in speakers or []:
+        overlap = min(end, turn['end']) - max(start, turn['start'])
+        if overlap > max_overlap:
+            max_overlap = overlap
+            best_speaker = str(turn['speaker'])
+    return best_speaker
+
+
+def segments_to_transcript(segments: List[Dict], speakers: Optional[List[Dict]] = None) -> List[Dict]:
+    """
+    将 {"start", "end", "text"[, "speaker"]} 形式的片段转换为统一格式的句子列表
+
+    片段自带 speaker 字段时直接使用，否则根据说话人时间轴按重叠分配，
+    没有重叠的说话人时使用 UNKNOWN_SPEAKER。
+
+    Args:
+        segments: 片段列表（时间单位为秒）
+        speakers: 说话人时间轴（可选）
+
+    Returns:
+        List[Dict]: 统一格式的句子列表
+    """
+    transcript = []
+    for segment in segments or []:
+        text = (segment.get('text') or '').strip()
+        if not text:
+            continue
+        start = float(segment.get('start', 0.0))
+        end = float(segment.get('end', start))
+        speaker = segment.get('speaker')
+        if speaker is None:
+            speaker = assign_speaker(start, end, speakers) or UNKNOWN_SPEAKER
+        transcript.append({
+            "index": len(transcript) + 1,
+            "spk_id": str(speaker),
+            "sentence": text,
+            "start_time": start,
+            "end_time": end,
+        })
+    return transcript
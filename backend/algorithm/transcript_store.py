@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+二进制转录存储
+
+与 *_asr_result.json 并列写入 <名称>.transcript.bin，以列式二进制保存句子，
+并按开始时间排序建立时间索引。列与 CompactTranscript 一致；读取时以内存映射方式打开，
+按时间范围查询只需在索引上二分查找，然后只解码命中区间的文本，得到该区间的 CompactTranscript，
+不需要载入整份转录。
+
+文件布局（小端）：
+    magic "VDTS" | 版本 uint32 | 头长度 uint32 | 头（JSON） | 数据区（各列按 8 字节对齐，偏移记录在头中）
+
+列：
+    start / end            float64  开始 / 结束时间（秒），按开始时间排序
+    max_end                float64  end 的前缀最大值，用于二分查找与查询区间重叠的第一句
+    index                  int64    原句子序号
+    speaker_codes          int32    说话人编码（头中 speakers 的下标，-1 表示没有说话人信息）
+    text_offsets           int64    每句 UTF-8 文本在 text 中的起止字节偏移（长度为句子数 + 1）
+    char_offsets           int64    每句在解码后文本中的起止字符偏移（即 CompactTranscript.offsets）
+    text                   uint8    所有句子拼接的 UTF-8 文本
+"""
+
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from compact_transcript import CompactTranscript
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAGIC = b"VDTS"
+STORE_VERSION = 2
+_PREFIX = struct.Struct("<4sII")
+_ALIGN = 8
+
+_COLUMNS = (
+    ("start", "<f8"),
+    ("end", "<f8"),
+    ("max_end", "<f8"),
+    ("index", "<i8"),
+    ("speaker_codes", "<i4"),
+    ("text_offsets", "<i8"),
+    ("char_offsets", "<i8"),
+    ("text", "u1"),
+)
+
+
+def store_path(asr_result_path) -> Path:
+    """ASR 结果文件对应的二进制转录存储路径"""
+    path = Path(asr_result_path)
+    return path.with_name(f"{path.stem}.transcript.bin")
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def write_transcript_store(path, transcript: Iterable[Dict]) -> Path:
+    """
+    写入二进制转录存储
+
+    Args:
+        path: 目标文件路径
+        transcript: CompactTranscript，或统一格式的句子（列表或生成器，例如 asr_result_io.iter_transcript）
+
+    Returns:
+        Path: 写入的文件路径
+    """
+    compact = transcript if isinstance(transcript, CompactTranscript) \
+        else CompactTranscript.from_transcript(list(transcript))
+    # 按开始时间稳定排序，保证时间索引有序且相同开始时间的句子保持原顺序
+    if len(compact) and not np.all(compact.start[:-1] <= compact.start[1:]):
+        compact = compact.take(np.argsort(compact.start, kind="stable"))
+    text_offsets = np.zeros(len(compact) + 1, dtype=np.int64)
+    np.cumsum([len(compact.sentence(i).encode("utf-8")) for i in range(len(compact))], out=text_offsets[1:])
+    base = int(compact.offsets[0]) if len(compact.offsets) else 0
+
+    columns = {
+        "start": compact.start,
+        "end": compact.end,
+        "max_end": compact.max_end,
+        "index": compact.index,
+        "speaker_codes": compact.speaker_codes,
+        "text_offsets": text_offsets,
+        "char_offsets": compact.offsets - base,
+        "text": np.frombuffer(compact.text[base:int(compact.offsets[-1])].encode("utf-8"), dtype=np.uint8),
+    }
+
+    # 头中记录各列相对数据区起点的偏移，数据区从头之后按 8 字节对齐开始
+    sections, offset = {}, 0
+    for name, dtype in _COLUMNS:
+        sections[name] = [offset, dtype, len(columns[name])]
+        offset += columns[name].astype(dtype, copy=False).nbytes
+        offset += _pad(offset)
+    header = json.dumps({
+        "count": len(compact),
+        "speakers": compact.speakers,
+        "duration": compact.duration,
+        "sections": sections,
+    }, ensure_ascii=False).encode("utf-8")
+    data_start = _PREFIX.size + len(header)
+    data_start += _pad(data_start)
+
+    # 每个写入方使用唯一的临时文件，并发重建同一份存储时不会互相截断
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_PREFIX.pack(MAGIC, STORE_VERSION, len(header)))
+            f.write(header)
+            for name, dtype in _COLUMNS:
+                f.write(b"\0" * (data_start + sections[name][0] - f.tell()))
+                f.write(columns[name].astype(dtype, copy=False).tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    logging.info(f"二进制转录已写入: {path}（{len(compact)} 句）")
+    return path
+
+
+class TranscriptStore:
+    """
+    以内存映射方式读取的二进制转录
+
+    功能特性：
+    - 打开时只读取头，各列按需从映射页中读取
+    - 按时间范围查询：在开始时间和结束时间前缀最大值上二分查找
+    - 按区间读取为 CompactTranscript，数值列直接使用映射文件上的视图
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != MAGIC or version != STORE_VERSION:
+                raise ValueError(f"不支持的转录存储格式: {self.path}")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        data_start = _PREFIX.size + header_len
+        data_start += _pad(data_start)
+
+        self.count: int = header["count"]
+        self.speakers: List[str] = header["speakers"]
+        self.duration: float = header["duration"]
+        for name, (offset, dtype, length) in header["sections"].items():
+            column = np.memmap(self.path, dtype=dtype, mode="r", offset=data_start + offset, shape=(length,)) \
+                if length else np.empty(0, dtype=dtype)
+            setattr(self, name, column)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def slice(self, lo: int, hi: int) -> CompactTranscript:
+        """
+        读取 [lo, hi) 区间内的句子（按开始时间排序后的位置）
+
+        Returns:
+            CompactTranscript: 数值列为映射文件上的视图，只解码区间内的文本
+        """
+        lo = min(max(0, lo), self.count)
+        hi = min(max(lo, hi), self.count)
+        byte_lo, byte_hi = int(self.text_offsets[lo]), int(self.text_offsets[hi])
+        char_offsets = np.asarray(self.char_offsets[lo:hi + 1])
+        return CompactTranscript(
+            self.index[lo:hi], self.start[lo:hi], self.end[lo:hi], self.speaker_codes[lo:hi], self.speakers,
+            bytes(self.text[byte_lo:byte_hi]).decode("utf-8"), char_offsets - char_offsets[0],
+        )
+
+    def time_slice(self, start: float = 0.0, end: Optional[float] = None) -> CompactTranscript:
+        """
+        与时间范围 [start, end) 重叠的句子
+
+        Args:
+            start: 开始时间（秒）
+            end: 结束时间（秒），None 表示到结尾
+
+        Returns:
+            CompactTranscript: 按开始时间排序的句子
+        """
+        lo = int(np.searchsorted(self.max_end, start, side="right"))
+        hi = self.count if end is None else max(lo, int(np.searchsorted(self.start, end, side="left")))
+        candidates = self.slice(lo, hi)
+        # 前缀最大值只保证区间内第一句满足条件，区间内其余句子逐个确认
+        keep = np.flatnonzero(candidates.end > start)
+        return candidates if len(keep) == len(candidates) else candidates.take(keep)
+
+    def query(self, start: float = 0.0, end: Optional[float] = None) -> List[Dict]:
+        """
+        查询与时间范围 [start, end) 重叠的句子
+
+        Returns:
+            List[Dict]: 按开始时间排序的统一格式句子
+        """
+        return self.time_slice(start, end).to_transcript()
+
+
+_store_cache: "OrderedDict[tuple, TranscriptStore]" = OrderedDict()
+_store_cache_lock = threading.Lock()
+_STORE_CACHE_SIZE = 16
+
+
+def open_transcript_store(path) -> TranscriptStore:
+    """
+    打开二进制转录存储（按路径和修改时间缓存最近打开的文件）
+
+    Args:
+        path: .transcript.bin 路径
+    """
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns)
+    with _store_cache_lock:
+        store = _store_cache.get(key)
+        if store is not None:
+            _store_cache.move_to_end(key)
+            return store
+    store = TranscriptStore(path)
+    with _store_cache_lock:
+        _store_cache[key] = store
+        while len(_store_cache) > _STORE_CACHE_SIZE:
+            _store_cache.popitem(last=False)
+    return store
@@ -24,7 +24,11 @@ from pydantic import BaseModel
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
-from backend.algorithm.pipeline import run_full_pipeline
+from backend.algorithm.pipeline import get_model_warmup, get_prefork_executor, run_full_pipeline
+import backend.algorithm.config as config
+from backend.algorithm.asr_result_io import iter_transcript, read_header
+from backend.algorithm.transcript_store import open_transcript_store, store_path, write_transcript_store
+from backend.devour.asr_engine_pool import get_asr_engine_pool_stats
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -110,6 +114,45 @@ async def health_check():
     """健康检查接口"""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.on_event("startup")
+async def start_model_warmup():
+    """
+    服务启动后在后台预加载模型，不阻塞启动
+
+    启用预加载工作池时，先在主线程中预加载模型并 fork 工作进程（此时尚未启动任何线程），
+    这一步会阻塞启动直到工作进程就绪。
+    """
+    prefork = get_prefork_executor()
+    if prefork is not None:
+        prefork.start()
+    if getattr(config, 'WARMUP_ON_STARTUP', True):
+        get_model_warmup().start()
+
+@app.get("/api/ready")
+async def readiness_check():
+    """就绪检查接口：模型全部加载完成前返回 503"""
+    if not getattr(config, 'WARMUP_ON_STARTUP', True):
+        return {"ready": True, "warmup": "disabled", "timestamp": datetime.now().isoformat()}
+    status = get_model_warmup().status()
+    status["timestamp"] = datetime.now().isoformat()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/api/asr/pool")
+async def asr_pool_status():
+    """ASR 引擎池占用情况"""
+    stats = get_asr_engine_pool_stats()
+    if stats is None:
+        return {"status": "not_initialized", "timestamp": datetime.now().isoformat()}
+    return {"status": "ok", "pool": stats, "timestamp": datetime.now().isoformat()}
+
+@app.get("/api/workers/memory")
+async def workers_memory():
+    """预加载工作进程的独占 / 共享内存"""
+    prefork = get_prefork_executor()
+    if prefork is None:
+        return {"status": "disabled", "timestamp": datetime.now().isoformat()}
+    return {"status": "ok", "memory": prefork.memory_report(), "timestamp": datetime.now().isoformat()}
+
 @app.post("/api/video/upload", response_model=UploadResponse)
 async def upload_video(file: UploadFile = File(...)):
     """
@@ -337,35 +380,31 @@ async def get_task_report(task_id: str):
         if original_filename:
             video_name = Path(original_filename).stem
     
-    # 读取视频时长信息
+    # 读取视频时长信息（只读 ASR 结果的头文件，不解析转录内容）
     asr_files = list(output_dir.glob("*_asr_result.json"))
     if asr_files:
         try:
-            with open(asr_files[0], 'r', encoding='utf-8') as f:
-                asr_data = json.load(f)
-                if asr_data and len(asr_data) > 0:
-                    transcript = asr_data[0].get('transcript', [])
-                    if transcript:
-                        # 获取最后一个片段的结束时间作为视频总时长
-                        last_segment = transcript[-1]
-                        total_seconds = last_segment.get('end_time', 0)
-                        
-                        # 格式化时长为 MM:SS 或 HH:MM:SS
-                        if total_seconds >= 3600:  # 超过1小时
-                            hours = int(total_seconds // 3600)
-                            minutes = int((total_seconds % 3600) // 60)
-                            seconds = int(total_seconds % 60)
-                            duration = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                        else:
-                            minutes = int(total_seconds // 60)
-                            seconds = int(total_seconds % 60)
-                            duration = f"{minutes:02d}:{seconds:02d}"
-                    
-                    # 如果任务数据中没有获取到文件名，尝试从video_path获取文件名（备用方案）
-                    if video_name == "未知视频":
-                        video_path = asr_data[0].get('video_path', '')
-                        if video_path:
-                            video_name = Path(video_path).stem
+            header = read_header(asr_files[0])
+            if header.get('total_segments'):
+                # 最后一个片段的结束时间作为视频总时长
+                total_seconds = header.get('duration', 0)
+                
+                # 格式化时长为 MM:SS 或 HH:MM:SS
+                if total_seconds >= 3600:  # 超过1小时
+                    hours = int(total_seconds // 3600)
+                    minutes = int((total_seconds % 3600) // 60)
+                    seconds = int(total_seconds % 60)
+                    duration = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+                else:
+                    minutes = int(total_seconds // 60)
+                    seconds = int(total_seconds % 60)
+                    duration = f"{minutes:02d}:{seconds:02d}"
+            
+            # 如果任务数据中没有获取到文件名，尝试从video_path获取文件名（备用方案）
+            if video_name == "未知视频":
+                video_path = header.get('video_path') or ''
+                if video_path:
+                    video_name = Path(video_path).stem
         except Exception as e:
             print(f"读取ASR结果失败: {e}")
     
@@ -383,6 +422,67 @@ async def get_task_report(task_id: str):
         "status": "completed" if (detailed_outline or final_report) else "processing"
     }
 
+@app.get("/api/task/{task_id}/transcript")
+async def get_task_transcript(task_id: str, start: float = 0.0, end: Optional[float] = None):
+    """
+    按时间范围获取转录句子（用于编辑器中与视频同步的转录视图）
+
+    从二进制转录存储中二分查找与 [start, end) 重叠的句子，end 省略时返回到结尾。
+    旧任务没有二进制存储（或存储早于 ASR 结果文件）时，由 ASR 结果流式生成一次。
+    """
+    if start < 0 or (end is not None and end <= start):
+        raise HTTPException(status_code=400, detail="时间范围无效")
+
+    # 查找输出目录
+    output_dir = None
+    for dir_path in OUTPUT_DIR.iterdir():
+        if dir_path.is_dir() and dir_path.name.startswith(f"frames_{task_id}"):
+            output_dir = dir_path
+            break
+    if not output_dir:
+        task_output_dir = OUTPUT_DIR / task_id
+        if not task_output_dir.exists():
+            raise HTTPException(status_code=404, detail="任务不存在")
+        output_dir = task_output_dir
+
+    asr_files = list(output_dir.glob("*_asr_result.json"))
+    if not asr_files:
+        raise HTTPException(status_code=404, detail="转录结果不存在")
+
+    # 重建存储和解码文本都是阻塞操作，放到线程池中执行，不阻塞事件循环
+    loop = asyncio.get_event_loop()
+    try:
+        store, transcript = await loop.run_in_executor(None, _query_transcript_store, asr_files[0], start, end)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"读取转录失败: {str(e)}")
+
+    return {
+        "task_id": task_id,
+        "start": start,
+        "end": end,
+        "total_segments": len(store),
+        "duration": store.duration,
+        "transcript": transcript,
+    }
+
+def _query_transcript_store(asr_file: Path, start: float, end: Optional[float]):
+    """
+    打开 ASR 结果对应的二进制转录存储（缺失、过期或版本过旧时重新生成）并按时间范围查询
+
+    Returns:
+        (TranscriptStore, 句子列表)
+    """
+    bin_path = store_path(asr_file)
+    if not bin_path.exists() or bin_path.stat().st_mtime_ns < asr_file.stat().st_mtime_ns:
+        write_transcript_store(bin_path, iter_transcript(asr_file))
+    try:
+        store = open_transcript_store(bin_path)
+    except ValueError:
+        # 旧版本的存储格式，重新生成
+        write_transcript_store(bin_path, iter_transcript(asr_file))
+        store = open_transcript_store(bin_path)
+    return store, store.query(start, end)
+
 @app.get("/api/reports/{task_id}/{file_type}")
 async def get_report_file(task_id: str, file_type: str):
     """
@@ -718,7 +818,12 @@ async def run_pipeline_with_progress(video_path: str, task_id: str):
         # 使用线程池执行器运行同步函数
         with concurrent.futures.ThreadPoolExecutor() as executor:
             # 在执行过程中定期更新进度
-            future = executor.submit(run_full_pipeline, video_path)
+            # 配置了预加载工作进程时在共享模型的 fork 子进程中运行
+            prefork = get_prefork_executor()
+            if prefork is not None:
+                future = await loop.run_in_executor(executor, prefork.submit, run_full_pipeline, video_path)
+            else:
+                future = executor.submit(run_full_pipeline, video_path)
             
             # 模拟进度更新
             progress_steps = [
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+VideoDevour ASR 引擎接口与注册表
+
+所有 ASR 引擎遵循同一个接口（ASREngine），并在类属性中声明自身的加载开销、
+典型实时率和识别质量等级。注册表按名称延迟导入引擎（未安装可选依赖的引擎
+会被视为不可用），pipeline 可以按名称取用引擎，也可以按要求的速度 / 质量
+自动选择开销最小的引擎。可用引擎列表和自动选择的结果按进程缓存，
+pipeline 每次运行不会重新导入全部引擎模块。
+
+引擎输出经 normalize 转换为统一转录格式（见 backend/algorithm/transcript_schema.py），
+ASRProcessor 只需处理这一种格式。
+"""
+
+import importlib
+import logging
+import threading
+from typing import Dict, List, Optional, Protocol, runtime_checkable
+
+# 识别质量等级
+QUALITY_LEVELS = {
+    "draft": 1,      # 草稿：只要求大致内容
+    "standard": 2,   # 标准：文本准确，可以没有说话人信息
+    "high": 3,       # 高：文本准确且带说话人分离
+}
+
+
+@runtime_checkable
+class ASREngine(Protocol):
+    """
+    ASR 引擎接口
+
+    类属性：
+        ENGINE_NAME: 注册表中的引擎名称
+        LOAD_COST_S: 冷启动加载全部模型的大致耗时（秒）
+        EXPECTED_RTF: 典型实时率（处理耗时 / 音频时长）
+        QUALITY: 识别质量等级（见 QUALITY_LEVELS）
+        SUPPORTS_STREAMING: devour_video 是否支持 streaming 参数
+
+    可选类方法：
+        missing_prerequisites() -> List[str]: 构造引擎前必须具备、但当前缺失的前置条件
+            （配置文件、可选依赖等），非空时引擎视为不可用
+    """
+
+    ENGINE_NAME: str
+    LOAD_COST_S: float
+    EXPECTED_RTF: float
+    QUALITY: int
+    SUPPORTS_STREAMING: bool
+
+    def load(self) -> None:
+        """预加载模型，使后续识别不再承担加载开销"""
+
+    def devour_video(self, video_path: str, task_dir: Optional[str] = None) -> Dict:
+        """识别单个视频，返回引擎自身格式的结果"""
+
+    def normalize(self, result: Dict) -> Dict:
+        """将 devour_video 的结果转换为统一转录格式"""
+
+
+# 引擎名称 -> (模块, 类名)
+_ENGINES: Dict[str, tuple] = {
+    "paraformer_v2": ("backend.devour.asr_engine_paraformer_v2", "VideoDevourASRParaformerV2"),
+    "onnx": ("backend.devour.asr_engine_onnx", "VideoDevourASRONNX"),
+    "sensevoice": ("backend.devour.asr_engine_paraformer", "VideoDevourASRFunasr"),
+    "whisper": ("backend.devour.asr_engine_whisper", "VideoDevourASR"),
+}
+
+
+# 进程级缓存：可用引擎列表与自动选择结果
+_available_cache: Optional[List[Dict]] = None
+_selection_cache: Dict[tuple, str] = {}
+_cache_lock = threading.Lock()
+
+
+def register_engine(name: str, module: str, class_name: str):
+    """
+    注册引擎
+
+    Args:
+        name: 引擎名称
+        module: 引擎所在模块
+        class_name: 引擎类名
+    """
+    _ENGINES[name] = (module, class_name)
+    clear_engine_cache()
+
+
+def clear_engine_cache():
+    """清空可用引擎和自动选择结果的缓存（安装依赖或补齐模型文件后调用）"""
+    global _available_cache
+    with _cache_lock:
+        _available_cache = None
+        _selection_cache.clear()
+
+
+def load_engine_class(engine_name: str):
+    """
+    按名称加载 ASR 引擎类
+
+    Args:
+        engine_name: 注册表中的引擎名称
+
+    Returns:
+        引擎类
+
+    Raises:
+        ValueError: 未注册的引擎名称
+        ImportError: 引擎依赖未安装
+    """
+    if engine_name not in _ENGINES:
+        raise ValueError(f"未知 ASR 引擎: {engine_name}，可选: {list(_ENGINES)}")
+    module_name, class_name = _ENGINES[engine_name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def engine_info(engine_cls) -> Dict:
+    """引擎声明的元信息"""
+    return {
+        "name": engine_cls.ENGINE_NAME,
+        "load_cost_s": engine_cls.LOAD_COST_S,
+        "expected_rtf": engine_cls.EXPECTED_RTF,
+        "quality": engine_cls.QUALITY,
+        "supports_streaming": engine_cls.SUPPORTS_STREAMING,
+    }
+
+
+def missing_prerequisites(engine_cls) -> List[str]:
+    """引擎声明的、构造前必须具备但当前缺失的前置条件"""
+    check = getattr(engine_cls, "missing_prerequisites", None)
+    return list(check()) if check is not None else []
+
+
+def available_engines(refresh: bool = False) -> List[Dict]:
+    """
+    列出当前环境中可用的引擎及其元信息（结果按进程缓存）
+
+    Args:
+        refresh: 忽略缓存重新检查
+
+    Returns:
+        List[Dict]: engine_info 列表，依赖未安装或缺少必需文件的引擎不包含在内
+    """
+    global _available_cache
+    with _cache_lock:
+        if _available_cache is not None and not refresh:
+            return list(_available_cache)
+        engines = []
+        for name in _ENGINES:
+            try:
+                engine_cls = load_engine_class(name)
+                missing = missing_prerequisites(engine_cls)
+                if missing:
+                    logging.info(f"ASR 引擎 {name} 不可用: 缺少 {missing}")
+                    continue
+                engines.append(engine_info(engine_cls))
+            except Exception as e:
+                logging.info(f"ASR 引擎 {name} 不可用: {e}")
+        _available_cache = engines
+        _selection_cache.clear()
+        return list(engines)
+
+
+def estimated_cost(info: Dict, duration_s: float, loaded: bool = False) -> float:
+    """
+    估算处理一段音频的耗时（秒）
+
+    Args:
+        info: engine_info 返回的元信息
+        duration_s: 音频时长（秒）
+        loaded: 引擎是否已加载（已加载时不计加载开销）
+    """
+    return (0.0 if loaded else info["load_cost_s"]) + info["expected_rtf"] * duration_s
+
+
+def choose_engine(engines: List[Dict], duration_s: float = 600.0, max_rtf: Optional[float] = None,
+                  min_quality: Optional[str] = None, loaded: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    在候选引擎中选择满足要求且估算耗时最小的一个
+
+    Args:
+        engines: 候选引擎的元信息
+        duration_s: 待处理音频时长（秒），用于权衡加载开销和实时率
+        max_rtf: 要求的最大实时率
+        min_quality: 要求的最低质量等级（见 QUALITY_LEVELS）
+        loaded: 已加载的引擎名称（不计加载开销）
+
+    Returns:
+        Optional[Dict]: 选中的引擎元信息，没有满足要求的引擎时返回 None
+    """
+    if min_quality is not None and min_quality not in QUALITY_LEVELS:
+        raise ValueError(f"未知质量等级: {min_quality}，可选: {list(QUALITY_LEVELS)}")
+    required_quality = QUALITY_LEVELS.get(min_quality, 0)
+    loaded = set(loaded or [])
+
+    candidates = [
+        info for info in engines
+        if info["quality"] >= required_quality and (max_rtf is None or info["expected_rtf"] <= max_rtf)
+    ]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda info: (
+        estimated_cost(info, duration_s, info["name"] in loaded), -info["quality"]
+    ))
+
+
+def select_engine(duration_s: float = 600.0, max_rtf: Optional[float] = None,
+                  min_quality: Optional[str] = None, loaded: Optional[List[str]] = None) -> str:
+    """
+    在当前环境可用的引擎中按速度 / 质量要求选择引擎（相同要求的选择结果按进程缓存）
+
+    Returns:
+        str: 引擎名称
+
+    Raises:
+        RuntimeError: 没有满足要求的可用引擎
+    """
+    key = (duration_s, max_rtf, min_quality, tuple(sorted(loaded or [])))
+    with _cache_lock:
+        if key in _selection_cache:
+            return _selection_cache[key]
+    info = choose_engine(available_engines(), duration_s, max_rtf, min_quality, loaded)
+    if info is None:
+        raise RuntimeError(f"没有满足要求的 ASR 引擎（max_rtf={max_rtf}, min_quality={min_quality}）")
+    logging.info(f"已选择 ASR 引擎: {info['name']}（RTF {info['expected_rtf']}，质量 {info['quality']}）")
+    with _cache_lock:
+        _selection_cache[key] = info["name"]
+    return info["name"]
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+VideoDevour ASR Engine - ONNX Runtime
+将 FSMN-VAD、Paraformer、CT-Transformer 标点模型导出为 ONNX 后用 onnxruntime 推理，
+输出与 VideoDevourASRParaformerV2 相同的标准化转录格式
+
+与 Paraformer V2 的差异：导出的 Paraformer 图不输出字级时间戳，句子时间由 VAD 片段边界
+按字符位置线性插值得到（见 split_sentences）；不做说话人分离，所有句子的 spk_id 为 "0"。
+"""
+
+import logging
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# 添加算法模块路径
+sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
+from modelscope_manager import ModelScopeManager
+from audio_ingest import AudioIngest, SAMPLE_RATE
+from asr_cache import ASRResultCache, get_asr_result_cache
+from batch_runner import find_video_files, run_batch
+from segment_batching import bucket_segments, recognize_batch_with_fallback
+from transcript_schema import build_result
+
+try:
+    import onnxruntime as ort
+    from funasr_onnx import Fsmn_vad, Paraformer, CT_Transformer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+    logging.warning("onnxruntime / funasr-onnx 未安装，ONNX 引擎不可用")
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class VideoDevourASRONNX:
+    """
+    VideoDevour ASR 引擎 - ONNX Runtime 版本
+
+    功能特性：
+    - 首次使用时将 VAD / ASR / 标点模型导出到 cache/onnx，之后直接复用导出的图，
+      不改动下载的模型目录（模型清单校验不受影响）
+    - onnxruntime 会话按配置设置 intra-op / inter-op 线程数
+    - VAD 片段按时长分桶批量识别，整批失败时退化为逐条识别
+    - 输出格式与 Paraformer V2 的 normalize_result 一致；句子时间为片段内线性插值
+    - 不包含说话人分离，所有句子的 spk_id 为 "0"
+    """
+
+    # 引擎元信息（见 asr_engine.py 中的引擎注册表）
+    ENGINE_NAME = "onnx"
+    LOAD_COST_S = 10.0           # 加载已导出 ONNX 模型的大致耗时（秒，首次导出另计）
+    EXPECTED_RTF = 0.04          # CPU 上的典型实时率
+    QUALITY = 2                  # 识别质量等级：1 草稿 / 2 标准 / 3 高（无说话人分离）
+    SUPPORTS_STREAMING = False
+    
+    # 子句切分标点（与 Paraformer V2 的 sentence_info 粒度相近）
+    SENTENCE_PUNCTUATION = "，。？！、,.?!"
+
+    # 批量识别：每批 VAD 片段的总时长上限（秒）和片段数上限
+    BATCH_MAX_S = 60
+    BATCH_MAX_SEGMENTS = 16
+
+    # 未做说话人分离时所有句子的说话人
+    SPEAKER_ID = "0"
+
+    MODEL_PATHS = {
+        "vad": "models/iic/speech_fsmn_vad_zh-cn-16k-common-pytorch",
+        "asr": "models/iic/speech_paraformer-large-vad-punc-spk_asr_nat-zh-cn",
+        "punc": "models/iic/punc_ct-transformer_cn-en-common-vocab471067-large",
+    }
+
+    @classmethod
+    def missing_prerequisites(cls) -> List[str]:
+        """构造引擎前必须具备但当前缺失的依赖（见 asr_engine.available_engines）"""
+        return [] if ONNX_AVAILABLE else ["onnxruntime", "funasr-onnx"]
+
+    def __init__(self, intra_op_threads: int = 4, inter_op_threads: int = 1,
+                 use_cache: bool = True, result_cache: Optional[ASRResultCache] = None):
+        """
+        初始化 ONNX 引擎
+
+        Args:
+            intra_op_threads: 单个算子内部的并行线程数
+            inter_op_threads: 算子之间的并行线程数（1 表示顺序执行）
+            use_cache: 是否启用 ASR 结果缓存
+            result_cache: 自定义结果缓存，默认使用进程级共享缓存
+        """
+        if not ONNX_AVAILABLE:
+            raise ImportError("ONNX 引擎需要 onnxruntime 和 funasr-onnx: pip install onnxruntime funasr-onnx")
+
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.device = "cpu"
+        self.use_cache = use_cache
+
+        self._vad_model = None
+        self._asr_model = None
+        self._punc_model = None
+
+        # 获取项目根目录
+        self.project_root = Path(__file__).resolve().parent.parent.parent
+        self.model_manager = ModelScopeManager(str(self.project_root))
+
+        # 确保导出所需的 PyTorch 模型存在
+        missing_models = self.model_manager.get_missing_models()
+        if missing_models:
+            logging.info(f"检测到缺失模型: {missing_models}，正在下载...")
+            self.model_manager.download_all_missing_models()
+
+        self.result_cache = (result_cache or get_asr_result_cache()) if use_cache else None
+
+    def engine_kwargs(self) -> Dict:
+        """
+        以相同配置重建引擎所需的构造参数（可序列化，供工作进程使用）
+
+        Returns:
+            Dict: 构造参数（自定义 result_cache 不传递，工作进程使用进程级共享缓存）
+        """
+        return {
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            "use_cache": self.use_cache,
+        }
+
+    def _model_dir(self, name: str) -> Path:
+        """本地 PyTorch 模型目录"""
+        return self.project_root / self.MODEL_PATHS[name]
+
+    def _export_dir(self, name: str) -> Path:
+        """导出的 ONNX 模型目录（<项目根目录>/cache/onnx/<模型目录名>）"""
+        return self.project_root / "cache" / "onnx" / self._model_dir(name).name
+
+    def _ensure_exported(self, name: str) -> Path:
+        """
+        确保模型已导出为 ONNX
+
+        导出到单独的缓存目录，而不是写入下载的模型目录：模型目录中多出的 model.onnx
+        会使模型清单校验失败。funasr-onnx 加载时需要的配置文件（config.yaml、am.mvn、
+        tokens 等）一并复制到导出目录。导出先写入临时目录再整体改名，中断的导出不会被复用。
+
+        Args:
+            name: 模型类别（vad / asr / punc）
+
+        Returns:
+            Path: 导出目录
+        """
+        model_dir = self._model_dir(name)
+        export_dir = self._export_dir(name)
+        onnx_file = export_dir / "model.onnx"
+        if onnx_file.exists():
+            logging.info(f"复用已导出的 ONNX 模型: {onnx_file}")
+            return export_dir
+        if not model_dir.exists():
+            raise FileNotFoundError(f"ONNX 导出需要本地模型目录: {model_dir}")
+
+        logging.info(f"正在将 {model_dir.name} 导出为 ONNX: {export_dir}")
+        tmp_dir = export_dir.with_name(export_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for item in model_dir.iterdir():
+            if item.is_file() and item.suffix != ".pt":
+                shutil.copy2(item, tmp_dir / item.name)
+
+        from funasr import AutoModel
+        AutoModel(model=str(model_dir), device="cpu", disable_update=True).export(
+            type="onnx", quantize=False, output_dir=str(tmp_dir)
+        )
+        if not (tmp_dir / "model.onnx").exists():
+            raise FileNotFoundError(f"ONNX 导出失败，未找到: {tmp_dir / 'model.onnx'}")
+        os.replace(tmp_dir, export_dir)
+        logging.info(f"ONNX 模型导出完成: {onnx_file}")
+        return export_dir
+
+    def _session_options(self) -> "ort.SessionOptions":
+        """按线程配置构建 onnxruntime 会话参数"""
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        options.execution_mode = (
+            ort.ExecutionMode.ORT_PARALLEL if self.inter_op_threads > 1
+            else ort.ExecutionMode.ORT_SEQUENTIAL
+        )
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return options
+
+    def _load(self, name: str, model_cls, **kwargs):
+        """导出（如需要）并加载 ONNX 模型，替换为调优后的推理会话"""
+        model_dir = self._ensure_exported(name)
+        model = model_cls(str(model_dir), intra_op_num_threads=self.intra_op_threads, **kwargs)
+        # funasr-onnx 只暴露 intra-op 线程数，这里用完整的会话参数重建推理会话
+        if hasattr(model, "ort_infer"):
+            model.ort_infer.session = ort.InferenceSession(
+                str(model_dir / "model.onnx"),
+                sess_options=self._session_options(),
+                providers=["CPUExecutionProvider"],
+            )
+        logging.info(f"ONNX 模型加载完成: {model_dir.name}"
+                     f"（intra={self.intra_op_threads}, inter={self.inter_op_threads}）")
+        return model
+
+    @property
+    def vad_model(self):
+        """FSMN-VAD ONNX 模型"""
+        if self._vad_model is None:
+            self._vad_model = self._load("vad", Fsmn_vad)
+        return self._vad_model
+
+    @property
+    def asr_model(self):
+        """Paraformer ONNX 模型（首次访问时同时加载 VAD 与标点模型）"""
+        if self._asr_model is None:
+            self._asr_model = self._load("asr", Paraformer, batch_size=self.BATCH_MAX_SEGMENTS)
+            _ = self.vad_model
+            _ = self.punc_model
+        return self._asr_model
+
+    @property
+    def punc_model(self):
+        """CT-Transformer 标点 ONNX 模型"""
+        if self._punc_model is None:
+            self._punc_model = self._load("punc", CT_Transformer)
+        return self._punc_model
+
+    def load(self):
+        """预加载 VAD / ASR / 标点 ONNX 模型"""
+        _ = self.asr_model
+
+    def _recognize(self, audios: List[np.ndarray]) -> List[str]:
+        """批量识别 VAD 片段并恢复标点，返回与输入一一对应的文本"""
+        texts = []
+        for res in self.asr_model(audios):
+            preds = res.get("preds", "")
+            text = preds[0] if isinstance(preds, (list, tuple)) else preds
+            text = (text or "").replace(" ", "")
+            texts.append(self.punc_model(text)[0] if text else "")
+        return texts
+
+    def split_sentences(self, text: str, start_ms: float, end_ms: float) -> List[Dict]:
+        """
+        按标点把片段文本切为子句，并按字符位置线性插值每个子句的时间戳
+
+        导出的 Paraformer 图不输出字级时间戳，子句时间只是按字符数在片段内均分的近似值。
+
+        Args:
+            text: 带标点的片段文本
+            start_ms: 片段开始时间（毫秒）
+            end_ms: 片段结束时间（毫秒）
+
+        Returns:
+            List[Dict]: [{"text", "start", "end"}, ...]，时间单位为毫秒
+        """
+        pattern = f"[^{re.escape(self.SENTENCE_PUNCTUATION)}]+[{re.escape(self.SENTENCE_PUNCTUATION)}]*"
+        pieces = [p for p in re.findall(pattern, text) if p.strip()]
+        if not pieces:
+            return []
+
+        total = sum(len(p) for p in pieces)
+        sentences = []
+        offset = 0
+        for piece in pieces:
+            st = start_ms + (end_ms - start_ms) * offset / total
+            offset += len(piece)
+            ed = start_ms + (end_ms - start_ms) * offset / total
+            sentences.append({"text": piece, "start": st, "end": ed})
+        return sentences
+
+    def transcribe(self, audio: np.ndarray) -> List[Dict]:
+        """
+        VAD 分段 -> 按时长分桶批量识别 -> 标点恢复，返回标准化句子列表
+
+        句子时间由片段边界线性插值得到，spk_id 固定为 SPEAKER_ID（见模块说明）。
+
+        Args:
+            audio: 16kHz float32 音频
+
+        Returns:
+            List[Dict]: 与 Paraformer V2 normalize_result 格式一致的句子列表
+        """
+        _ = self.asr_model
+        segments = self.vad_model(audio)
+        segments = segments[0] if segments else []
+        logging.info(f"VAD 检测到 {len(segments)} 个语音片段")
+
+        texts = {}
+        batches = bucket_segments(segments, self.BATCH_MAX_S)
+        for batch_no, batch in enumerate(batches, 1):
+            audios = [
+                audio[int(segments[i][0] * SAMPLE_RATE / 1000):int(segments[i][1] * SAMPLE_RATE / 1000)]
+                for i in batch
+            ]
+            texts.update(recognize_batch_with_fallback(batch, audios, self._recognize, batch_no))
+        logging.info(f"识别完成: {len(segments)} 个片段，{len(batches)} 个批次")
+
+        results = []
+        for i, (start_ms, end_ms) in enumerate(segments):
+            for sentence in self.split_sentences(texts.get(i) or "", start_ms, end_ms):
+                results.append({
+                    "index": len(results) + 1,
+                    "spk_id": self.SPEAKER_ID,
+                    "sentence": sentence["text"].strip(),
+                    "start_time": round(sentence["start"] / 1000, 3),
+                    "end_time": round(sentence["end"] / 1000, 3),
+                })
+
+        logging.info(f"规范化完成，共 {len(results)} 个句子")
+        return results
+
+    def cache_signature(self, streaming: bool = False) -> Dict:
+        """影响识别结果的模型及参数，作为结果缓存键的一部分"""
+        return {
+            "engine": type(self).__name__,
+            "models": {
+                config["model_id"]: config["revision"]
+                for config in ModelScopeManager.REQUIRED_MODELS.values()
+            },
+        }
+
+    def devour_video(self, video_path: str, streaming: bool = False, task_dir: Optional[str] = None) -> Dict:
+        """
+        核心处理方法 - 对视频进行语音识别
+
+        Args:
+            video_path: 视频文件路径
+            streaming: 为与 Paraformer V2 接口兼容而保留，ONNX 引擎按 VAD 片段逐段处理
+            task_dir: 任务目录，指定时音频提取到其中并供后续阶段复用
+
+        Returns:
+            Dict: 与 VideoDevourASRParaformerV2.devour_video 相同结构的结果
+        """
+        logging.info(f"开始处理视频（ONNX）: {video_path}")
+
+        try:
+            ingest = AudioIngest(video_path, task_dir)
+
+            cache_key = None
+            cached = None
+            if self.result_cache is not None:
+                cache_key = self.result_cache.make_key(ingest.load(), self.cache_signature())
+                cached = self.result_cache.get(cache_key)
+
+            if cached is not None:
+                transcript = cached["transcript"]
+            else:
+                transcript = self.transcribe(ingest.load_float32())
+                if cache_key is not None:
+                    self.result_cache.put(cache_key, {"transcript": transcript})
+
+            return build_result(transcript, video_path)
+
+        except Exception as e:
+            logging.error(f"ASR 处理失败: {str(e)}")
+            raise
+
+    def process_videos(self, video_dir: str, workers: int = 1,
+                       threads_per_worker: Optional[int] = None,
+                       output_file: Optional[str] = None) -> List[Dict]:
+        """
+        批量处理视频目录，参数同 VideoDevourASRParaformerV2.process_videos
+        """
+        video_files = find_video_files(video_dir)
+        return run_batch(self, video_files, workers=workers,
+                         threads_per_worker=threads_per_worker, output_file=output_file)
+
+    def to_serializable(self, result: Dict) -> Dict:
+        """ONNX 引擎的结果本身即可序列化，原样返回"""
+        return result
+
+    def normalize(self, result: Dict) -> Dict:
+        """ONNX 引擎的输出即为统一转录格式，原样返回"""
+        return result
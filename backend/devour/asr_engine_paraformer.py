@@ -1,26 +1,52 @@
 import torch
 from pyannote.audio import Pipeline
-from moviepy import VideoFileClip
-import tempfile
 import logging
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List
+import numpy as np
 import yaml
 import json
 from datetime import datetime
 from funasr import AutoModel
 from funasr.utils.postprocess_utils import rich_transcription_postprocess
-import soundfile as sf  # 用于读取和裁剪音频文件
 import sys
 
 # 添加算法模块路径
 sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
 from modelscope_manager import ModelScopeManager
+from audio_ingest import AudioIngest, to_float32
+from batch_runner import find_video_files, run_batch
+from asr_sharding import diarize_in_windows
+from segment_batching import bucket_segments, recognize_batch_with_fallback, stream_vad
+from transcript_schema import build_result, segments_to_transcript
+from thread_budget import SharedThreadBudget
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 同一进程中所有 SenseVoice 引擎共享的 torch 线程数预算
+_TORCH_THREAD_BUDGET = SharedThreadBudget(torch.get_num_threads, torch.set_num_threads)
+
 class VideoDevourASRFunasr:
+    # 引擎元信息（见 asr_engine.py 中的引擎注册表）
+    ENGINE_NAME = "sensevoice"
+    LOAD_COST_S = 15.0           # 冷启动加载全部模型的大致耗时（秒）
+    EXPECTED_RTF = 0.03          # CPU 上的典型实时率
+    QUALITY = 2                  # 识别质量等级：1 草稿 / 2 标准 / 3 高
+    SUPPORTS_STREAMING = False
+    
+    # 流式 VAD 每次送入的音频时长（毫秒）
+    VAD_BLOCK_MS = 10000
+    
+    @classmethod
+    def missing_prerequisites(cls) -> List[str]:
+        """构造引擎前必须存在但当前缺失的文件（见 asr_engine.available_engines）"""
+        config_file = Path(__file__).parent.parent.parent / 'config.yaml'
+        return [] if config_file.exists() else [str(config_file)]
+
     def __init__(self):
         config_file = Path(__file__).parent.parent.parent / 'config.yaml'
         if not config_file.exists():
@@ -34,6 +60,21 @@ class VideoDevourASRFunasr:
         self._diarization_pipeline = None 
         self._asr_model = None
         self._vad_model = None  # VAD 模型单独加载
+        self._spk_model = None  # 跨窗口统一说话人用的 CAM++ 向量模型
+        
+        # 批量识别时每个批次的总时长上限（秒）
+        self.segment_batch_s = float(self.config.get('SEGMENT_BATCH_SIZE_S', 60))
+        
+        # 说话人分离每个窗口的时长（秒），每次只把一个窗口转换为 float32
+        self.diarization_window_s = float(self.config.get('DIARIZATION_WINDOW_S', 600))
+        
+        # 识别与说话人分离并发执行时的 torch 线程预算
+        # torch 的 intra-op 线程池（OpenMP / MKL）是进程级的，两者无法各用一份预算，
+        # 并发阶段统一使用两者之和（不超过 CPU 核数）
+        cpu_count = os.cpu_count() or 1
+        self.diarization_threads = int(self.config.get('DIARIZATION_THREADS', max(1, cpu_count // 4)))
+        self.asr_threads = int(self.config.get('ASR_THREADS', max(1, cpu_count - self.diarization_threads)))
+        self.torch_threads = max(1, min(cpu_count, self.asr_threads + self.diarization_threads))
         
         # 获取项目根目录
         self.project_root = Path(__file__).resolve().parent.parent.parent
@@ -143,17 +184,61 @@ class VideoDevourASRFunasr:
                 self._diarization_pipeline = None
                 
         return self._diarization_pipeline
+    
+    @property
+    def spk_model(self):
+        """CAM++ 说话人向量模型（说话人分离跨多个窗口时用于统一说话人）"""
+        if self._spk_model is None:
+            logging.info("正在加载说话人向量模型...")
+            try:
+                self._spk_model = AutoModel(
+                    model="cam++",
+                    device=self.device,
+                    disable_update=True,
+                )
+                logging.info(f"说话人向量模型加载完成（设备: {self.device}）")
+            except Exception as e:
+                logging.error(f"说话人向量模型加载失败: {str(e)}")
+                raise
+        return self._spk_model
+        
+    def load(self):
+        """预加载 VAD 和 SenseVoice 模型"""
+        _ = self.vad_model
+        _ = self.asr_model
         
-    def extract_audio(self, video_path: str) -> str:
-        """提取视频音频到临时wav文件"""
-        logging.info(f"正在提取音频: {video_path}")
+    def extract_audio(self, video_path: str, task_dir: str = None):
+        """
+        提取视频音频为 16kHz 单声道 float32 数组
+        
+        Args:
+            video_path: 视频文件路径
+            task_dir: 任务目录，指定时复用其中已提取的音频
+            
+        Returns:
+            tuple: (音频数据, 采样率)
+        """
         try:
-            with VideoFileClip(video_path) as video:
-                audio = video.audio
-                temp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                audio.write_audiofile(temp_wav.name, codec="pcm_s16le", fps=16000)
-                logging.info(f"音频提取完成: {temp_wav.name}")
-                return temp_wav.name
+            ingest = AudioIngest(video_path, task_dir)
+            return ingest.load_float32(), ingest.sample_rate
+        except Exception as e:
+            logging.error(f"音频提取失败: {str(e)}")
+            raise
+    
+    def open_audio(self, video_path: str, task_dir: str):
+        """
+        以内存映射方式打开任务目录中的 int16 音频（必要时先提取）
+        
+        Args:
+            video_path: 视频文件路径
+            task_dir: 任务目录
+            
+        Returns:
+            tuple: (int16 内存映射数组, 采样率)
+        """
+        try:
+            ingest = AudioIngest(video_path, task_dir)
+            return ingest.load(), ingest.sample_rate
         except Exception as e:
             logging.error(f"音频提取失败: {str(e)}")
             raise
@@ -162,233 +247,293 @@ class VideoDevourASRFunasr:
         """
         裁剪音频片段
         
+        audio_data 为 int16 内存映射数组时只读取并转换该片段，
+        内存占用与片段长度有关，与整段录音长度无关。
+        
         Args:
-            audio_data: 音频数据数组
+            audio_data: 音频数据数组（int16 或 float32）
             start_time: 开始时间（毫秒）
             end_time: 结束时间（毫秒）
             sample_rate: 采样率
             
         Returns:
-            裁剪后的音频数据
+            裁剪后的 float32 音频数据
         """
         start_sample = int(start_time * sample_rate / 1000)  # 转换为样本数
         end_sample = int(end_time * sample_rate / 1000)  # 转换为样本数
-        return audio_data[start_sample:end_sample]
-
-    def devour_video(self, video_path: str) -> dict:
-        """核心吞噬方法 - 使用两阶段识别（VAD分段 + SenseVoice识别）"""
-        logging.info(f"开始处理视频: {video_path}")
+        segment = audio_data[start_sample:end_sample]
+        return to_float32(segment) if segment.dtype == np.int16 else segment
+    
+    def _recognize_batch(self, audios):
+        """
+        对一批内存中的音频片段调用 SenseVoice
         
-        try:
-            # 音频提取
-            wav_path = self.extract_audio(video_path)
-            
-            # 第一阶段：使用 VAD 模型进行音频分段
-            logging.info("第一阶段：使用 VAD 模型进行音频分段...")
-            vad_res = self.vad_model.generate(
-                input=wav_path,
-                cache={},
-                max_single_segment_time=30000,  # 最大单个片段时长（毫秒）
-            )
+        Args:
+            audios: 音频数组列表
             
-            # 从 VAD 模型的输出中提取每个语音片段的开始和结束时间
-            if not vad_res or len(vad_res) == 0:
-                logging.error("VAD 模型未返回有效结果")
-                raise ValueError("VAD 分段失败")
+        Returns:
+            list: 与输入一一对应的识别文本（识别失败为 None）
+        """
+        res = self.asr_model.generate(
+            input=audios,
+            cache={},
+            language="auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
+            use_itn=True,  # 使用逆文本规范化
+            batch_size=len(audios),
+        )
+        texts = []
+        for item in res or []:
+            texts.append(rich_transcription_postprocess(item["text"]) if "text" in item else None)
+        if len(texts) != len(audios):
+            raise ValueError(f"批量识别结果数量不匹配: {len(texts)} != {len(audios)}")
+        return texts
+    
+    def _recognize_segments(self, audio_data, segments_vad, sample_rate):
+        """
+        批量识别所有 VAD 片段
+        
+        片段以内存数组形式传给模型，按时长分桶组批，
+        识别完成后按原始顺序还原片段与时间戳的对应关系。
+        
+        Args:
+            audio_data: 整段音频数据
+            segments_vad: VAD 片段列表 [[start_ms, end_ms], ...]
+            sample_rate: 采样率
             
-            segments_vad = vad_res[0].get('value', [])
-            logging.info(f"VAD 检测到 {len(segments_vad)} 个语音片段")
+        Returns:
+            list[dict]: 识别结果 [{"id", "start", "end", "text"}, ...]
+        """
+        texts = {}
+        batches = bucket_segments(segments_vad, self.segment_batch_s)
+        logging.info(f"共 {len(segments_vad)} 个片段，分为 {len(batches)} 个批次（每批上限 {self.segment_batch_s}s）")
+        
+        for batch_no, batch in enumerate(batches, 1):
+            audios = [
+                self.crop_audio(audio_data, segments_vad[i][0], segments_vad[i][1], sample_rate)
+                for i in batch
+            ]
+            # 批量失败时退化为逐条识别，只跳过真正失败的片段
+            texts.update(recognize_batch_with_fallback(batch, audios, self._recognize_batch, batch_no))
+            logging.info(f"  批次 {batch_no}/{len(batches)}: {len(batch)} 个片段")
+        
+        segments = []
+        for i, (start_time, end_time) in enumerate(segments_vad):
+            text = texts.get(i)
+            if text is None:
+                logging.warning(f"  片段 {i+1} 识别结果为空")
+                continue
+            # 添加时间戳（转换为秒）
+            segments.append({
+                "id": i,
+                "start": start_time / 1000.0,  # 毫秒转秒
+                "end": end_time / 1000.0,      # 毫秒转秒
+                "text": text.strip()
+            })
+        return segments
+
+    def _vad_and_recognize(self, audio_data, sample_rate):
+        """
+        VAD 分段后批量识别
+        
+        Args:
+            audio_data: 整段 int16 音频（内存映射数组）
+            sample_rate: 采样率
             
-            # 加载原始音频数据
-            audio_data, sample_rate = sf.read(wav_path)
-            logging.info(f"音频采样率: {sample_rate} Hz")
+        Returns:
+            list[dict]: 识别结果 [{"id", "start", "end", "text"}, ...]
+        """
+        # 第一阶段：使用 VAD 模型进行音频分段
+        logging.info("第一阶段：使用 VAD 模型进行流式音频分段...")
+        segments_vad = stream_vad(self.vad_model.generate, audio_data, sample_rate, self.VAD_BLOCK_MS)
+        logging.info(f"VAD 检测到 {len(segments_vad)} 个语音片段")
+        
+        logging.info(f"音频采样率: {sample_rate} Hz")
+        
+        # 第二阶段：按时长分桶批量识别 VAD 片段
+        logging.info("第二阶段：使用 SenseVoice 对片段进行批量识别...")
+        return self._recognize_segments(audio_data, segments_vad, sample_rate)
+    
+    def _torch_thread_budget(self, num_threads):
+        """
+        在上下文内让 torch 线程数至少为 num_threads，退出时恢复原值
+        
+        torch.set_num_threads 设置的是进程级的 intra-op 线程池，对所有线程同时生效，
+        因此只能为并发执行的识别和说话人分离设置一个共同的预算；引擎池中多个引擎并发时
+        经由进程级的 _TORCH_THREAD_BUDGET 协调，由最后一个退出的调用恢复原值。
+        """
+        return _TORCH_THREAD_BUDGET.use(num_threads)
+    
+    def _run_diarization(self, audio_data, sample_rate):
+        """
+        说话人识别（可选）
+        
+        按 diarization_window_s 分窗口送入模型，每次只把一个窗口转换为 float32，
+        多个窗口的说话人通过 CAM++ 向量统一（见 asr_sharding.diarize_in_windows）。
+        
+        Args:
+            audio_data: 整段 int16 音频（内存映射数组）
+            sample_rate: 采样率
             
-            # 第二阶段：对每个 VAD 片段使用 SenseVoice 进行识别
-            logging.info("第二阶段：使用 SenseVoice 对每个片段进行识别...")
-            segments = []
-            temp_audio_file = None
+        Returns:
+            说话人分段结果，模型不可用或识别失败时为 None
+        """
+        if self.diarization_pipeline is None:
+            logging.info("跳过说话人识别（模型未加载）")
+            return None
+        
+        logging.info("开始说话人识别...")
+        try:
+            spk_segment = diarize_in_windows(
+                audio_data, sample_rate, self.diarization_window_s,
+                diarize=self._diarize_window,
+                embed=self._speaker_embedding,
+            )
+            if spk_segment:
+                logging.info("说话人识别完成")
+                return {"spk_segment": spk_segment}
+            logging.info("说话人识别完成 - 未检测到说话人")
+            return None
+        except Exception as e:
+            logging.warning(f"说话人识别失败: {str(e)}")
+            logging.warning("继续处理，跳过说话人识别")
+            return None
+    
+    def _diarize_window(self, audio):
+        """对一个 float32 窗口做说话人分离，返回窗口内时间的 spk_segment"""
+        diarization_result = self.diarization_pipeline.generate(input=audio, batch_size_s=60, batch_size_threshold_s=60)
+        if diarization_result and "spk_segment" in diarization_result[0]:
+            return diarization_result[0]["spk_segment"]
+        return []
+    
+    def _speaker_embedding(self, audio):
+        """一段 float32 语音的 CAM++ 说话人向量"""
+        res = self.spk_model.generate(input=audio)
+        return np.asarray(res[0]["spk_embedding"].cpu()).reshape(-1).tolist()
+    
+    def devour_video(self, video_path: str, task_dir: str = None) -> dict:
+        """核心吞噬方法 - 使用两阶段识别（VAD分段 + SenseVoice识别）"""
+        logging.info(f"开始处理视频: {video_path}")
+        
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                return self._devour(video_path, task_dir or tmp_dir)
+        except Exception as e:
+            logging.error(f"ASR处理失败: {str(e)}")
+            raise
+    
+    def _devour(self, video_path: str, task_dir: str) -> dict:
+        """devour_video 的主体，音频以内存映射方式读取自 task_dir"""
+        # 音频提取（VAD、识别和说话人分离共用同一份内存映射音频）
+        audio_data, sample_rate = self.open_audio(video_path, task_dir)
+        
+        # 说话人分离只依赖整段音频，与 VAD + 识别并发执行，共用一个 torch 线程预算
+        with self._torch_thread_budget(self.torch_threads), \
+                ThreadPoolExecutor(max_workers=2, thread_name_prefix="devour") as executor:
+            diarization_future = executor.submit(self._run_diarization, audio_data, sample_rate)
+            recognition_future = executor.submit(self._vad_and_recognize, audio_data, sample_rate)
+            logging.info(f"识别与说话人分离并发执行（torch 线程预算: {self.torch_threads}）")
             
-            for i, segment in enumerate(segments_vad):
-                start_time, end_time = segment  # 获取开始和结束时间（毫秒）
-                
-                # 裁剪音频
-                cropped_audio = self.crop_audio(audio_data, start_time, end_time, sample_rate)
-                
-                # 将裁剪后的音频保存为临时文件
-                temp_audio_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False).name
-                sf.write(temp_audio_file, cropped_audio, sample_rate)
-                
+            # 等待两个阶段完成后汇合
+            segments = recognition_future.result()
+            diarization = diarization_future.result()
+        
+        # 检测语言（从第一个有效结果中获取）
+        language = "auto"
+        if segments:
+            logging.info(f"转写完成，共识别 {len(segments)} 个有效片段")
+        else:
+            logging.warning("未识别到任何有效片段")
+        
+        return {
+            "transcript": segments,
+            "speakers": diarization,
+            "language": language,
+            "video_path": video_path,
+            "processed_at": datetime.now().isoformat()
+        }
+
+    def process_videos(self, video_dir: str, workers: int = 1, threads_per_worker: int = None,
+                       output_file: str = None) -> list:
+        """
+        批量处理视频目录
+        
+        Args:
+            video_dir: 视频目录路径
+            workers: 工作进程数，大于 1 时每个进程各自加载一次模型并行处理
+            threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+            output_file: 输出 JSON 路径；指定时结果增量写入文件，返回值只包含摘要
+        """
+        video_files = find_video_files(video_dir)
+        return run_batch(self, video_files, workers=workers,
+                         threads_per_worker=threads_per_worker, output_file=output_file)
+        
+    def to_serializable(self, result: dict) -> dict:
+        """将单个处理结果转换为可 JSON 序列化的格式，并补充文本统计"""
+        # 转换speakers对象为可序列化格式（已转换过的列表保持不变）
+        if 'speakers' in result and result['speakers'] is not None and not isinstance(result['speakers'], list):
+            # 处理新的Paraformer模型的说话人识别结果
+            if isinstance(result['speakers'], dict) and 'spk_segment' in result['speakers']:
+                speakers_data = []
                 try:
-                    # 使用 SenseVoice 进行语音识别
-                    res = self.asr_model.generate(
-                        input=temp_audio_file,
-                        cache={},
-                        language="auto",  # "zh", "en", "yue", "ja", "ko", "nospeech"
-                        use_itn=True,  # 使用逆文本规范化
-                        batch_size_s=60,
-                    )
-                    
-                    # 处理识别结果
-                    if isinstance(res, list) and len(res) > 0 and "text" in res[0]:
-                        text = rich_transcription_postprocess(res[0]["text"])
-                        print(res)
-                        # 添加时间戳（转换为秒）
-                        segments.append({
-                            "id": i,
-                            "start": start_time / 1000.0,  # 毫秒转秒
-                            "end": end_time / 1000.0,      # 毫秒转秒
-                            "text": text.strip()
+                    # 处理说话人分段信息
+                    for segment in result['speakers']['spk_segment']:
+                        speakers_data.append({
+                            "speaker": segment.get('spk', 'UNKNOWN'),
+                            "start": float(segment.get('start', 0)),
+                            "end": float(segment.get('end', 0)),
+                            "duration": float(segment.get('end', 0) - segment.get('start', 0))
                         })
-                        
-                        logging.info(f"  片段 {i+1}/{len(segments_vad)}: {start_time/1000:.1f}s - {end_time/1000:.1f}s, 文本长度: {len(text)}")
-                    else:
-                        logging.warning(f"  片段 {i+1} 识别结果为空")
-                        
+                    result['speakers'] = speakers_data
                 except Exception as e:
-                    logging.warning(f"  片段 {i+1} 识别失败: {str(e)}")
-                    continue
-                finally:
-                    # 清理临时文件
-                    if temp_audio_file and os.path.exists(temp_audio_file):
-                        try:
-                            os.unlink(temp_audio_file)
-                        except:
-                            pass
-            
-            # 检测语言（从第一个有效结果中获取）
-            language = "auto"
-            if segments:
-                logging.info(f"转写完成，共识别 {len(segments)} 个有效片段")
-            else:
-                logging.warning("未识别到任何有效片段")
-            
-            # 说话人识别（可选）
-            diarization = None
-            if self.diarization_pipeline is not None:
-                logging.info("开始说话人识别...")
+                    logging.warning(f"说话人数据转换失败: {str(e)}")
+                    result['speakers'] = str(result['speakers'])
+            # 保持对旧格式的兼容性
+            elif hasattr(result['speakers'], 'itertracks'):
+                # 提取说话人时间轴信息为结构化数据
+                speakers_data = []
                 try:
-                    # 使用新的Paraformer模型进行说话人识别
-                    diarization_result = self.diarization_pipeline.generate(input=wav_path, batch_size_s=60, batch_size_threshold_s=60)
-                    
-                    # 处理识别结果
-                    if diarization_result and len(diarization_result) > 0:
-                        diarization = diarization_result[0] if "spk_segment" in diarization_result[0] else None
-                        if diarization:
-                            logging.info("说话人识别完成")
-                        else:
-                            logging.info("说话人识别完成 - 未检测到说话人")
-                    else:
-                        logging.info("说话人识别完成 - 未检测到说话人")
-                        
+                    for turn, _, speaker in result['speakers'].itertracks(yield_label=True):
+                        speakers_data.append({
+                            "speaker": speaker,
+                            "start": float(turn.start),
+                            "end": float(turn.end),
+                            "duration": float(turn.end - turn.start)
+                        })
+                    result['speakers'] = speakers_data
                 except Exception as e:
-                    logging.warning(f"说话人识别失败: {str(e)}")
-                    logging.warning("继续处理，跳过说话人识别")
+                    logging.warning(f"说话人数据转换失败: {str(e)}")
+                    result['speakers'] = str(result['speakers'])
             else:
-                logging.info("跳过说话人识别（模型未加载）")
-            
-            # 清理临时文件
-            try:
-                os.unlink(wav_path)
-            except:
-                pass
-                
-            return {
-                "transcript": segments,
-                "speakers": diarization,
-                "language": language,
-                "video_path": video_path,
-                "processed_at": datetime.now().isoformat()
-            }
-            
-        except Exception as e:
-            logging.error(f"ASR处理失败: {str(e)}")
-            # 尝试清理临时文件
-            try:
-                if 'wav_path' in locals():
-                    os.unlink(wav_path)
-            except:
-                pass
-            raise
+                # 如果是其他格式，直接转换为字符串
+                result['speakers'] = str(result['speakers'])
 
-    def process_videos(self, video_dir: str) -> list:
-        """批量处理视频目录"""
-        video_dir = Path(video_dir)
-        if not video_dir.exists():
-            raise FileNotFoundError(f"视频目录不存在: {video_dir}")
-            
-        # 查找视频文件
-        video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-        video_files = []
-        for ext in video_extensions:
-            video_files.extend(video_dir.glob(f"*{ext}"))
-            
-        if not video_files:
-            raise FileNotFoundError(f"未找到视频文件: {video_dir}")
-            
-        logging.info(f"找到 {len(video_files)} 个视频文件")
+        # 统计转录文本质量指标
+        if 'transcript' in result and result['transcript']:
+            total_text = " ".join([segment.get('text', '') for segment in result['transcript']])
+            result['text_stats'] = {
+                "total_segments": len(result['transcript']),
+                "total_words": len(total_text.split()),
+                "total_chars": len(total_text),
+                "avg_segment_duration": sum([seg.get('end', 0) - seg.get('start', 0) for seg in result['transcript']]) / len(result['transcript']) if result['transcript'] else 0
+            }
+        return result
         
-        results = []
-        for video_file in video_files:
-            try:
-                result = self.devour_video(str(video_file))
-                results.append(result)
-                logging.info(f"✅ 完成: {video_file.name}")
-            except Exception as e:
-                logging.error(f"❌ 失败: {video_file.name} - {str(e)}")
-                continue
-                
-        return results
+    def normalize(self, result: dict) -> dict:
+        """
+        转换为统一转录格式（见 transcript_schema.py）
+        
+        每个片段按时间重叠最多的说话人分配 spk_id
+        """
+        result = self.to_serializable(result)
+        speakers = result.get('speakers') if isinstance(result.get('speakers'), list) else None
+        transcript = segments_to_transcript(result.get('transcript', []), speakers)
+        return build_result(transcript, result['video_path'],
+                            processed_at=result.get('processed_at'), language=result.get('language'))
         
     def save_results(self, results: list, output_file: str):
         """保存处理结果到JSON文件"""
-        # 转换speakers对象为可序列化格式
         for result in results:
-            if 'speakers' in result and result['speakers'] is not None:
-                # 处理新的Paraformer模型的说话人识别结果
-                if isinstance(result['speakers'], dict) and 'spk_segment' in result['speakers']:
-                    speakers_data = []
-                    try:
-                        # 处理说话人分段信息
-                        for segment in result['speakers']['spk_segment']:
-                            speakers_data.append({
-                                "speaker": segment.get('spk', 'UNKNOWN'),
-                                "start": float(segment.get('start', 0)),
-                                "end": float(segment.get('end', 0)),
-                                "duration": float(segment.get('end', 0) - segment.get('start', 0))
-                            })
-                        result['speakers'] = speakers_data
-                    except Exception as e:
-                        logging.warning(f"说话人数据转换失败: {str(e)}")
-                        result['speakers'] = str(result['speakers'])
-                # 保持对旧格式的兼容性
-                elif hasattr(result['speakers'], 'itertracks'):
-                    # 提取说话人时间轴信息为结构化数据
-                    speakers_data = []
-                    try:
-                        for turn, _, speaker in result['speakers'].itertracks(yield_label=True):
-                            speakers_data.append({
-                                "speaker": speaker,
-                                "start": float(turn.start),
-                                "end": float(turn.end),
-                                "duration": float(turn.end - turn.start)
-                            })
-                        result['speakers'] = speakers_data
-                    except Exception as e:
-                        logging.warning(f"说话人数据转换失败: {str(e)}")
-                        result['speakers'] = str(result['speakers'])
-                else:
-                    # 如果是其他格式，直接转换为字符串
-                    result['speakers'] = str(result['speakers'])
-            
-            # 统计转录文本质量指标
-            if 'transcript' in result and result['transcript']:
-                total_text = " ".join([segment.get('text', '') for segment in result['transcript']])
-                result['text_stats'] = {
-                    "total_segments": len(result['transcript']),
-                    "total_words": len(total_text.split()),
-                    "total_chars": len(total_text),
-                    "avg_segment_duration": sum([seg.get('end', 0) - seg.get('start', 0) for seg in result['transcript']]) / len(result['transcript']) if result['transcript'] else 0
-                }
+            self.to_serializable(result)
                 
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
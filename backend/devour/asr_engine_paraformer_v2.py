@@ -9,14 +9,26 @@ import logging
 import os
 from pathlib import Path
 import json
-from datetime import datetime
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import numpy as np
 from funasr import AutoModel
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 import sys
 
 # 添加算法模块路径
 sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
 from modelscope_manager import ModelScopeManager
+from audio_ingest import AudioIngest, AUDIO_FILENAME, SAMPLE_RATE, to_float32
+from asr_cache import ASRResultCache, get_asr_result_cache
+from batch_runner import find_video_files, run_batch
+from asr_quantization import quantize_paraformer_pipeline
+from asr_autotune import load_host_profile
+from speech_compactor import compact_speech
+from asr_sharding import (SpeakerReconciler, create_shard_executor, merge_shard_transcripts, plan_shards,
+                          reconcile_speakers, run_shards)
+from transcript_schema import build_result
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -32,20 +44,85 @@ class VideoDevourASRParaformerV2:
     - 支持标点符号恢复
     - 支持说话人分离
     - 标准化输出格式
+    - 流式分窗识别（长录音内存占用恒定）
+    - 按音频内容和模型版本缓存识别结果
+    - 可选 int8 动态量化（纯 CPU 推理）
+    - 自动加载本机 batch_size_s / 线程数调优配置（见 calibrate_asr.py）
+    - 可选静音 / 非语音剔除预处理，时间戳自动换算回原视频时间
+    - 可选单视频分片多进程识别，按 CAM++ 说话人向量统一各分片的说话人 ID
     """
     
-    def __init__(self):
+    # 引擎元信息（见 asr_engine.py 中的引擎注册表）
+    ENGINE_NAME = "paraformer_v2"
+    LOAD_COST_S = 25.0           # 冷启动加载全部模型的大致耗时（秒）
+    EXPECTED_RTF = 0.06          # CPU 上的典型实时率
+    QUALITY = 3                  # 识别质量等级：1 草稿 / 2 标准 / 3 高
+    SUPPORTS_STREAMING = True
+    
+    # 流式识别参数
+    STREAM_WINDOW_S = 300        # 单个识别窗口的最大时长（秒）
+    STREAM_CUT_SEARCH_S = 30     # 在窗口末尾多长范围内寻找 VAD 静音切点（秒）
+    
+    # 未校准时的整段识别批大小（秒）
+    DEFAULT_BATCH_SIZE_S = 300
+    
+    # 静音剔除参数
+    TRIM_PAD_S = 0.2             # 语音片段两端保留的边距（秒）
+    TRIM_MIN_GAP_S = 1.0         # 短于该时长的停顿不剔除（秒）
+    
+    # 分片识别参数
+    MIN_SHARD_S = 600            # 单个分片的最短时长（秒），更短的录音不分片
+    SPK_EMBED_MAX_S = 30         # 计算每个说话人向量时最多使用的语音时长（秒）
+    SPK_MATCH_THRESHOLD = 0.5    # 跨分片判定为同一说话人的最低余弦相似度
+    
+    def __init__(self, use_cache: bool = True, result_cache: Optional[ASRResultCache] = None,
+                 quantize_int8: bool = False, batch_size_s: Optional[int] = None,
+                 num_threads: Optional[int] = None, trim_silence: bool = False,
+                 shard_workers: int = 1):
         """
         初始化 ASR 引擎
         
         加载配置文件并设置设备
+        
+        Args:
+            use_cache: 是否启用 ASR 结果缓存
+            result_cache: 自定义结果缓存，默认使用进程级共享缓存
+            quantize_int8: 是否对 Paraformer 编解码器和标点模型做 int8 动态量化（仅 CPU）
+            batch_size_s: 整段识别的批大小（秒），默认取本机调优配置
+            num_threads: torch 线程数，默认取本机调优配置
+            trim_silence: 识别前用 VAD 剔除长静音 / 纯音乐段落（整段识别和分片识别模式）
+            shard_workers: 单个长视频切分为多少个分片并行识别，1 表示不分片
         """        
         # 设置设备
         self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
         logging.info(f"使用设备: {self.device}")
         
+        # int8 动态量化只适用于 CPU 推理
+        self.quantize_int8 = quantize_int8 and self.device == "cpu"
+        if quantize_int8 and not self.quantize_int8:
+            logging.warning("int8 动态量化仅支持 CPU，当前设备将使用 fp32 推理")
+        
+        self.trim_silence = trim_silence
+        self.shard_workers = max(1, shard_workers)
+        
+        # 推理参数：显式参数优先，其次本机调优配置，最后默认值
+        profile = None
+        if batch_size_s is None or num_threads is None:
+            profile = load_host_profile(device=self.device)
+        profile = profile or {}
+        self.batch_size_s = batch_size_s or profile.get("batch_size_s", self.DEFAULT_BATCH_SIZE_S)
+        self.num_threads = num_threads or profile.get("num_threads")
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+            logging.info(f"torch 线程数: {self.num_threads}")
+        
         # 延迟加载模型
         self._asr_model = None
+        self._vad_model = None
+        self._spk_model = None
+        
+        # 分片工作进程池（首次分片识别时创建，之后复用）
+        self._shard_executor = None
         
         # 获取项目根目录
         self.project_root = Path(__file__).resolve().parent.parent.parent
@@ -55,6 +132,28 @@ class VideoDevourASRParaformerV2:
         
         # 自动检查和下载缺失的模型
         self._ensure_models_available()
+        
+        # ASR 结果缓存
+        if use_cache:
+            self.result_cache = result_cache or get_asr_result_cache()
+        else:
+            self.result_cache = None
+    
+    def engine_kwargs(self) -> Dict:
+        """
+        以相同配置重建引擎所需的构造参数（可序列化，供工作进程使用）
+        
+        Returns:
+            Dict: 构造参数（自定义 result_cache 不传递，工作进程使用进程级共享缓存）
+        """
+        return {
+            "use_cache": self.result_cache is not None,
+            "quantize_int8": self.quantize_int8,
+            "batch_size_s": self.batch_size_s,
+            "num_threads": self.num_threads,
+            "trim_silence": self.trim_silence,
+            "shard_workers": self.shard_workers,
+        }
     
     def _ensure_models_available(self):
         """
@@ -148,9 +247,68 @@ class VideoDevourASRParaformerV2:
             except Exception as e:
                 logging.error(f"Paraformer 模型加载失败: {str(e)}")
                 raise
+            
+            if self.quantize_int8:
+                quantize_paraformer_pipeline(
+                    self._asr_model, paraformer_model, punc_model,
+                    fallback_root=self.project_root / "models" / "quantized",
+                )
         
         return self._asr_model
     
+    @property
+    def vad_model(self) -> AutoModel:
+        """
+        单独加载 FSMN-VAD 模型，用于流式模式下寻找窗口切点
+        
+        Returns:
+            AutoModel: 已加载的 VAD 模型实例
+        """
+        if self._vad_model is None:
+            vad_path = self.project_root / "models/iic/speech_fsmn_vad_zh-cn-16k-common-pytorch"
+            vad_model = str(vad_path) if vad_path.exists() else "fsmn-vad"
+            logging.info(f"正在加载 VAD 模型: {vad_model}")
+            try:
+                self._vad_model = AutoModel(
+                    model=vad_model,
+                    model_revision="v2.0.4",
+                    device=self.device,
+                    disable_update=True,
+                )
+                logging.info(f"VAD 模型加载完成（设备: {self.device}）")
+            except Exception as e:
+                logging.error(f"VAD 模型加载失败: {str(e)}")
+                raise
+        return self._vad_model
+    
+    @property
+    def spk_model(self) -> AutoModel:
+        """
+        单独加载 CAM++ 说话人向量模型，用于分片识别时统一各分片的说话人
+        
+        Returns:
+            AutoModel: 已加载的说话人模型实例
+        """
+        if self._spk_model is None:
+            cam_path = self.project_root / "models/iic/speech_campplus_sv_zh-cn_16k-common"
+            spk_model = str(cam_path) if cam_path.exists() else "cam++"
+            logging.info(f"正在加载说话人向量模型: {spk_model}")
+            try:
+                self._spk_model = AutoModel(
+                    model=spk_model,
+                    device=self.device,
+                    disable_update=True,
+                )
+                logging.info(f"说话人向量模型加载完成（设备: {self.device}）")
+            except Exception as e:
+                logging.error(f"说话人向量模型加载失败: {str(e)}")
+                raise
+        return self._spk_model
+    
+    def load(self):
+        """预加载 Paraformer 模型（含 VAD / 标点 / 说话人分离）"""
+        _ = self.asr_model
+    
     def normalize_result(self, res: List[Dict]) -> List[Dict]:
         """
         将 FunASR 的推理结果规范化为标准格式
@@ -220,12 +378,308 @@ class VideoDevourASRParaformerV2:
         logging.info(f"规范化完成，共 {len(results)} 个句子")
         return results
     
-    def devour_video(self, video_path: str) -> Dict:
+    def _find_vad_cut(self, audio: np.ndarray) -> int:
+        """
+        在窗口末尾寻找 VAD 静音处作为切点，避免把一句话切成两半
+        
+        Args:
+            audio: 当前窗口的音频数据
+            
+        Returns:
+            int: 切点位置（样本数），找不到静音时返回窗口长度
+        """
+        search_len = min(len(audio), int(self.STREAM_CUT_SEARCH_S * SAMPLE_RATE))
+        search_start = len(audio) - search_len
+        res = self.vad_model.generate(input=audio[search_start:], cache={})
+        segments = res[0].get('value', []) if res else []
+        
+        # 末尾全是静音，直接在窗口末尾切
+        if not segments:
+            return len(audio)
+        
+        def to_sample(ms):
+            return search_start + int(ms * SAMPLE_RATE / 1000)
+        
+        # 最后一个语音片段之后还有静音
+        last_end = segments[-1][1]
+        if last_end != -1 and to_sample(last_end) < len(audio):
+            return (to_sample(last_end) + len(audio)) // 2
+        
+        # 取最后一段静音的中点
+        if len(segments) > 1:
+            gap_start, gap_end = segments[-2][1], segments[-1][0]
+            return (to_sample(gap_start) + to_sample(gap_end)) // 2
+        
+        logging.warning("窗口末尾未找到静音切点，将在窗口边界硬切")
+        return len(audio)
+    
+    def _recognize_window(self, audio: np.ndarray, offset_s: float, start_index: int,
+                          reconciler: Optional[SpeakerReconciler] = None) -> List[Dict]:
+        """
+        识别单个窗口并将时间戳、序号、说话人 ID 换算到整段音频
+        
+        Args:
+            audio: 窗口音频数据
+            offset_s: 窗口在整段音频中的起始时间（秒）
+            start_index: 窗口内第一句的全局序号
+            reconciler: 跨窗口统一说话人 ID，指定时窗口内聚类得到的说话人按 CAM++ 向量映射为全局 ID
+            
+        Returns:
+            List[Dict]: 与 normalize_result 格式一致的句子列表
+        """
+        res = self.asr_model.generate(input=audio, batch_size_s=self.STREAM_WINDOW_S)
+        if not res or not res[0].get("sentence_info"):
+            return []
+        
+        sentences = self.normalize_result(res)
+        if reconciler is not None:
+            # 向量按窗口内时间截取音频，需在换算时间戳之前计算
+            speaker_map = reconciler.add(self._speaker_embeddings(audio, sentences))
+            for sentence in sentences:
+                if sentence["spk_id"] is not None:
+                    sentence["spk_id"] = speaker_map.get(sentence["spk_id"], sentence["spk_id"])
+        for i, sentence in enumerate(sentences):
+            sentence["index"] = start_index + i
+            sentence["start_time"] = round(sentence["start_time"] + offset_s, 3)
+            sentence["end_time"] = round(sentence["end_time"] + offset_s, 3)
+        return sentences
+    
+    def devour_video_stream(self, video_path: str, window_s: Optional[float] = None,
+                            task_dir: Optional[str] = None,
+                            ingest: Optional[AudioIngest] = None) -> Iterator[Dict]:
+        """
+        流式识别 - 按 VAD 边界切分的有限窗口逐段解码
+        
+        每个窗口识别完成后立即产出句子，内存占用只与窗口长度有关，
+        与视频总时长无关。说话人在每个窗口内独立聚类，再按 CAM++ 说话人向量
+        与之前窗口的说话人比对（见 SpeakerReconciler），同一个人在各窗口中的 ID 一致。
+        
+        Args:
+            video_path: 视频文件路径
+            window_s: 窗口最大时长（秒），默认 STREAM_WINDOW_S
+            task_dir: 任务目录，指定时复用其中已提取的音频
+            ingest: 已创建的音频提取阶段，指定时忽略 task_dir
+            
+        Yields:
+            Dict: 与 normalize_result 格式一致的句子
+        """
+        window_s = window_s or self.STREAM_WINDOW_S
+        window_samples = int(window_s * SAMPLE_RATE)
+        block_s = min(window_s, self.STREAM_CUT_SEARCH_S)
+        logging.info(f"开始流式处理视频: {video_path}（窗口 {window_s}s）")
+        
+        buffer = np.zeros(0, dtype=np.float32)
+        offset_samples = 0
+        next_index = 1
+        reconciler = SpeakerReconciler(threshold=self.SPK_MATCH_THRESHOLD)
+        
+        ingest = ingest or AudioIngest(video_path, task_dir)
+        for block in ingest.iter_blocks(block_s):
+            buffer = np.concatenate([buffer, block])
+            if len(buffer) < window_samples:
+                continue
+            
+            cut = self._find_vad_cut(buffer[:window_samples]) or window_samples
+            sentences = self._recognize_window(
+                buffer[:cut], offset_samples / SAMPLE_RATE, next_index, reconciler
+            )
+            next_index += len(sentences)
+            yield from sentences
+            
+            buffer = buffer[cut:].copy()
+            offset_samples += cut
+        
+        if len(buffer) > 0:
+            sentences = self._recognize_window(buffer, offset_samples / SAMPLE_RATE, next_index, reconciler)
+            next_index += len(sentences)
+            yield from sentences
+        
+        logging.info(f"流式处理完成，共 {next_index - 1} 个句子")
+    
+    def _trim_silence(self, audio: np.ndarray):
+        """
+        用 FSMN-VAD 检测语音片段，只保留语音区间拼接为紧凑音频
+        
+        Args:
+            audio: 整段音频数据
+            
+        Returns:
+            Tuple[np.ndarray, OffsetMap]: (紧凑音频, 压缩时间 -> 原始时间映射)
+        """
+        logging.info("正在剔除静音 / 非语音段落...")
+        res = self.vad_model.generate(input=audio, cache={})
+        segments = res[0].get('value', []) if res else []
+        return compact_speech(
+            audio, segments, SAMPLE_RATE,
+            pad_s=self.TRIM_PAD_S, min_gap_s=self.TRIM_MIN_GAP_S,
+        )
+    
+    def _speaker_embeddings(self, audio: np.ndarray, sentences: List[Dict]) -> Dict[str, Optional[List[float]]]:
+        """
+        为分片内的每个说话人计算 CAM++ 向量
+        
+        Args:
+            audio: 分片音频
+            sentences: 分片内的句子（时间戳为分片内时间）
+            
+        Returns:
+            Dict[str, Optional[List[float]]]: {局部说话人 ID: 向量}，计算失败时为 None
+        """
+        spans: Dict[str, List[np.ndarray]] = {}
+        lengths: Dict[str, int] = {}
+        max_samples = int(self.SPK_EMBED_MAX_S * SAMPLE_RATE)
+        for sentence in sentences:
+            spk_id = sentence.get("spk_id")
+            if spk_id is None or lengths.get(spk_id, 0) >= max_samples:
+                continue
+            piece = audio[int(sentence["start_time"] * SAMPLE_RATE):int(sentence["end_time"] * SAMPLE_RATE)]
+            spans.setdefault(spk_id, []).append(piece)
+            lengths[spk_id] = lengths.get(spk_id, 0) + len(piece)
+        
+        embeddings = {}
+        for spk_id, pieces in spans.items():
+            try:
+                res = self.spk_model.generate(input=np.concatenate(pieces)[:max_samples])
+                embeddings[spk_id] = np.asarray(res[0]["spk_embedding"].cpu()).reshape(-1).tolist()
+            except Exception as e:
+                logging.warning(f"说话人 {spk_id} 向量计算失败: {str(e)}")
+                embeddings[spk_id] = None
+        return embeddings
+    
+    def transcribe_shard(self, pcm: np.ndarray, start_sample: int) -> Dict:
+        """
+        识别单个分片（在分片工作进程中调用）
+        
+        Args:
+            pcm: 分片的 int16 音频
+            start_sample: 分片在整段音频中的起始样本
+            
+        Returns:
+            Dict: {"transcript": 时间戳为整段音频时间的句子列表,
+                   "speaker_embeddings": {局部说话人 ID: CAM++ 向量}}
+        """
+        audio = to_float32(pcm)
+        offset_map = None
+        if self.trim_silence and len(audio) > 0:
+            audio, offset_map = self._trim_silence(audio)
+        
+        res = self.asr_model.generate(input=audio, batch_size_s=self.batch_size_s) if len(audio) > 0 else []
+        sentences = self.normalize_result(res) if res and res[0].get("sentence_info") else []
+        # 向量按（剔除静音后的）分片内时间截取音频，需在换算时间戳之前计算
+        embeddings = self._speaker_embeddings(audio, sentences)
+        if offset_map is not None:
+            offset_map.remap_transcript(sentences)
+        
+        offset_s = start_sample / SAMPLE_RATE
+        for sentence in sentences:
+            sentence["start_time"] = round(sentence["start_time"] + offset_s, 3)
+            sentence["end_time"] = round(sentence["end_time"] + offset_s, 3)
+        return {"transcript": sentences, "speaker_embeddings": embeddings}
+    
+    def _get_shard_executor(self):
+        """
+        分片工作进程池（首次调用时创建）
+        
+        每个工作进程各自加载一次全部模型，冷启动耗时和内存是单进程的 shard_workers 倍；
+        进程池在引擎的生命周期内复用，只有第一个长视频付出冷启动代价。
+        空闲的工作进程仍占用模型内存，不再需要时调用 shutdown_shard_workers 释放。
+        """
+        if self._shard_executor is None:
+            # 工作进程中的引擎沿用当前的全部构造参数，但不再分片、不读写结果缓存，
+            # 并平分本引擎的线程预算
+            threads = max(1, self.num_threads // self.shard_workers) if self.num_threads else None
+            engine_factory = partial(
+                type(self), **{**self.engine_kwargs(), "use_cache": False, "shard_workers": 1, "num_threads": threads}
+            )
+            self._shard_executor = create_shard_executor(engine_factory, self.shard_workers, threads)
+        return self._shard_executor
+    
+    def shutdown_shard_workers(self):
+        """关闭分片工作进程池，释放其中加载的模型"""
+        if self._shard_executor is not None:
+            self._shard_executor.shutdown(wait=False, cancel_futures=True)
+            self._shard_executor = None
+    
+    def _transcribe_sharded(self, ingest: AudioIngest) -> Optional[List[Dict]]:
+        """
+        按 VAD 静音处切分为多个分片，在多个工作进程中并行识别后合并
+        
+        Args:
+            ingest: 音频提取阶段
+            
+        Returns:
+            Optional[List[Dict]]: 合并后的句子列表，录音太短不需要分片时返回 None
+        """
+        pcm = ingest.load()
+        num_shards = min(self.shard_workers, int(len(pcm) / SAMPLE_RATE // self.MIN_SHARD_S))
+        if num_shards <= 1:
+            return None
+        
+        logging.info("正在规划分片边界...")
+        res = self.vad_model.generate(input=to_float32(pcm), cache={})
+        segments = res[0].get('value', []) if res else []
+        shards = plan_shards(segments, len(pcm), num_shards, SAMPLE_RATE)
+        
+        executor = self._get_shard_executor()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # 工作进程以内存映射方式读取音频，未指定任务目录时先落盘到临时目录
+            audio_path = ingest.npy_path
+            if audio_path is None:
+                audio_path = Path(tmp_dir) / AUDIO_FILENAME
+                np.save(audio_path, pcm)
+            try:
+                shard_results = run_shards(None, str(audio_path), shards, workers=num_shards, executor=executor)
+            except BrokenProcessPool:
+                # 工作进程异常退出后进程池不可再用，下次重新创建
+                self.shutdown_shard_workers()
+                raise
+        
+        speaker_maps = reconcile_speakers(
+            [r["speaker_embeddings"] for r in shard_results], threshold=self.SPK_MATCH_THRESHOLD
+        )
+        transcript = merge_shard_transcripts([r["transcript"] for r in shard_results], speaker_maps)
+        logging.info(f"分片识别完成，共 {len(transcript)} 个句子，"
+                     f"{len(set(s['spk_id'] for s in transcript if s['spk_id'] is not None))} 位说话人")
+        return transcript
+    
+    def cache_signature(self, streaming: bool = False) -> Dict:
+        """
+        影响识别结果的模型及参数，作为结果缓存键的一部分
+        
+        Args:
+            streaming: 是否为流式分窗识别
+            
+        Returns:
+            Dict: 模型 ID / 版本及识别参数
+        """
+        signature = {
+            "engine": type(self).__name__,
+            "models": {
+                config["model_id"]: config["revision"]
+                for config in ModelScopeManager.REQUIRED_MODELS.values()
+            },
+            "streaming": streaming,
+            "quantize": "int8" if self.quantize_int8 else "fp32",
+        }
+        if streaming:
+            signature["window_s"] = self.STREAM_WINDOW_S
+            signature["cut_search_s"] = self.STREAM_CUT_SEARCH_S
+        else:
+            signature["batch_size_s"] = self.batch_size_s
+            if self.trim_silence:
+                signature["trim"] = {"pad_s": self.TRIM_PAD_S, "min_gap_s": self.TRIM_MIN_GAP_S}
+            if self.shard_workers > 1:
+                signature["shards"] = {"workers": self.shard_workers, "min_shard_s": self.MIN_SHARD_S}
+        return signature
+    
+    def devour_video(self, video_path: str, streaming: bool = False, task_dir: Optional[str] = None) -> Dict:
         """
         核心处理方法 - 对视频进行语音识别
         
         Args:
             video_path: 视频文件路径
+            streaming: 是否使用流式分窗识别（适合长录音）
+            task_dir: 任务目录，指定时音频提取到其中并供后续阶段复用
             
         Returns:
             Dict: 包含识别结果的字典
@@ -239,77 +693,88 @@ class VideoDevourASRParaformerV2:
         logging.info(f"开始处理视频: {video_path}")
         
         try:
-            # 使用 Paraformer 进行识别
-            logging.info("正在进行语音识别...")
-            res = self.asr_model.generate(
-                input=video_path,
-                batch_size_s=300
-            )
+            ingest = AudioIngest(video_path, task_dir)
             
-            # 规范化结果
-            transcript = self.normalize_result(res)
-            
-            # 计算统计信息
-            text_stats = {}
-            if transcript:
-                total_text = " ".join([seg.get('sentence', '') for seg in transcript])
-                text_stats = {
-                    "total_segments": len(transcript),
-                    "total_words": len(total_text.split()),
-                    "total_chars": len(total_text),
-                    "avg_segment_duration": sum([
-                        seg.get('end_time', 0) - seg.get('start_time', 0) 
-                        for seg in transcript
-                    ]) / len(transcript),
-                }
+            # 查询结果缓存（键为音频内容哈希 + 模型版本）
+            # 流式识别不使用缓存：计算键需要先读完整段音频，违背流式模式内存恒定的目的
+            cache_key = None
+            cached = None
+            if self.result_cache is not None and not streaming:
+                cache_key = self.result_cache.make_key(ingest.load(), self.cache_signature(streaming))
+                cached = self.result_cache.get(cache_key)
+            
+            transcript = None
+            if cached is not None:
+                transcript = cached["transcript"]
+            elif streaming:
+                transcript = list(self.devour_video_stream(video_path, ingest=ingest))
+            elif self.shard_workers > 1:
+                transcript = self._transcribe_sharded(ingest)
+            
+            if transcript is None:
+                audio = ingest.load_float32()
+                
+                offset_map = None
+                if self.trim_silence:
+                    audio, offset_map = self._trim_silence(audio)
+                
+                # 使用 Paraformer 进行识别
+                logging.info("正在进行语音识别...")
+                res = self.asr_model.generate(
+                    input=audio,
+                    batch_size_s=self.batch_size_s
+                ) if len(audio) > 0 else []
+                
+                # 规范化结果
+                transcript = self.normalize_result(res)
+                
+                # 时间戳换算回原视频时间，下游切分视频、抽帧无需感知压缩
+                if offset_map is not None:
+                    offset_map.remap_transcript(transcript)
+            
+            if cache_key is not None and cached is None:
+                self.result_cache.put(cache_key, {"transcript": transcript})
             
-            return {
-                "transcript": transcript,
-                "video_path": video_path,
-                "processed_at": datetime.now().isoformat(),
-                "text_stats": text_stats,
-            }
+            return build_result(transcript, video_path)
             
         except Exception as e:
             logging.error(f"ASR 处理失败: {str(e)}")
             raise
     
-    def process_videos(self, video_dir: str) -> List[Dict]:
+    def process_videos(self, video_dir: str, workers: int = 1,
+                       threads_per_worker: Optional[int] = None,
+                       output_file: Optional[str] = None) -> List[Dict]:
         """
         批量处理视频目录
         
         Args:
             video_dir: 视频目录路径
+            workers: 工作进程数，大于 1 时每个进程各自加载一次模型并行处理
+            threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+            output_file: 输出 JSON 路径；指定时结果增量写入文件，返回值只包含摘要
             
         Returns:
             List[Dict]: 所有视频的处理结果列表
         """
-        video_dir = Path(video_dir)
-        if not video_dir.exists():
-            raise FileNotFoundError(f"视频目录不存在: {video_dir}")
-        
-        # 查找视频文件
-        video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-        video_files = []
-        for ext in video_extensions:
-            video_files.extend(video_dir.glob(f"*{ext}"))
-        
-        if not video_files:
-            raise FileNotFoundError(f"未找到视频文件: {video_dir}")
-        
-        logging.info(f"找到 {len(video_files)} 个视频文件")
+        video_files = find_video_files(video_dir)
+        return run_batch(self, video_files, workers=workers,
+                         threads_per_worker=threads_per_worker, output_file=output_file)
+    
+    def to_serializable(self, result: Dict) -> Dict:
+        """
+        将单个处理结果转换为可 JSON 序列化的格式
         
-        results = []
-        for video_file in video_files:
-            try:
-                result = self.devour_video(str(video_file))
-                results.append(result)
-                logging.info(f"✅ 完成: {video_file.name}")
-            except Exception as e:
-                logging.error(f"❌ 失败: {video_file.name} - {str(e)}")
-                continue
+        Paraformer V2 的结果本身即可序列化，原样返回
+        """
+        return result
+    
+    def normalize(self, result: Dict) -> Dict:
+        """
+        转换为统一转录格式（见 transcript_schema.py）
         
-        return results
+        Paraformer V2 的输出即为统一格式，原样返回
+        """
+        return result
     
     def save_results(self, results: List[Dict], output_file: str):
         """
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+VideoDevour ASR 引擎池
+
+进程内常驻的 ASR 引擎池：预先构建 N 个已加载模型的引擎实例，
+pipeline 每次运行时借出一个引擎，用完后归还，避免每个视频都重新
+检查模型文件并重新加载 Paraformer / VAD / 标点 / 说话人模型。
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Optional
+
+from backend.devour.asr_engine import load_engine_class
+
+# 未指定工厂函数时使用的引擎（按名称延迟导入，导入本模块不会加载 torch / funasr）
+DEFAULT_ENGINE = "paraformer_v2"
+
+
+def _default_engine_factory():
+    """构建默认引擎"""
+    return load_engine_class(DEFAULT_ENGINE)()
+
+
+class ASREnginePool:
+    """
+    ASR 引擎池
+
+    功能特性：
+    - 按需创建引擎，最多 size 个
+    - 支持 preload 一次性预加载全部引擎（含模型权重）
+    - 借出 / 归还语义，同一引擎同一时刻只被一个任务使用
+    - 提供占用情况统计
+    """
+
+    def __init__(self, size: int = 1, engine_factory: Optional[Callable] = None):
+        """
+        初始化引擎池
+
+        Args:
+            size: 池中引擎数量上限
+            engine_factory: 创建引擎的工厂函数，默认构建 DEFAULT_ENGINE（VideoDevourASRParaformerV2）
+        """
+        if size < 1:
+            raise ValueError(f"引擎池大小必须大于 0，当前为: {size}")
+
+        self.size = size
+        self.engine_factory = engine_factory or _default_engine_factory
+
+        self._idle = deque()
+        self._created = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._total_checkouts = 0
+        self._total_wait_time = 0.0
+        self._cond = threading.Condition()
+
+        logging.info(f"ASR 引擎池初始化完成，容量: {size}")
+
+    def _create_engine(self):
+        """创建引擎并加载模型（在锁外调用）"""
+        start = time.time()
+        engine = self.engine_factory()
+        # 触发模型加载，保证借出的引擎已处于可推理状态
+        engine.load()
+        logging.info(f"ASR 引擎创建完成，耗时 {time.time() - start:.2f}s")
+        return engine
+
+    def preload(self):
+        """
+        预加载引擎直到池满
+
+        通常在服务启动时调用，使第一个请求无需承担模型加载开销。
+        """
+        while True:
+            with self._cond:
+                if self._created >= self.size:
+                    break
+                self._created += 1
+            try:
+                engine = self._create_engine()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(engine)
+                self._cond.notify()
+        logging.info(f"ASR 引擎池预加载完成: {self.stats()}")
+
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        借出一个引擎
+
+        Args:
+            timeout: 最长等待时间（秒），None 表示一直等待
+
+        Returns:
+            已加载模型的 ASR 引擎实例
+
+        Raises:
+            TimeoutError: 等待超时
+        """
+        start = time.time()
+        deadline = None if timeout is None else start + timeout
+        create = False
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._created >= self.size:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"等待 ASR 引擎超时（{timeout}s）")
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    engine = self._idle.popleft()
+                else:
+                    # 池未满，占位后在锁外创建新引擎
+                    self._created += 1
+                    create = True
+                    engine = None
+            finally:
+                self._waiting -= 1
+
+        if create:
+            try:
+                engine = self._create_engine()
+            except Exception:
+                with self._cond:
+                    self._created -= 1
+                    self._cond.notify()
+                raise
+
+        with self._cond:
+            self._in_use += 1
+            self._total_checkouts += 1
+            self._total_wait_time += time.time() - start
+
+        return engine
+
+    def release(self, engine):
+        """
+        归还引擎
+
+        Args:
+            engine: 之前通过 acquire 借出的引擎
+        """
+        with self._cond:
+            self._in_use -= 1
+            self._idle.append(engine)
+            self._cond.notify()
+
+    @contextmanager
+    def engine(self, timeout: Optional[float] = None):
+        """
+        以上下文管理器方式借用引擎，退出时自动归还
+
+        Args:
+            timeout: 最长等待时间（秒）
+        """
+        engine = self.acquire(timeout=timeout)
+        try:
+            yield engine
+        finally:
+            self.release(engine)
+
+    def stats(self) -> Dict:
+        """
+        获取引擎池占用情况
+
+        Returns:
+            Dict: 容量、已创建、空闲、使用中、等待中等统计信息
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "total_checkouts": self._total_checkouts,
+                "avg_wait_time": (
+                    self._total_wait_time / self._total_checkouts
+                    if self._total_checkouts else 0.0
+                ),
+            }
+
+
+# 进程级单例
+_pool: Optional[ASREnginePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_asr_engine_pool(size: int = 1, engine_kwargs: Optional[Dict] = None,
+                        engine_name: str = DEFAULT_ENGINE) -> ASREnginePool:
+    """
+    获取进程级 ASR 引擎池（首次调用时创建）
+
+    Args:
+        size: 引擎池大小，仅在首次创建时生效
+        engine_kwargs: 构建引擎的参数，仅在首次创建时生效
+        engine_name: 引擎名称（见 asr_engine.py 中的注册表），仅在首次创建时生效
+
+    Returns:
+        ASREnginePool: 进程内共享的引擎池
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ASREnginePool(
+                    size=size,
+                    engine_factory=partial(load_engine_class(engine_name), **(engine_kwargs or {})),
+                )
+    elif _pool.size != size:
+        logging.warning(f"ASR 引擎池已按容量 {_pool.size} 创建，忽略新的容量设置: {size}")
+    return _pool
+
+
+def get_asr_engine_pool_stats() -> Optional[Dict]:
+    """
+    获取进程级引擎池的占用情况，引擎池尚未创建时返回 None
+    """
+    if _pool is None:
+        return None
+    return _pool.stats()
@@ -1,19 +1,43 @@
 import whisperx
 import torch
 from pyannote.audio import Pipeline
-from moviepy import VideoFileClip
-import tempfile
 import logging
 import os
 from pathlib import Path
+from typing import List
 import yaml
 import json
 from datetime import datetime
+import sys
+
+# 添加算法模块路径
+sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
+from audio_ingest import AudioIngest
+from batch_runner import IncrementalJSONWriter, find_video_files, run_batch, summarize_result
+from segment_batching import concat_with_gaps, split_segments_by_file
+from transcript_schema import build_result, segments_to_transcript
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class VideoDevourASR:
+    # 引擎元信息（见 asr_engine.py 中的引擎注册表）
+    ENGINE_NAME = "whisper"
+    LOAD_COST_S = 40.0           # 冷启动加载全部模型的大致耗时（秒）
+    EXPECTED_RTF = 0.5           # CPU 上的典型实时率
+    QUALITY = 3                  # 识别质量等级：1 草稿 / 2 标准 / 3 高
+    SUPPORTS_STREAMING = False
+    
+    # 多文件合并转写时文件之间插入的静音时长（秒）
+    # 不短于 whisperx 的 VAD 合并窗口（30s），保证不同文件的语音不会被合并进同一个片段
+    FILE_GAP_S = 30
+    
+    @classmethod
+    def missing_prerequisites(cls) -> List[str]:
+        """构造引擎前必须存在但当前缺失的文件（见 asr_engine.available_engines）"""
+        config_file = Path(__file__).parent.parent.parent / 'config.yaml'
+        return [] if config_file.exists() else [str(config_file)]
+
     def __init__(self):
         config_file = Path(__file__).parent.parent.parent / 'config.yaml'
         if not config_file.exists():
@@ -25,6 +49,7 @@ class VideoDevourASR:
         logging.info(f"使用设备: {self.device}")
         self._diarization_pipeline = None 
         self._whisper_model = None
+        self._align_models = {}  # 按语言缓存的对齐模型: {language: (model, metadata)}
         
     @property
     def whisper_model(self):
@@ -80,161 +105,263 @@ class VideoDevourASR:
                 
         return self._diarization_pipeline
         
-    def extract_audio(self, video_path: str) -> str:
-        """提取视频音频到临时wav文件"""
-        logging.info(f"正在提取音频: {video_path}")
+    def load(self):
+        """预加载 Whisper 模型"""
+        _ = self.whisper_model
+    
+    def get_align_model(self, language: str):
+        """
+        获取指定语言的时间戳对齐模型（每种语言只加载一次）
+        
+        Args:
+            language: 语言代码
+            
+        Returns:
+            tuple: (对齐模型, 元数据)
+        """
+        if language not in self._align_models:
+            logging.info(f"正在加载对齐模型（语言: {language}）...")
+            self._align_models[language] = whisperx.load_align_model(
+                language_code=language,
+                device=self.device
+            )
+            logging.info(f"对齐模型加载完成（语言: {language}）")
+        return self._align_models[language]
+    
+    def extract_audio(self, video_path: str, task_dir: str = None):
+        """
+        提取视频音频为 16kHz 单声道 float32 数组
+        
+        Args:
+            video_path: 视频文件路径
+            task_dir: 任务目录，指定时复用其中已提取的音频
+            
+        Returns:
+            tuple: (音频数据, 采样率)
+        """
         try:
-            with VideoFileClip(video_path) as video:
-                audio = video.audio
-                temp_wav = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                audio.write_audiofile(temp_wav.name, codec="pcm_s16le", fps=16000)
-                logging.info(f"音频提取完成: {temp_wav.name}")
-                return temp_wav.name
+            ingest = AudioIngest(video_path, task_dir)
+            return ingest.load_float32(), ingest.sample_rate
         except Exception as e:
             logging.error(f"音频提取失败: {str(e)}")
             raise
 
-    def devour_video(self, video_path: str) -> dict:
+    def _transcribe(self, audio):
+        """使用优化的转录参数进行语音转写"""
+        return self.whisper_model.transcribe(
+            audio, 
+            batch_size=16, 
+            language="zh",
+            print_progress=True,  # 显示转录进度
+            verbose=False  # 不显示详细输出，避免日志混乱
+        )
+    
+    def _transcribe_many(self, audios, sample_rate):
+        """
+        合并转写多个文件
+        
+        各文件音频之间插入静音后拼接为一段，使所有文件的 VAD 片段
+        在同一次 transcribe 调用中组批推理，再按文件边界拆分结果。
+        
+        Args:
+            audios: 各文件的音频数组
+            sample_rate: 采样率
+            
+        Returns:
+            list[dict]: 与输入一一对应的 {"segments", "language"}，时间戳为各文件内时间
+        """
+        audio, offsets = concat_with_gaps(audios, sample_rate, self.FILE_GAP_S)
+        result = self._transcribe(audio)
+        
+        per_file = split_segments_by_file(result.get('segments', []), offsets)
+        return [{"segments": segments, "language": result['language']} for segments in per_file]
+    
+    def _finish(self, video_path: str, audio, sample_rate: int, result: dict) -> dict:
+        """对齐时间戳并进行说话人识别，组装单个视频的结果"""
+        language = result['language']
+        logging.info(f"转写完成，检测到语言: {language}")
+        logging.info(f"转录段落数: {len(result.get('segments', []))}")
+        
+        # 时间戳对齐
+        logging.info("开始时间戳对齐...")
+        model_a, metadata = self.get_align_model(language)
+        aligned_result = whisperx.align(
+            result["segments"], model_a, metadata, audio, self.device
+        )
+        logging.info("时间戳对齐完成")
+        
+        # 说话人识别（可选）
+        diarization = None
+        if self.diarization_pipeline is not None:
+            logging.info("开始说话人识别...")
+            try:
+                # 使用优化参数进行说话人识别
+                diarization = self.diarization_pipeline(
+                    {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": sample_rate},
+                    min_speakers=1, max_speakers=10
+                )
+                
+                # 统计说话人信息
+                if diarization:
+                    speakers = set()
+                    for turn, _, speaker in diarization.itertracks(yield_label=True):
+                        speakers.add(speaker)
+                    logging.info(f"说话人识别完成 - 检测到 {len(speakers)} 位说话人")
+                else:
+                    logging.info("说话人识别完成 - 未检测到说话人")
+                    
+            except Exception as e:
+                logging.warning(f"说话人识别失败: {str(e)}")
+                logging.warning("继续处理，跳过说话人识别")
+        else:
+            logging.info("跳过说话人识别（无有效HF_TOKEN）")
+        
+        return {
+            "transcript": aligned_result["segments"],
+            "speakers": diarization,
+            "language": language,
+            "video_path": video_path,
+            "processed_at": datetime.now().isoformat()
+        }
+
+    def devour_video(self, video_path: str, task_dir: str = None) -> dict:
         """核心吞噬方法 - 处理单个视频"""
         logging.info(f"开始处理视频: {video_path}")
         
         try:
-            # 音频提取
-            wav_path = self.extract_audio(video_path)
+            # 音频提取（转写、对齐和说话人识别共用同一份音频）
+            audio, sample_rate = self.extract_audio(video_path, task_dir)
             
             # 语音转写
             logging.info("开始语音转写...")
-            audio = whisperx.load_audio(wav_path)
-            
-            # 使用优化的转录参数
-            result = self.whisper_model.transcribe(
-                audio, 
-                batch_size=16, 
-                language="zh",
-                print_progress=True,  # 显示转录进度
-                verbose=False  # 不显示详细输出，避免日志混乱
-            )
-            
-            language = result['language']
-            logging.info(f"转写完成，检测到语言: {language}")
-            logging.info(f"转录段落数: {len(result.get('segments', []))}")
-            
-            # 时间戳对齐
-            logging.info("开始时间戳对齐...")
-            model_a, metadata = whisperx.load_align_model(
-                language_code=language,
-                device=self.device
-            )
-            aligned_result = whisperx.align(
-                result["segments"], model_a, metadata, audio, self.device
-            )
-            logging.info("时间戳对齐完成")
-            
-            # 说话人识别（可选）
-            diarization = None
-            if self.diarization_pipeline is not None:
-                logging.info("开始说话人识别...")
-                try:
-                    # 使用优化参数进行说话人识别
-                    diarization = self.diarization_pipeline({"audio": wav_path}, min_speakers=1, max_speakers=10)
-                    
-                    # 统计说话人信息
-                    if diarization:
-                        speakers = set()
-                        for turn, _, speaker in diarization.itertracks(yield_label=True):
-                            speakers.add(speaker)
-                        logging.info(f"说话人识别完成 - 检测到 {len(speakers)} 位说话人")
-                    else:
-                        logging.info("说话人识别完成 - 未检测到说话人")
-                        
-                except Exception as e:
-                    logging.warning(f"说话人识别失败: {str(e)}")
-                    logging.warning("继续处理，跳过说话人识别")
-            else:
-                logging.info("跳过说话人识别（无有效HF_TOKEN）")
-            
-            # 清理临时文件
-            try:
-                os.unlink(wav_path)
-            except:
-                pass
-                
-            return {
-                "transcript": aligned_result["segments"],
-                "speakers": diarization,
-                "language": language,
-                "video_path": video_path,
-                "processed_at": datetime.now().isoformat()
-            }
+            result = self._transcribe(audio)
+            return self._finish(video_path, audio, sample_rate, result)
             
         except Exception as e:
             logging.error(f"ASR处理失败: {str(e)}")
-            # 尝试清理临时文件
-            try:
-                if 'wav_path' in locals():
-                    os.unlink(wav_path)
-            except:
-                pass
             raise
 
-    def process_videos(self, video_dir: str) -> list:
-        """批量处理视频目录"""
-        video_dir = Path(video_dir)
-        if not video_dir.exists():
-            raise FileNotFoundError(f"视频目录不存在: {video_dir}")
-            
-        # 查找视频文件
-        video_extensions = ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.flv', '.webm']
-        video_files = []
-        for ext in video_extensions:
-            video_files.extend(video_dir.glob(f"*{ext}"))
-            
-        if not video_files:
-            raise FileNotFoundError(f"未找到视频文件: {video_dir}")
+    def devour_videos(self, video_paths: list) -> list:
+        """
+        批量吞噬方法 - 多个视频合并转写
+        
+        所有文件的 VAD 片段在同一次 transcribe 调用中组批推理，
+        对齐和说话人识别仍按文件进行（对齐模型按语言复用）。
+        
+        Args:
+            video_paths: 视频文件路径列表
             
-        logging.info(f"找到 {len(video_files)} 个视频文件")
+        Returns:
+            list: 与输入一一对应的处理结果
+        """
+        logging.info(f"开始合并处理 {len(video_paths)} 个视频")
         
+        audios = []
+        sample_rate = None
+        for video_path in video_paths:
+            audio, sample_rate = self.extract_audio(str(video_path))
+            audios.append(audio)
+        
+        logging.info("开始语音转写（多文件合并）...")
+        results = self._transcribe_many(audios, sample_rate)
+        return [
+            self._finish(str(video_path), audio, sample_rate, result)
+            for video_path, audio, result in zip(video_paths, audios, results)
+        ]
+
+    def process_videos(self, video_dir: str, workers: int = 1, threads_per_worker: int = None,
+                       output_file: str = None, files_per_batch: int = 1) -> list:
+        """
+        批量处理视频目录
+        
+        Args:
+            video_dir: 视频目录路径
+            workers: 工作进程数，大于 1 时每个进程各自加载一次模型并行处理
+            threads_per_worker: 每个工作进程的 torch 线程数，默认平分 CPU 核数
+            output_file: 输出 JSON 路径；指定时结果增量写入文件，返回值只包含摘要
+            files_per_batch: 单进程模式下每次合并转写的文件数，大于 1 时使用 devour_videos
+        """
+        video_files = find_video_files(video_dir)
+        if workers > 1 or files_per_batch <= 1:
+            return run_batch(self, video_files, workers=workers,
+                             threads_per_worker=threads_per_worker, output_file=output_file)
+        
+        writer = IncrementalJSONWriter(output_file) if output_file else None
         results = []
-        for video_file in video_files:
+        try:
+            for start in range(0, len(video_files), files_per_batch):
+                batch = video_files[start:start + files_per_batch]
+                try:
+                    batch_results = list(zip(batch, self.devour_videos(batch)))
+                except Exception as e:
+                    # 一个文件失败会使整批失败，改为逐个处理，只跳过真正失败的文件
+                    logging.warning(f"批次失败，改为逐个处理: {[Path(f).name for f in batch]} - {str(e)}")
+                    batch_results = []
+                    for video_file in batch:
+                        try:
+                            batch_results.append((video_file, self.devour_video(str(video_file))))
+                        except Exception as item_error:
+                            logging.error(f"❌ 失败: {Path(video_file).name} - {str(item_error)}")
+                for video_file, result in batch_results:
+                    # 与 run_batch 返回相同形式的结果
+                    result = self.to_serializable(result)
+                    if writer:
+                        writer.write(result)
+                        results.append(summarize_result(result))
+                    else:
+                        results.append(result)
+                    logging.info(f"✅ 完成: {Path(video_file).name}")
+            return results
+        finally:
+            if writer:
+                writer.close()
+        
+    def to_serializable(self, result: dict) -> dict:
+        """将单个处理结果转换为可 JSON 序列化的格式，并补充文本统计"""
+        # 转换speakers对象为可序列化格式（已转换过的列表保持不变）
+        if 'speakers' in result and result['speakers'] is not None and not isinstance(result['speakers'], list):
+            # 提取说话人时间轴信息为结构化数据
+            speakers_data = []
             try:
-                result = self.devour_video(str(video_file))
-                results.append(result)
-                logging.info(f"✅ 完成: {video_file.name}")
+                for turn, _, speaker in result['speakers'].itertracks(yield_label=True):
+                    speakers_data.append({
+                        "speaker": speaker,
+                        "start": float(turn.start),
+                        "end": float(turn.end),
+                        "duration": float(turn.end - turn.start)
+                    })
+                result['speakers'] = speakers_data
             except Exception as e:
-                logging.error(f"❌ 失败: {video_file.name} - {str(e)}")
-                continue
-                
-        return results
+                logging.warning(f"说话人数据转换失败: {str(e)}")
+                result['speakers'] = str(result['speakers'])
+
+        # 统计转录文本质量指标
+        if 'transcript' in result and result['transcript']:
+            total_text = " ".join([segment.get('text', '') for segment in result['transcript']])
+            result['text_stats'] = {
+                "total_segments": len(result['transcript']),
+                "total_words": len(total_text.split()),
+                "total_chars": len(total_text),
+                "avg_segment_duration": sum([seg.get('end', 0) - seg.get('start', 0) for seg in result['transcript']]) / len(result['transcript']) if result['transcript'] else 0
+            }
+        return result
+        
+    def normalize(self, result: dict) -> dict:
+        """
+        转换为统一转录格式（见 transcript_schema.py）
+        
+        每个对齐后的片段按时间重叠最多的说话人分配 spk_id
+        """
+        result = self.to_serializable(result)
+        speakers = result.get('speakers') if isinstance(result.get('speakers'), list) else None
+        transcript = segments_to_transcript(result.get('transcript', []), speakers)
+        return build_result(transcript, result['video_path'],
+                            processed_at=result.get('processed_at'), language=result.get('language'))
         
     def save_results(self, results: list, output_file: str):
         """保存处理结果到JSON文件"""
-        # 转换speakers对象为可序列化格式
         for result in results:
-            if 'speakers' in result and result['speakers'] is not None:
-                # 提取说话人时间轴信息为结构化数据
-                speakers_data = []
-                try:
-                    for turn, _, speaker in result['speakers'].itertracks(yield_label=True):
-                        speakers_data.append({
-                            "speaker": speaker,
-                            "start": float(turn.start),
-                            "end": float(turn.end),
-                            "duration": float(turn.end - turn.start)
-                        })
-                    result['speakers'] = speakers_data
-                except Exception as e:
-                    logging.warning(f"说话人数据转换失败: {str(e)}")
-                    result['speakers'] = str(result['speakers'])
-            
-            # 统计转录文本质量指标
-            if 'transcript' in result and result['transcript']:
-                total_text = " ".join([segment.get('text', '') for segment in result['transcript']])
-                result['text_stats'] = {
-                    "total_segments": len(result['transcript']),
-                    "total_words": len(total_text.split()),
-                    "total_chars": len(total_text),
-                    "avg_segment_duration": sum([seg.get('end', 0) - seg.get('start', 0) for seg in result['transcript']]) / len(result['transcript']) if result['transcript'] else 0
-                }
+            self.to_serializable(result)
                 
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(results, f, ensure_ascii=False, indent=2)
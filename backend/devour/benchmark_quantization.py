@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Paraformer int8 量化基准测试
+
+对同一视频分别用 fp32 与 int8 动态量化的 Paraformer V2 引擎识别，
+输出两者的实时率（RTF = 处理耗时 / 音频时长）以及 int8 转录相对 fp32 转录的字符级一致率。
+
+用法：
+    python backend/devour/benchmark_quantization.py "input_video/minvideo.mp4"
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
+from asr_engine_paraformer_v2 import VideoDevourASRParaformerV2
+from audio_ingest import AudioIngest
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def transcript_text(transcript: List[Dict]) -> str:
+    """拼接转录文本，去掉空白和标点，只比较识别出的字符"""
+    text = "".join(seg.get("sentence", "") for seg in transcript)
+    return re.sub(r"[\s\W_]+", "", text)
+
+
+def char_agreement(reference: str, hypothesis: str) -> float:
+    """
+    字符级一致率：两段文本最长公共匹配字符数 / 较长文本长度
+
+    Args:
+        reference: fp32 转录文本
+        hypothesis: int8 转录文本
+
+    Returns:
+        float: 一致率 [0, 1]
+    """
+    if not reference and not hypothesis:
+        return 1.0
+    matcher = SequenceMatcher(None, reference, hypothesis, autojunk=False)
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return matched / max(len(reference), len(hypothesis))
+
+
+def run_engine(engine: VideoDevourASRParaformerV2, video_path: str, duration: float) -> Dict:
+    """加载模型后对视频识别一次，记录加载耗时、识别耗时和实时率"""
+    start = time.time()
+    _ = engine.asr_model
+    load_time = time.time() - start
+
+    start = time.time()
+    result = engine.devour_video(video_path)
+    elapsed = time.time() - start
+
+    return {
+        "load_time": load_time,
+        "elapsed": elapsed,
+        "rtf": elapsed / duration if duration else 0.0,
+        "transcript": result["transcript"],
+    }
+
+
+def main():
+    """对比 fp32 与 int8 引擎"""
+    parser = argparse.ArgumentParser(description="Paraformer int8 动态量化基准测试")
+    parser.add_argument("video_path", type=str, help="参考视频文件路径")
+    parser.add_argument("--output", type=str, default=None, help="将基准结果保存为 JSON")
+    args = parser.parse_args()
+
+    duration = AudioIngest(args.video_path).duration
+    logging.info(f"参考音频时长: {duration:.1f}s")
+
+    # 关闭结果缓存，保证两次都真正执行推理
+    fp32 = run_engine(VideoDevourASRParaformerV2(use_cache=False), args.video_path, duration)
+    int8 = run_engine(VideoDevourASRParaformerV2(use_cache=False, quantize_int8=True), args.video_path, duration)
+
+    agreement = char_agreement(transcript_text(fp32["transcript"]), transcript_text(int8["transcript"]))
+
+    report = {
+        "video_path": args.video_path,
+        "audio_duration": duration,
+        "fp32": {k: v for k, v in fp32.items() if k != "transcript"},
+        "int8": {k: v for k, v in int8.items() if k != "transcript"},
+        "speedup": fp32["elapsed"] / int8["elapsed"] if int8["elapsed"] else 0.0,
+        "char_agreement": agreement,
+    }
+
+    logging.info(f"\n📊 基准结果:")
+    logging.info(f"     fp32: 加载 {fp32['load_time']:.2f}s, 识别 {fp32['elapsed']:.2f}s, RTF {fp32['rtf']:.3f}")
+    logging.info(f"     int8: 加载 {int8['load_time']:.2f}s, 识别 {int8['elapsed']:.2f}s, RTF {int8['rtf']:.3f}")
+    logging.info(f"     加速比: {report['speedup']:.2f}x")
+    logging.info(f"     字符一致率: {agreement:.2%}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logging.info(f"基准结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Paraformer V2 推理参数校准
+
+在参考视频上扫描 torch 线程数和 batch_size_s，测量每个组合的实时率（RTF）
+和峰值内存，选出最优组合写入本机调优配置。VideoDevourASRParaformerV2
+初始化时会自动读取该配置。
+
+每个线程数在独立的子进程中测量（线程数需在模型加载前确定，峰值内存也按进程统计），
+同一子进程内 batch_size_s 从小到大依次测量，峰值内存因此是单调的累计值。
+
+用法：
+    python backend/devour/calibrate_asr.py "input_video/minvideo.mp4" --concurrency 4
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent.parent / "algorithm"))
+from audio_ingest import AudioIngest
+from asr_autotune import build_profile, peak_rss_mb, save_host_profile, select_best, thread_candidates
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+DEFAULT_BATCH_SIZES = [60, 120, 300, 600]
+
+
+def measure_threads(video_path: str, num_threads: int, batch_sizes: List[int],
+                    quantize_int8: bool) -> List[Dict]:
+    """
+    在子进程中以固定线程数加载引擎，依次测量各 batch_size_s
+
+    Args:
+        video_path: 参考视频路径
+        num_threads: torch 线程数
+        batch_sizes: 待测的 batch_size_s（升序）
+        quantize_int8: 是否测量 int8 量化模型
+
+    Returns:
+        List[Dict]: 每个 batch_size_s 的测量结果
+    """
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["MKL_NUM_THREADS"] = str(num_threads)
+    from asr_engine_paraformer_v2 import VideoDevourASRParaformerV2
+
+    engine = VideoDevourASRParaformerV2(
+        use_cache=False, quantize_int8=quantize_int8,
+        batch_size_s=batch_sizes[0], num_threads=num_threads,
+    )
+    audio = AudioIngest(video_path).load_float32()
+    duration = len(audio) / 16000
+
+    # 预热：加载模型并跑一小段，避免首次推理的初始化开销计入结果
+    engine.asr_model.generate(input=audio[:16000 * 10], batch_size_s=batch_sizes[0])
+
+    measurements = []
+    for batch_size_s in batch_sizes:
+        start = time.time()
+        try:
+            engine.asr_model.generate(input=audio, batch_size_s=batch_size_s)
+            elapsed = time.time() - start
+            rtf = elapsed / duration if duration else 0.0
+        except Exception as e:
+            logging.warning(f"线程数 {num_threads}，batch_size_s {batch_size_s} 测量失败: {e}")
+            elapsed, rtf = None, None
+        measurements.append({
+            "num_threads": num_threads,
+            "batch_size_s": batch_size_s,
+            "elapsed": elapsed,
+            "rtf": rtf,
+            "peak_rss_mb": peak_rss_mb(),
+        })
+        logging.info(f"线程数 {num_threads:>3}，batch_size_s {batch_size_s:>4}: "
+                     f"RTF {rtf if rtf is None else round(rtf, 4)}，峰值内存 {peak_rss_mb():.0f} MB")
+    return measurements
+
+
+def main():
+    """扫描参数组合并写入本机调优配置"""
+    parser = argparse.ArgumentParser(description="Paraformer V2 batch_size_s / 线程数校准")
+    parser.add_argument("video_path", type=str, help="参考视频文件路径（建议 5~10 分钟）")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="预计同时运行的 ASR 任务数，每个任务的线程数不超过 CPU 核数 / 并发数")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES,
+                        help="待测的 batch_size_s")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="待测的线程数，默认 1, 2, 4, ... 直到 CPU 核数 / 并发数")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="单个任务的峰值内存上限（MB）")
+    parser.add_argument("--quantize-int8", action="store_true", help="校准 int8 量化模型")
+    parser.add_argument("--profile-dir", type=str, default=None, help="调优配置目录")
+    args = parser.parse_args()
+
+    import torch
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+
+    threads = args.threads or thread_candidates(os.cpu_count() or 1, args.concurrency)
+    batch_sizes = sorted(args.batch_sizes)
+    logging.info(f"待测线程数: {threads}，待测 batch_size_s: {batch_sizes}")
+
+    measurements = []
+    for num_threads in threads:
+        # 每个线程数使用全新的子进程
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            measurements.extend(executor.submit(
+                measure_threads, args.video_path, num_threads, batch_sizes, args.quantize_int8
+            ).result())
+
+    best = select_best(measurements, args.max_rss_mb)
+    if best is None:
+        logging.error("没有满足内存上限的参数组合，未写入调优配置")
+        sys.exit(1)
+
+    profile = build_profile(measurements, best, args.video_path, args.concurrency, device)
+    path = save_host_profile(profile, Path(args.profile_dir) if args.profile_dir else None)
+
+    logging.info(f"\n📊 校准结果:")
+    logging.info(f"     线程数: {best['num_threads']}")
+    logging.info(f"     batch_size_s: {best['batch_size_s']}")
+    logging.info(f"     RTF: {best['rtf']:.4f}")
+    logging.info(f"     峰值内存: {best['peak_rss_mb']:.0f} MB")
+    logging.info(f"\n🎉 调优配置已写入: {path}")
+
+
+if __name__ == "__main__":
+    main()